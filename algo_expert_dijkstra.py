@@ -18,7 +18,7 @@ class DijkstraMinHeap:
     # O(log(n)) time, O(1) space
     def __sift_down__(self, current_index, end_index, heap):
         first_child_index = current_index * 2 + 1
-        while first_child_index < end_index:
+        while first_child_index <= end_index:
             second_child_index = current_index * 2 + 2 if current_index * 2 + 2 <= end_index else -1
             if second_child_index != -1 and heap[second_child_index][1] < heap[first_child_index][1]:
                 index_to_swap = second_child_index
@@ -54,6 +54,15 @@ class DijkstraMinHeap:
         self.vertex_map[heap[second_index][0]] = first_index
         heap[first_index], heap[second_index] = heap[second_index], heap[first_index]
 
+    def __contains__(self, vertex):
+        return vertex in self.vertex_map
+
+    # O(log(n)) time, O(1) space
+    def insert(self, vertex, value):
+        self.vertex_map[vertex] = len(self.heap)
+        self.heap.append((vertex, value))
+        self.__sift_up__(len(self.heap) - 1, self.heap)
+
     def update(self, vertex, value):
         self.heap[self.vertex_map[vertex]] = (vertex, value)
         self.__sift_up__(self.vertex_map[vertex], self.heap)
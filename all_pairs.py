@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+import os
+from importlib.util import find_spec
+
+from graph_snapshot import decode_labels, encode_labels
+
+"""
+A dense all pairs shortest path table for small and medium graphs, computed
+with a blocked Floyd-Warshall and stored in memory mapped .npy files, so a
+lookup afterwards is O(1) and other processes can open the table read only
+without copying it.
+
+The table is a directory with three files:
+    labels.txt          the vertex labels, labels[i] is the label of row/column i,
+                        see graph_snapshot.encode_labels
+    distances.npy       float64 n x n, distances[i, j] = d(i, j), inf if unreachable
+    next_hops.npy       int32/int64 n x n, the vertex after i on the shortest
+                        path from i to j, -1 if j cannot be reached
+
+Floyd-Warshall is run one block of b pivots at a time. The b pivot rows and
+then the b pivot columns are brought up to date first. After that each block
+of rows takes all b pivots in a row while it is still in the cache, with
+every step one vectorized min over a b x n slab.
+
+NumPy is required for this engine, and only imported when a table is built or
+opened, so importing this module stays cheap.
+"""
+
+LABELS_FILE = 'labels.txt'
+DISTANCES_FILE = 'distances.npy'
+NEXT_HOPS_FILE = 'next_hops.npy'
+
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+
+def relax(distances, next_hops, rows, pivot):
+    """
+    One Floyd-Warshall step for a slice of rows: route through pivot wherever
+    that is shorter.
+    :param distances: n x n distance matrix
+    :param next_hops: n x n next hop matrix
+    :param rows: slice of the rows to update
+    :param pivot: the intermediate vertex
+    :return: None
+    """
+    import numpy as np
+    distance_rows = distances[rows]
+    through_pivot = distance_rows[:, pivot, None] + distances[pivot]
+    shorter = through_pivot < distance_rows
+    if shorter.any():
+        np.copyto(distance_rows, through_pivot, where=shorter)
+        hop_rows = next_hops[rows]
+        np.copyto(hop_rows, np.broadcast_to(hop_rows[:, pivot, None].copy(), hop_rows.shape), where=shorter)
+
+
+def relax_columns(distances, next_hops, columns, pivot):
+    """
+    One Floyd-Warshall step for a slice of columns, over all of the rows.
+    """
+    import numpy as np
+    distance_columns = distances[:, columns]
+    through_pivot = distances[:, pivot, None] + distances[pivot, columns]
+    shorter = through_pivot < distance_columns
+    if shorter.any():
+        np.copyto(distance_columns, through_pivot, where=shorter)
+        hop_columns = next_hops[:, columns]
+        np.copyto(hop_columns, np.broadcast_to(next_hops[:, pivot, None].copy(), hop_columns.shape), where=shorter)
+
+
+def floyd_warshall(labels, edges, path, block_size=128):
+    """
+    Compute the all pairs table and write it to the directory path.
+    :param labels: list of vertex labels
+    :param edges: iterable of (source index, destination index, cost)
+    :param path: directory for the table, created if it does not exist
+    :param block_size: number of pivots per block
+    :return: AllPairsTable, opened read/write
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("The all pairs table needs numpy")
+    import numpy as np
+    # Before the O(V^3) work, so labels that cannot be saved fail straight away
+    encoded_labels = encode_labels(labels)
+    os.makedirs(path, exist_ok=True)
+    number_of_vertices = len(labels)
+    shape = (number_of_vertices, number_of_vertices)
+    hop_type = np.int32 if number_of_vertices < 2 ** 31 else np.int64
+    distances = np.lib.format.open_memmap(os.path.join(path, DISTANCES_FILE), mode='w+', dtype=np.float64, shape=shape)
+    next_hops = np.lib.format.open_memmap(os.path.join(path, NEXT_HOPS_FILE), mode='w+', dtype=hop_type, shape=shape)
+    distances.fill(np.inf)
+    next_hops.fill(-1)
+    diagonal = np.arange(number_of_vertices)
+    distances[diagonal, diagonal] = 0
+    next_hops[diagonal, diagonal] = diagonal
+    edge_array = np.array(list(edges), dtype=np.float64).reshape(-1, 3)
+    sources, destinations, costs = edge_array[:, 0].astype(np.int64), edge_array[:, 1].astype(np.int64), edge_array[:, 2]
+    # With parallel edges the cheapest one wins. A self loop only lowers the diagonal if it is
+    # negative, then it is a negative cycle
+    np.minimum.at(distances, (sources, destinations), costs)
+    direct = (distances[sources, destinations] == costs) & (sources != destinations)
+    next_hops[sources[direct], destinations[direct]] = destinations[direct]
+
+    for block_start in range(0, number_of_vertices, block_size):
+        pivots = range(block_start, min(block_start + block_size, number_of_vertices))
+        pivot_rows = slice(pivots.start, pivots.stop)
+        # The pivot rows only go through pivots in the block, so they can be finished on their own
+        for pivot in pivots:
+            relax(distances, next_hops, pivot_rows, pivot)
+        for pivot in pivots:
+            relax_columns(distances, next_hops, pivot_rows, pivot)
+        # Every other entry now goes through final pivot rows and columns
+        for row_start in range(0, number_of_vertices, block_size):
+            rows = slice(row_start, min(row_start + block_size, number_of_vertices))
+            for pivot in pivots:
+                relax(distances, next_hops, rows, pivot)
+
+    if (distances[diagonal, diagonal] < 0).any():
+        raise ValueError('The graph has a negative cycle')
+    distances.flush()
+    next_hops.flush()
+    with open(os.path.join(path, LABELS_FILE), 'wb') as labels_file:
+        labels_file.write(encoded_labels)
+    return AllPairsTable(labels, distances, next_hops)
+
+
+class AllPairsTable:
+    """
+    AllPairsTable answers distance and path lookups from the matrices written
+    by floyd_warshall. Use AllPairsTable.open to map an existing table.
+    """
+    def __init__(self, labels, distances, next_hops):
+        self.labels = labels
+        self.index = {label: vertex for vertex, label in enumerate(labels)}
+        self.distances = distances
+        self.next_hops = next_hops
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Map a table read only. The matrices are not read into memory, the pages
+        are shared through the page cache with every other process that maps
+        the same files.
+        :param path: directory written by floyd_warshall, the labels are only
+                     parsed as Python literals and the matrices are loaded
+                     without allow_pickle, so nothing in it can run code
+        :return: AllPairsTable
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("The all pairs table needs numpy")
+        import numpy as np
+        with open(os.path.join(path, LABELS_FILE), 'rb') as labels_file:
+            labels = decode_labels(labels_file.read())
+        distances = np.load(os.path.join(path, DISTANCES_FILE), mmap_mode='r')
+        next_hops = np.load(os.path.join(path, NEXT_HOPS_FILE), mmap_mode='r')
+        return cls(labels, distances, next_hops)
+
+    def distance(self, start, end):
+        """
+        :return: The shortest distance from start to end, inf if end cannot be reached
+        """
+        return float(self.distances[self.index[start], self.index[end]])
+
+    def path(self, start, end):
+        """
+        Follow the next hops from start to end.
+        :return: The shortest path as a list of labels, empty if end cannot be reached
+        """
+        current, target = self.index[start], self.index[end]
+        if self.next_hops[current, target] < 0:
+            return []
+        path = [start]
+        while current != target:
+            current = int(self.next_hops[current, target])
+            path.append(self.labels[current])
+        return path
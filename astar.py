@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+
+import hashlib
+import struct
+import sys
+from array import array
+from heapq import heappush, heappop
+from random import Random
+
+from graph_snapshot import MAX_INT64, MIN_INT64, as_bytes, decode_labels, encode_labels
+from shortest_path import dijkstra, build_path
+
+"""
+Goal directed shortest path search. A* is Dijkstra where the priority of a
+vertex is its distance from start plus a heuristic lower bound on its
+distance to end, so the search is pulled towards end instead of settling
+everything closer than end.
+
+ALT (A*, Landmarks and the Triangle inequality) gets a lower bound for any
+graph from a few precomputed landmarks L. For any vertices v and t:
+    d(v, t) >= d(L, t) - d(L, v)     and     d(v, t) >= d(v, L) - d(t, L)
+The landmark tables are saved together with a fingerprint of the graph they
+were computed for, so they can be computed once per version of a graph.
+The file is a header, the vertex labels as Python literals, see
+graph_snapshot.encode_labels, and then little endian arrays with the
+landmarks and one distance per vertex for each table. Nothing in it is
+unpickled, so tables from somewhere else are safe to load.
+"""
+
+LANDMARKS_MAGIC = b'LANDMRKS'
+LANDMARKS_FORMAT_VERSION = 2
+# magic, version, flags, landmarks, vertices, size of the labels in bytes, fingerprint
+LANDMARKS_HEADER = struct.Struct('<8sIIqqq40s')
+# The distances are int64 rather than float64, an unreached vertex is MIN_INT64 instead of nan
+INT_DISTANCES = 1
+
+
+class UnitWeights:
+    """
+    Weights for an unweighted graph, every edge costs 1.
+    """
+    def __getitem__(self, src_dst):
+        return 1
+
+
+class ReversedWeights:
+    """
+    The weights of the reverse graph, the edge (v, u) costs what (u, v) does.
+    """
+    def __init__(self, weights):
+        self.weights = weights
+
+    def __getitem__(self, src_dst):
+        return self.weights[(src_dst[1], src_dst[0])]
+
+
+def astar(graph, weights, start, end, heuristic, stats=None):
+    """
+    A* search from start to end.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param weights: dictionary of (src, dst) -> cost, must not be negative
+    :param start:
+    :param end:
+    :param heuristic: callable(vertex, end) returning a lower bound on the
+                      distance from vertex to end, i.e. it must be admissible
+    :param stats: optional dictionary to add the counters to
+    :return: The shortest path as a list of vertices, empty if there is none
+    """
+    distances = {start: 0}
+    parents = {start: None}
+    popped = relaxed = 0
+    counter = 0
+    heap = [(heuristic(start, end), counter, 0, start)]
+    found = False
+    while heap:
+        _, _, distance, vertex = heappop(heap)
+        # Skip stale entries. A vertex is only expanded again if its distance
+        # dropped, which can happen when the heuristic is not consistent.
+        if distance > distances[vertex]:
+            continue
+        popped += 1
+        if vertex == end:
+            found = True
+            break
+        for neighbor in graph.get(vertex, ()):
+            new_distance = distance + weights[(vertex, neighbor)]
+            relaxed += 1
+            if neighbor not in distances or new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                parents[neighbor] = vertex
+                counter += 1
+                heappush(heap, (new_distance + heuristic(neighbor, end), counter, new_distance, neighbor))
+
+    if stats is not None:
+        stats['popped'] = stats.get('popped', 0) + popped
+        stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+    if not found:
+        return []
+    return build_path(parents, end)
+
+
+def graph_fingerprint(graph, weights):
+    """
+    A hash of the vertices, edges and weights of a graph, in insertion order.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param weights: dictionary of (src, dst) -> cost
+    :return: hex digest
+    """
+    digest = hashlib.sha1()
+    for vertex, neighbors in graph.items():
+        digest.update(repr((vertex, [(neighbor, weights.get((vertex, neighbor))) for neighbor in neighbors]))
+                      .encode())
+    return digest.hexdigest()
+
+
+class Landmarks:
+    """
+    Landmarks holds the distances from and to k landmark vertices and uses
+    them as an ALT heuristic for astar. Use Landmarks.select to pick the
+    landmarks and compute the tables, save/load to keep them between runs.
+    """
+    def __init__(self, landmarks, from_landmarks, to_landmarks, fingerprint=None):
+        """
+        :param landmarks: list of landmark vertices
+        :param from_landmarks: for each landmark, a dictionary of vertex -> d(landmark, vertex)
+        :param to_landmarks: for each landmark, a dictionary of vertex -> d(vertex, landmark)
+        :param fingerprint: graph_fingerprint of the graph the tables are for
+        """
+        self.landmarks = landmarks
+        self.from_landmarks = from_landmarks
+        self.to_landmarks = to_landmarks
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    @classmethod
+    def select(cls, graph, weights, reverse_graph, k, seed=0):
+        """
+        Pick k landmarks with the farthest first heuristic: the first one is a
+        random vertex and each next one is the vertex that is farthest from
+        all of the landmarks picked so far. Landmarks on the edge of the
+        graph give the tightest bounds.
+        :param graph: dictionary of vertex -> list of neighbors
+        :param weights: dictionary of (src, dst) -> cost, empty if unweighted
+        :param reverse_graph: dictionary of vertex -> list of predecessors
+        :param k: number of landmarks
+        :param seed: seed for picking the first landmark
+        :return: Landmarks
+        """
+        if not graph:
+            raise ValueError("Cannot select landmarks for an empty graph")
+        forward_weights = weights if weights else UnitWeights()
+        backward_weights = ReversedWeights(weights) if weights else UnitWeights()
+        vertices = list(graph.keys())
+        landmark = vertices[Random(seed).randrange(len(vertices))]
+        landmarks, from_landmarks, to_landmarks = [], [], []
+        closest = {}
+        while len(landmarks) < k:
+            landmarks.append(landmark)
+            from_landmarks.append(dijkstra(graph, forward_weights, landmark)[0])
+            to_landmarks.append(dijkstra(reverse_graph, backward_weights, landmark)[0])
+            for vertex, distance in from_landmarks[-1].items():
+                closest[vertex] = min(closest.get(vertex, distance), distance)
+            candidates = [vertex for vertex in closest if vertex not in landmarks]
+            if not candidates:
+                break
+            landmark = max(candidates, key=closest.get)
+        return cls(landmarks, from_landmarks, to_landmarks, graph_fingerprint(graph, weights))
+
+    def heuristic(self, vertex, end):
+        """
+        The largest triangle inequality lower bound on d(vertex, end) over all
+        of the landmarks. Landmarks that do not reach, or are not reached by,
+        one of the two vertices give no bound.
+        """
+        bound = 0
+        for from_landmark, to_landmark in zip(self.from_landmarks, self.to_landmarks):
+            if vertex in from_landmark and end in from_landmark:
+                bound = max(bound, from_landmark[end] - from_landmark[vertex])
+            if vertex in to_landmark and end in to_landmark:
+                bound = max(bound, to_landmark[vertex] - to_landmark[end])
+        return bound
+
+    def save(self, path):
+        """
+        Write the tables to path, see load.
+        :raises ValueError: if a vertex is not a Python literal, see graph_snapshot.encode_labels
+        """
+        tables = self.from_landmarks + self.to_landmarks
+        index = {}
+        for vertex in self.landmarks:
+            index.setdefault(vertex, len(index))
+        for table in tables:
+            for vertex in table:
+                index.setdefault(vertex, len(index))
+        vertices = list(index)
+        labels = encode_labels(vertices)
+        flags = 0
+        if all(type(distance) is int and MIN_INT64 < distance <= MAX_INT64
+               for table in tables for distance in table.values()):
+            flags |= INT_DISTANCES
+            typecode, missing = 'q', MIN_INT64
+        else:
+            typecode, missing = 'd', float('nan')
+        fingerprint = (self.fingerprint or '').encode()
+        with open(path, 'wb') as output_file:
+            output_file.write(LANDMARKS_HEADER.pack(LANDMARKS_MAGIC, LANDMARKS_FORMAT_VERSION, flags,
+                                                    len(self.landmarks), len(vertices), len(labels), fingerprint))
+            output_file.write(labels)
+            output_file.write(as_bytes([index[vertex] for vertex in self.landmarks], 'q'))
+            for table in tables:
+                output_file.write(as_bytes([table.get(vertex, missing) for vertex in vertices], typecode))
+
+    @classmethod
+    def load(cls, path, fingerprint=None):
+        """
+        Load landmark tables written by save.
+        :param path:
+        :param fingerprint: If given, the tables must have been computed for a
+                            graph with this graph_fingerprint
+        :return: Landmarks
+        """
+        with open(path, 'rb') as input_file:
+            data = memoryview(input_file.read())
+        if len(data) < LANDMARKS_HEADER.size or data[:len(LANDMARKS_MAGIC)] != LANDMARKS_MAGIC:
+            raise ValueError("%s is not a landmarks file" % path)
+        _, version, flags, number_of_landmarks, number_of_vertices, labels_size, saved_fingerprint = \
+            LANDMARKS_HEADER.unpack(data[:LANDMARKS_HEADER.size])
+        if version != LANDMARKS_FORMAT_VERSION:
+            raise ValueError("Unsupported landmarks format version: %s" % version)
+        saved_fingerprint = saved_fingerprint.rstrip(b'\0').decode() or None
+        if fingerprint is not None and saved_fingerprint != fingerprint:
+            raise ValueError("The landmarks in %s were computed for a different graph" % path)
+        if len(data) != LANDMARKS_HEADER.size + labels_size + 8 * number_of_landmarks * (1 + 2 * number_of_vertices):
+            raise ValueError("%s does not match its header" % path)
+
+        position = LANDMARKS_HEADER.size
+        vertices = decode_labels(data[position:position + labels_size])
+        if len(vertices) != number_of_vertices:
+            raise ValueError("%s does not match its header" % path)
+        position += labels_size
+
+        def read(typecode, length):
+            nonlocal position
+            values = array(typecode)
+            values.frombytes(data[position:position + 8 * length])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            position += 8 * length
+            return values
+
+        landmarks = [vertices[vertex] for vertex in read('q', number_of_landmarks)]
+        typecode = 'q' if flags & INT_DISTANCES else 'd'
+        tables = []
+        for _ in range(2 * number_of_landmarks):
+            # nan != nan, so this skips the unreached vertices of float tables too
+            tables.append({vertex: distance for vertex, distance in zip(vertices, read(typecode, number_of_vertices))
+                           if distance == distance and distance != MIN_INT64})
+        return cls(landmarks, tables[:number_of_landmarks], tables[number_of_landmarks:], saved_fingerprint)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import os
+
+from shortest_path import build_path
+
+"""
+Shortest paths for many (source, target) pairs at once. The pairs are grouped
+by source so every source is searched only once: a source with a single
+target gets a point to point search that stops at the target, a source with
+more targets gets one single source search whose parent table answers all of
+them. The groups are spread over a thread or process pool.
+
+A pair whose target cannot be reached, or is not in the graph, gets an empty
+path rather than an exception.
+"""
+
+EXECUTORS = ('thread', 'process')
+
+# The graph each process pool worker searches, set once by init_worker so it
+# is not sent again with every task
+WORKER_GRAPH = None
+
+
+def group_by_source(pairs):
+    """
+    :param pairs: iterable of (source, target)
+    :return: list of (source, [(pair_index, target), ...]) in order of first appearance
+    """
+    groups = {}
+    for pair_index, (source, target) in enumerate(pairs):
+        groups.setdefault(source, []).append((pair_index, target))
+    return list(groups.items())
+
+
+def source_paths(graph, source, targets):
+    """
+    Find the paths from one source to all of its targets.
+    :param graph: graphs.Graph
+    :param source:
+    :param targets: list of (pair_index, target)
+    :return: list of (pair_index, path)
+    """
+    if len(targets) == 1:
+        pair_index, target = targets[0]
+        try:
+            return [(pair_index, graph.find_shortest_path(source, target))]
+        except ValueError:
+            return [(pair_index, [])]
+
+    try:
+        _, parents = graph.find_shortest_path(source)
+    except ValueError:
+        return [(pair_index, []) for pair_index, _ in targets]
+    results = []
+    for pair_index, target in targets:
+        if target == source:
+            results.append((pair_index, [source]))
+        elif parents.get(target) is None:
+            results.append((pair_index, []))
+        else:
+            results.append((pair_index, build_path(parents, target)))
+    return results
+
+
+def group_paths(graph, groups):
+    return [result for source, targets in groups for result in source_paths(graph, source, targets)]
+
+
+def init_worker(graph):
+    global WORKER_GRAPH
+    WORKER_GRAPH = graph
+
+
+def worker_group_paths(groups):
+    return group_paths(WORKER_GRAPH, groups)
+
+
+def batch_shortest_paths(graph, pairs, workers=None, executor='process', ordered=True, chunk_size=16):
+    """
+    Find the shortest path for every (source, target) pair. The arguments
+    are checked, and pairs read, straight away, the searches only run as the
+    results are iterated.
+    :param graph: graphs.Graph
+    :param pairs: iterable of (source, target)
+    :param workers: number of threads/processes, os.cpu_count() if None, 1
+                    searches in the calling thread without a pool
+    :param executor: 'thread' or 'process'
+    :param ordered: If True, results come back in the order of pairs,
+                    otherwise as soon as their group has been searched
+    :param chunk_size: number of sources handed to a worker at a time
+    :return: generator of (source, target, path)
+    """
+    if executor not in EXECUTORS:
+        raise ValueError("Invalid executor %s, must be one of: %s" % (executor, ', '.join(EXECUTORS)))
+    pairs = list(pairs)
+    groups = group_by_source(pairs)
+    chunks = [groups[index:index + chunk_size] for index in range(0, len(groups), chunk_size)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(chunks) <= 1:
+        return collect(pairs, (group_paths(graph, chunk) for chunk in chunks), ordered)
+    return pool_paths(graph, pairs, chunks, workers, executor, ordered)
+
+
+def pool_paths(graph, pairs, chunks, workers, executor, ordered):
+    # Imported here, the process pool pulls in multiprocessing, which most users of graphs never need
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    if executor == 'process':
+        # Only the adjacency, weights and potentials are pickled for the workers, not the path cache or trees
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(graph.__search_copy__(),))
+        futures = [pool.submit(worker_group_paths, chunk) for chunk in chunks]
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = [pool.submit(group_paths, graph, chunk) for chunk in chunks]
+    with pool:
+        yield from collect(pairs, (future.result() for future in as_completed(futures)), ordered)
+
+
+def collect(pairs, chunk_results, ordered):
+    """
+    Turn the (pair_index, path) results of each chunk into (source, target, path).
+    In order mode, results that arrive before the pairs in front of them are
+    held back until those pairs are done.
+    """
+    if not ordered:
+        for results in chunk_results:
+            for pair_index, path in results:
+                yield pairs[pair_index][0], pairs[pair_index][1], path
+        return
+
+    pending = {}
+    next_index = 0
+    for results in chunk_results:
+        pending.update(results)
+        while next_index in pending:
+            yield pairs[next_index][0], pairs[next_index][1], pending.pop(next_index)
+            next_index += 1
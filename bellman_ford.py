@@ -27,8 +27,12 @@ class Graph:
             ret += str(edge) + '\n'
         return ret
 
-    def BellmanFordShortestPath(self, source, end=None):
-
+    def shortest_distances(self, source):
+        """
+        Relax every edge until nothing changes, at most node_cnt times.
+        :param source:
+        :return: (distance, parent), distance is a list indexed by node
+        """
         # Initialize the distance from the source node S to all other nodes as
         # infinite and to itself as 0.
         distance = [float('inf')] * self.node_cnt
@@ -58,6 +62,15 @@ class Graph:
                 #           ))
                 break
 
+        for edge in self.edge_list:
+
+            if (distance[edge.dst] > distance[edge.src] + edge.weight):
+                raise ValueError("Negative weight cycle exist in the graph")
+        return distance, parent
+
+    def BellmanFordShortestPath(self, source, end=None):
+        distance, parent = self.shortest_distances(source)
+
         if end is not None:
             if end in parent:
                 print(['%s: %s' % (k,parent[k]) for k in sorted(parent.keys()) ])
@@ -72,11 +85,6 @@ class Graph:
             else:
                 raise ValueError("Invalid end node %s, no such node" % end)
 
-        for edge in self.edge_list:
-
-            if (distance[edge.dst] > distance[edge.src] + edge.weight):
-                raise ValueError("Negative weight cycle exist in the graph")
-
         for node in range(self.node_cnt):
             print("Source Node(" + str(source) + ") -> Destination Node(" + str(node) + ") : " + str(distance[node]))
 
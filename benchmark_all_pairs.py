@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Find the graph size where the blocked Floyd-Warshall table in all_pairs stops
+paying off against running a single source search from every vertex. For
+every size both are timed on the same random graph with about 4 edges per
+vertex, and so is a batch of lookups in the finished table. The crossover is
+the first size where the single source runs win.
+"""
+
+import argparse
+import tempfile
+from time import perf_counter
+
+from all_pairs import AllPairsTable
+from graph_generators import random_graph
+
+DEFAULT_SIZES = [250, 500, 1000, 2000, 4000]
+
+
+def run(sizes, edges_per_vertex, block_size, lookups, seed):
+    print("%10s %10s %14s %14s %14s" % ('vertices', 'edges', 'floyd-warshall', 'single source', 'lookup'))
+    crossover = None
+    for number_of_vertices in sizes:
+        graph = random_graph(number_of_vertices, number_of_vertices * edges_per_vertex, seed)
+
+        with tempfile.TemporaryDirectory() as path:
+            start_time = perf_counter()
+            graph.all_pairs_table(path, block_size)
+            table_time = perf_counter() - start_time
+
+            table = AllPairsTable.open(path)
+            pairs = [(vertex % number_of_vertices, (vertex * 7919) % number_of_vertices) for vertex in range(lookups)]
+            start_time = perf_counter()
+            for start, end in pairs:
+                table.distance(start, end)
+            lookup_time = (perf_counter() - start_time) / lookups
+
+        start_time = perf_counter()
+        for _ in graph.all_pairs_shortest_paths(workers=1):
+            pass
+        single_source_time = perf_counter() - start_time
+
+        if crossover is None and single_source_time < table_time:
+            crossover = number_of_vertices
+        print("%10d %10d %13.3fs %13.3fs %12.2fus" %
+              (number_of_vertices, number_of_vertices * edges_per_vertex, table_time, single_source_time,
+               lookup_time * 1e6))
+
+    if crossover is None:
+        print("Floyd-Warshall was faster at every size")
+    else:
+        print("Single source searches are faster from %d vertices" % crossover)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--edges-per-vertex', type=int, default=4)
+    parser.add_argument('--block-size', type=int, default=128)
+    parser.add_argument('--lookups', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, action='append', metavar='VERTICES',
+                        help='number of vertices to run, can be repeated')
+    args = parser.parse_args()
+    run(args.size or DEFAULT_SIZES, args.edges_per_vertex, args.block_size, args.lookups, args.seed)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Time parallel_components.connected_components on a random edge list with an
+increasing number of workers, and the single core BulkUnionFind.union_many
+over the same edges for reference. The speedup is against one worker, so it
+can only grow up to the number of cores of the machine.
+"""
+
+import argparse
+import os
+from time import perf_counter
+
+import numpy as np
+
+from bulk_union_find import BulkUnionFind
+from parallel_components import connected_components
+
+
+def run(number_of_vertices, number_of_edges, workers_list, seed):
+    random = np.random.default_rng(seed)
+    sources = random.integers(0, number_of_vertices, number_of_edges)
+    destinations = random.integers(0, number_of_vertices, number_of_edges)
+    print("%d vertices, %d edges, %d cores" % (number_of_vertices, number_of_edges, os.cpu_count() or 1))
+
+    start_time = perf_counter()
+    union_find = BulkUnionFind(number_of_vertices)
+    union_find.union_many(sources, destinations)
+    print("%-22s %9.3fs %10d components" % ('union_many', perf_counter() - start_time, union_find.num_components))
+
+    base_time = None
+    for workers in workers_list:
+        start_time = perf_counter()
+        labels = connected_components(number_of_vertices, sources, destinations, workers)
+        elapsed = perf_counter() - start_time
+        if base_time is None:
+            base_time = elapsed
+        print("%-22s %9.3fs %10d components %6.2fx" %
+              ('%d workers' % workers, elapsed, labels.max() + 1 if len(labels) else 0, base_time / elapsed))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vertices', type=int, default=10 ** 7)
+    parser.add_argument('--edges', type=int, default=10 ** 8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, action='append', help='pool size to run, can be repeated')
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+    workers_list = args.workers or sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    run(args.vertices, args.edges, workers_list, args.seed)
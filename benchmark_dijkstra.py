@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare the priority queue Dijkstra in shortest_path with the deque based
+version that graphs.Graph used before, on random graphs with 10^5 to 10^6
+edges. For every graph the single source tables and a batch of point to
+point queries are timed, and the number of vertices where the old version
+got the distance wrong is reported.
+"""
+
+import argparse
+from collections import deque
+from time import perf_counter
+
+from graph_generators import random_graph
+from shortest_path import dijkstra
+
+DEFAULT_SIZES = [
+    (25000, 100000),
+    (100000, 400000),
+    (250000, 1000000),
+]
+
+
+def deque_dijkstra(graph, weights, start, end=None):
+    """
+    The original graphs.Graph.__dijkstra__, every vertex is popped once in
+    insertion order rather than in order of distance.
+    """
+    queue = deque()
+    distances = {}
+    parents = {}
+    queue.append(start)
+    for vertex in graph.keys():
+        distances[vertex] = float('inf')
+        parents[vertex] = None
+        if vertex != start:
+            queue.append(vertex)
+    distances[start] = 0
+    while len(queue) > 0:
+        vertex = queue.popleft()
+        if end is not None and vertex == end:
+            break
+        for edge in graph[vertex]:
+            if distances[edge] > distances[vertex] + weights[(vertex, edge)]:
+                distances[edge] = distances[vertex] + weights[(vertex, edge)]
+                parents[edge] = vertex
+    return distances, parents
+
+
+def time_call(function, *args, **kwargs):
+    start_time = perf_counter()
+    result = function(*args, **kwargs)
+    return perf_counter() - start_time, result
+
+
+def run(sizes, queries, seed):
+    print("%10s %10s %12s %12s %12s %12s %12s %12s %8s" %
+          ('vertices', 'edges', 'deque sssp', 'lazy sssp', 'indexed sssp',
+           'deque p2p', 'lazy p2p', 'indexed p2p', 'wrong'))
+    for number_of_vertices, number_of_edges in sizes:
+        graph = random_graph(number_of_vertices, number_of_edges, seed)
+        adjacency, weights = graph.graph, graph.weights
+
+        deque_time, (deque_distances, _) = time_call(deque_dijkstra, adjacency, weights, 0)
+        lazy_time, (lazy_distances, _) = time_call(dijkstra, adjacency, weights, 0, heap='lazy')
+        indexed_time, _ = time_call(dijkstra, adjacency, weights, 0, heap='indexed')
+        wrong = sum(1 for vertex, distance in lazy_distances.items() if deque_distances[vertex] != distance)
+
+        # The point to point queries use targets spread over the graph
+        targets = list(range(number_of_vertices - 1, 0, -max(1, number_of_vertices // queries)))[:queries]
+        times = []
+        for function, kwargs in ((deque_dijkstra, {}), (dijkstra, {'heap': 'lazy'}), (dijkstra, {'heap': 'indexed'})):
+            start_time = perf_counter()
+            for target in targets:
+                function(adjacency, weights, 0, target, **kwargs)
+            times.append((perf_counter() - start_time) / len(targets))
+
+        print("%10d %10d %11.3fs %11.3fs %11.3fs %11.3fs %11.3fs %11.3fs %8d" %
+              (number_of_vertices, number_of_edges, deque_time, lazy_time, indexed_time,
+               times[0], times[1], times[2], wrong))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=5, help='point to point queries per graph')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, nargs=2, action='append', metavar=('VERTICES', 'EDGES'),
+                        help='graph size to run, can be repeated')
+    args = parser.parse_args()
+    run(args.size or DEFAULT_SIZES, args.queries, args.seed)
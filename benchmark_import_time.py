@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Time how long each module of the repo takes to import in a fresh
+interpreter, with python -X importtime, and list the packages outside the
+standard library that the import pulled in. Every module is imported
+--repeat times and the median is reported.
+
+The modules in STDLIB_ONLY must only load the standard library and the
+modules of the repo, and no module may load one of PLOTTING_PACKAGES, which
+graph_plotting only imports when a graph is drawn. The exit status is 1 if
+either rule is broken, or, with --baseline, if a module got slower to import
+than in an earlier JSON file by more than --tolerance and MIN_SLOWDOWN_MS.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+from statistics import median
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+STDLIB_ONLY = ['traversal', 'breadthFirstSearch', 'depthFirstSearch', 'depthFirstSearchRecursive', 'graph_plotting',
+               'graphs', 'bfs_shortest_path']
+PLOTTING_PACKAGES = {'networkx', 'matplotlib'}
+# Import times are noisy, a slowdown smaller than this is never a regression
+MIN_SLOWDOWN_MS = 2.0
+
+
+def repo_modules():
+    names = [os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(REPO, '*.py'))]
+    return sorted(name for name in names if not name.startswith(('benchmark_', 'test_')))
+
+
+def import_once(module):
+    """
+    Import module in a new interpreter.
+    :return: (cumulative import time in ms, sorted list of the top level packages loaded)
+    """
+    code = 'import sys, json, %s; print(json.dumps(sorted({name.split(".")[0] for name in sys.modules})))' % module
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                             cwd=REPO, capture_output=True, text=True)
+    if process.returncode:
+        raise ImportError("Importing %s failed: %s" % (module, process.stderr.strip().splitlines()[-1]))
+    cumulative = None
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split('|')
+        if line.startswith('import time:') and len(fields) == 3 and fields[2].strip() == module:
+            cumulative = int(fields[1]) / 1000
+    return cumulative, json.loads(process.stdout)
+
+
+def measure(module, repeat, local_modules):
+    times = []
+    for _ in range(repeat):
+        milliseconds, loaded = import_once(module)
+        times.append(milliseconds)
+    ignored = set(sys.stdlib_module_names) | set(sys.builtin_module_names) | local_modules
+    return {
+        'module': module,
+        'milliseconds': median(times),
+        'third_party': [name for name in loaded if name not in ignored and not name.startswith('_')],
+    }
+
+
+def problems(result):
+    """
+    :return: list of messages for the import rules the result breaks
+    """
+    messages = []
+    plotting = PLOTTING_PACKAGES & set(result['third_party'])
+    if plotting:
+        messages.append("%s imports %s" % (result['module'], ', '.join(sorted(plotting))))
+    if result['module'] in STDLIB_ONLY and result['third_party']:
+        messages.append("%s must only need the standard library, it imports %s" %
+                        (result['module'], ', '.join(result['third_party'])))
+    return messages
+
+
+def compare(results, baseline, tolerance):
+    """
+    :return: list of (result, baseline milliseconds) for every module that got slower to import
+    """
+    before = {result['module']: result['milliseconds'] for result in baseline['results']}
+    return [(result, before[result['module']]) for result in results
+            if result['module'] in before
+            and result['milliseconds'] > (1 + tolerance) * before[result['module']]
+            and result['milliseconds'] - before[result['module']] > MIN_SLOWDOWN_MS]
+
+
+def run(modules, repeat):
+    print("%-30s %10s  %s" % ('module', 'import ms', 'third party packages'))
+    local_modules = set(repo_modules())
+    results = []
+    for module in modules:
+        result = measure(module, repeat, local_modules)
+        results.append(result)
+        print("%-30s %10.1f  %s" % (module, result['milliseconds'], ', '.join(result['third_party']) or '-'))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', action='append', help='module to import, can be repeated, all of them if not given')
+    parser.add_argument('--repeat', type=int, default=5, help='imports per module')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='JSON results to compare the import times with')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='slowdown allowed against the baseline')
+    args = parser.parse_args()
+
+    results = run(args.module or repo_modules(), args.repeat)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'python': sys.version, 'platform': platform.platform(), 'repeat': args.repeat,
+                       'results': results}, output, indent=2)
+    failures = [message for result in results for message in problems(result)]
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            for result, before in compare(results, json.load(baseline_file), args.tolerance):
+                failures.append("%s takes %.1fms to import against %.1fms" %
+                                (result['module'], result['milliseconds'], before))
+    for message in failures:
+        print(message)
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Time Graph.find_k_shortest_paths for k up to 100 on random graphs with 10^5
+edges, against a plain Yen that runs a full Dijkstra for every spur vertex
+of every path. The number of spur searches and edges relaxed show how much
+of the work the shared heuristic, Lawler's spur start and the candidate
+bound save.
+"""
+
+import argparse
+from heapq import heappush, heappop
+from random import Random
+from time import perf_counter
+
+from graph_generators import random_graph
+from k_shortest_paths import SpurGraph
+from shortest_path import dijkstra, build_path
+
+DEFAULT_SIZES = [(25000, 100000)]
+DEFAULT_K = [1, 10, 50, 100]
+
+
+def plain_yen(graph, weights, start, end, k, stats):
+    """
+    Yen's algorithm as it is usually written, for comparison.
+    """
+    distances, parents = dijkstra(graph, weights, start, end, stats=stats)
+    if end not in distances:
+        return []
+    found = [(distances[end], build_path(parents, end))]
+    candidates = []
+    seen = {tuple(found[0][1])}
+    counter = 0
+    while len(found) < k:
+        path = found[-1][1]
+        for position in range(len(path) - 1):
+            spur, root = path[position], path[:position + 1]
+            root_cost = sum(weights[(root[i], root[i + 1])] for i in range(position))
+            blocked_edges = {found_path[position + 1] for _, found_path in found
+                             if len(found_path) > position + 1 and found_path[:position + 1] == root}
+            spur_graph = SpurGraph(graph, spur, set(root[:-1]), blocked_edges)
+            stats['spur_searches'] = stats.get('spur_searches', 0) + 1
+            distances, parents = dijkstra(spur_graph, weights, spur, end, stats=stats)
+            if end not in distances:
+                continue
+            new_path = root[:-1] + build_path(parents, end)
+            if tuple(new_path) not in seen:
+                seen.add(tuple(new_path))
+                counter += 1
+                heappush(candidates, (root_cost + distances[end], counter, new_path))
+        if not candidates:
+            break
+        cost, _, path = heappop(candidates)
+        found.append((cost, path))
+    return found
+
+
+def run(sizes, k_values, queries, seed, plain):
+    print("%10s %10s %5s %12s %10s %12s %12s %10s %12s" %
+          ('vertices', 'edges', 'k', 'yen', 'spurs', 'relaxed', 'plain yen', 'spurs', 'relaxed'))
+    random = Random(seed)
+    for number_of_vertices, number_of_edges in sizes:
+        graph = random_graph(number_of_vertices, number_of_edges, seed)
+        pairs = [(random.randrange(number_of_vertices), random.randrange(number_of_vertices)) for _ in range(queries)]
+        graph.reverse_graph
+        for k in k_values:
+            stats = {}
+            start_time = perf_counter()
+            for start, end in pairs:
+                paths = graph.find_k_shortest_paths(start, end, k, stats)
+            yen_time = (perf_counter() - start_time) / queries
+
+            plain_time, plain_stats = float('nan'), {}
+            if plain:
+                start_time = perf_counter()
+                for start, end in pairs:
+                    plain_paths = plain_yen(graph.graph, graph.weights, start, end, k, plain_stats)
+                plain_time = (perf_counter() - start_time) / queries
+                if [cost for cost, _ in plain_paths] != [cost for cost, _ in paths]:
+                    print("Path costs differ for k=%d" % k)
+
+            print("%10d %10d %5d %11.3fs %10d %12d %11.3fs %10d %12d" %
+                  (number_of_vertices, number_of_edges, k, yen_time, stats.get('spur_searches', 0) // queries,
+                   stats.get('relaxed', 0) // queries, plain_time, plain_stats.get('spur_searches', 0) // queries,
+                   plain_stats.get('relaxed', 0) // queries))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--k', type=int, action='append', help='number of paths, can be repeated')
+    parser.add_argument('--queries', type=int, default=3, help='vertex pairs per graph')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-plain', action='store_true', help='skip the plain Yen comparison')
+    parser.add_argument('--size', type=int, nargs=2, action='append', metavar=('VERTICES', 'EDGES'),
+                        help='graph size to run, can be repeated')
+    args = parser.parse_args()
+    run(args.size or DEFAULT_SIZES, args.k or DEFAULT_K, args.queries, args.seed, not args.no_plain)
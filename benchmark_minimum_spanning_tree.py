@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Time Kruskal against Prim from minimum_spanning_tree on random graphs with
+the same number of vertices and an increasing number of edges, from a tree
+up to a nearly complete graph, and report which one wins at each density.
+Density is the number of edges over V * (V - 1).
+"""
+
+import argparse
+from time import perf_counter
+
+from graph_generators import random_graph
+from minimum_spanning_tree import kruskal, prim
+
+DEFAULT_EDGES_PER_VERTEX = [1, 4, 16, 64, 256, 1024]
+
+
+def run(number_of_vertices, edges_per_vertex, seed):
+    print("%10s %10s %9s %10s %10s %8s" % ('vertices', 'edges', 'density', 'kruskal', 'prim', 'winner'))
+    for per_vertex in edges_per_vertex:
+        number_of_edges = min(per_vertex * number_of_vertices, number_of_vertices * (number_of_vertices - 1))
+        graph = random_graph(number_of_vertices, max(number_of_edges, number_of_vertices - 1), seed)
+        times = []
+        weights = []
+        for algorithm in (kruskal, prim):
+            start_time = perf_counter()
+            tree = algorithm(graph)
+            times.append(perf_counter() - start_time)
+            weights.append(sum(weight for _, _, weight in tree))
+        if weights[0] != weights[1]:
+            print("The trees have different weights: %s" % weights)
+        print("%10d %10d %9.4f %9.3fs %9.3fs %8s" %
+              (number_of_vertices, number_of_edges, number_of_edges / (number_of_vertices * (number_of_vertices - 1)),
+               times[0], times[1], 'kruskal' if times[0] < times[1] else 'prim'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vertices', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--edges-per-vertex', type=int, action='append', help='average out degree, can be repeated')
+    args = parser.parse_args()
+    run(args.vertices, args.edges_per_vertex or DEFAULT_EDGES_PER_VERTEX, args.seed)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shortest path engines of the repo against each other on the
+same seeded graphs:
+
+    graph               graphs.Graph.find_shortest_path
+    dijkstra_algorithm  dijkstra_algorithm.dijkstra, which scans every
+                        vertex it has reached for the next one to settle
+    algo_expert         algo_expert_dijkstra.dijkstra_algorithm, the whole
+                        table from the start with the indexed min heap
+    bellman_ford        bellman_ford.Graph.shortest_distances
+
+on grids, Erdős–Rényi, power law and road like graphs from graph_generators.
+For every graph and engine it reports the time to build the engine's graph,
+the median, 90th and 99th percentile and maximum latency of a batch of
+random point to point queries, and the peak memory traced while building it
+and answering the first MEMORY_QUERIES queries. The cost every engine finds
+for every query is checked against the first engine, dijkstra_algorithm and
+bellman_ford are slow on large graphs so they are only run up to
+--slow-limit vertices.
+
+With --json the results are also written as JSON, and with --baseline the
+median latencies are compared with an earlier JSON file. The exit status is
+1 if any engine got slower by more than --tolerance or if the engines
+disagree on a cost.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from math import isqrt
+from random import Random
+from time import perf_counter
+
+import dijkstra_algorithm
+from algo_expert_dijkstra import dijkstra_algorithm as algo_expert_dijkstra
+from bellman_ford import Edge, Graph as BellmanFordGraph
+from graph_generators import erdos_renyi_edges, graph_from_edges, grid_edges, power_law_edges, road_edges
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+SLOW_LIMIT = 5000
+# The queries answered in the traced run
+MEMORY_QUERIES = 5
+PERCENTILES = (50, 90, 99)
+
+# name -> function returning the edges of a graph with about size vertices
+GRAPHS = {
+    'grid': lambda size, seed: grid_edges(isqrt(size), isqrt(size), seed),
+    'erdos_renyi': lambda size, seed: erdos_renyi_edges(size, 4 * size, seed),
+    'power_law': lambda size, seed: power_law_edges(size, 2, seed),
+    'road': lambda size, seed: road_edges(isqrt(size), isqrt(size), seed),
+}
+
+
+def path_cost(weights, path):
+    if not path:
+        return float('inf')
+    return sum(weights[(path[index], path[index + 1])] for index in range(len(path) - 1))
+
+
+def build_graph(number_of_vertices, edges):
+    graph = graph_from_edges(edges)
+    return lambda start, end: path_cost(graph.weights, graph.find_shortest_path(start, end))
+
+
+def build_dijkstra_algorithm(number_of_vertices, edges):
+    graph = dijkstra_algorithm.Graph()
+    for source, destination, weight in edges:
+        graph.add_edge(source, destination, weight)
+
+    def query(start, end):
+        path = dijkstra_algorithm.dijkstra(graph, start, end)
+        # A string when there is no route
+        return path_cost(graph.weights, path) if isinstance(path, list) else float('inf')
+    return query
+
+
+def build_algo_expert(number_of_vertices, edges):
+    adjacency = [[] for _ in range(number_of_vertices)]
+    for source, destination, weight in edges:
+        adjacency[source].append([destination, weight])
+
+    def query(start, end):
+        cost = algo_expert_dijkstra(start, adjacency)[end]
+        return float('inf') if cost == -1 else cost
+    return query
+
+
+def build_bellman_ford(number_of_vertices, edges):
+    graph = BellmanFordGraph([Edge(*edge) for edge in edges], number_of_vertices)
+    return lambda start, end: graph.shortest_distances(start)[0][end]
+
+
+# name -> (function building a query(start, end) callable that returns the cost, slow)
+ENGINES = {
+    'graph': (build_graph, False),
+    'dijkstra_algorithm': (build_dijkstra_algorithm, True),
+    'algo_expert': (build_algo_expert, False),
+    'bellman_ford': (build_bellman_ford, True),
+}
+
+
+def percentile(sorted_values, percent):
+    """
+    Nearest rank percentile of a sorted list.
+    """
+    rank = max(1, -(-percent * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def measure(engine, number_of_vertices, edges, queries):
+    """
+    :return: (result dictionary, list of the cost of every query)
+    """
+    build = ENGINES[engine][0]
+    start_time = perf_counter()
+    query = build(number_of_vertices, edges)
+    build_time = perf_counter() - start_time
+
+    costs = []
+    latencies = []
+    for start, end in queries:
+        start_time = perf_counter()
+        costs.append(query(start, end))
+        latencies.append(perf_counter() - start_time)
+    del query
+    latencies.sort()
+
+    tracemalloc.start()
+    query = build(number_of_vertices, edges)
+    for start, end in queries[:MEMORY_QUERIES]:
+        query(start, end)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = {
+        'engine': engine,
+        'build_seconds': build_time,
+        'queries': len(queries),
+        'queries_per_sec': len(latencies) / sum(latencies) if sum(latencies) else float('inf'),
+        'max_seconds': latencies[-1] if latencies else 0.0,
+        'peak_bytes': peak,
+    }
+    for percent in PERCENTILES:
+        result['p%d_seconds' % percent] = percentile(latencies, percent) if latencies else 0.0
+    return result, costs
+
+
+def compare(results, baseline, tolerance):
+    """
+    :return: list of (result, baseline median) for every run whose median latency
+             is more than tolerance above the baseline
+    """
+    key = lambda result: (result['graph'], result['vertices'], result['engine'])
+    before = {key(result): result['p50_seconds'] for result in baseline['results']}
+    return [(result, before[key(result)]) for result in results
+            if key(result) in before and result['p50_seconds'] > (1 + tolerance) * before[key(result)]]
+
+
+def run(sizes, graphs, engines, number_of_queries, seed, slow_limit):
+    print("%-12s %9s %9s %-19s %9s %10s %10s %10s %10s %10s" %
+          ('graph', 'vertices', 'edges', 'engine', 'build', 'p50', 'p90', 'p99', 'max', 'peak MiB'))
+    results = []
+    mismatches = 0
+    for size in sizes:
+        for graph in graphs:
+            edges = GRAPHS[graph](size, seed)
+            number_of_vertices = 1 + max(max(source, destination) for source, destination, _ in edges)
+            sources = sorted({source for source, _, _ in edges})
+            random = Random(seed)
+            queries = [(random.choice(sources), random.choice(sources)) for _ in range(number_of_queries)]
+            reference = None
+            for engine in engines:
+                if ENGINES[engine][1] and number_of_vertices > slow_limit:
+                    continue
+                result, costs = measure(engine, number_of_vertices, edges, queries)
+                result.update(graph=graph, vertices=number_of_vertices, edges=len(edges))
+                if reference is None:
+                    reference = (engine, costs)
+                else:
+                    wrong = [index for index, (cost, expected) in enumerate(zip(costs, reference[1]))
+                             if cost != expected]
+                    result['mismatches'] = len(wrong)
+                    mismatches += len(wrong)
+                    for index in wrong[:3]:
+                        print("%s and %s disagree from %s to %s: %s against %s" %
+                              (engine, reference[0], queries[index][0], queries[index][1],
+                               costs[index], reference[1][index]))
+                results.append(result)
+                print("%-12s %9d %9d %-19s %8.3fs %9.2fms %9.2fms %9.2fms %9.2fms %10.1f" %
+                      (graph, number_of_vertices, len(edges), engine, result['build_seconds'],
+                       1000 * result['p50_seconds'], 1000 * result['p90_seconds'],
+                       1000 * result['p99_seconds'], 1000 * result['max_seconds'],
+                       result['peak_bytes'] / 2 ** 20))
+    return results, mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, action='append', help='approximate number of vertices, can be repeated')
+    parser.add_argument('--graph', choices=sorted(GRAPHS), action='append', help='can be repeated')
+    parser.add_argument('--engine', choices=sorted(ENGINES), action='append', help='can be repeated')
+    parser.add_argument('--queries', type=int, default=20, help='point to point queries per graph')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slow-limit', type=int, default=SLOW_LIMIT,
+                        help='largest graph for dijkstra_algorithm and bellman_ford')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='JSON results to compare the median latencies with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown allowed against the baseline')
+    args = parser.parse_args()
+
+    results, mismatches = run(args.size or DEFAULT_SIZES, args.graph or list(GRAPHS), args.engine or list(ENGINES),
+                              args.queries, args.seed, args.slow_limit)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'python': sys.version, 'platform': platform.platform(), 'seed': args.seed,
+                       'queries': args.queries, 'results': results}, output, indent=2)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for result, before in regressions:
+            print("Regression: %s on %s with %d vertices, median %.2fms against %.2fms" %
+                  (result['engine'], result['graph'], result['vertices'],
+                   1000 * result['p50_seconds'], 1000 * before))
+    if mismatches:
+        print("%d costs disagree" % mismatches)
+    if regressions or mismatches:
+        sys.exit(1)
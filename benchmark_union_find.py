@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark the four union find implementations, QuickFind, QuickUnion, DSU
+and UnionFind, on reproducible workloads from 10^3 to 10^7 elements:
+
+    random       unions of random pairs
+    chain        the unions (i, i + 1) in order for half of the operations,
+                 which builds the deepest trees it can, then connectivity
+                 queries from element 0
+    hot_keys     half unions and half queries, one end of each drawn from a
+                 skewed distribution so a few elements are in most operations
+    query_heavy  one union for every nine connectivity queries, random pairs
+
+Every run makes as many operations as there are elements and reports the
+operations per second, from the best of enough runs to take MIN_SECONDS,
+the peak memory traced while the structure is built and the operations run,
+and the maximum and mean depth of the trees left at the end. QuickFind and
+QuickUnion are quadratic on some of the workloads, so they are only run up
+to --quadratic-limit elements.
+
+With --json the results are also written as JSON, and with --baseline the
+operations per second are compared with an earlier JSON file, the exit
+status is 1 if any run got slower by more than --tolerance.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from array import array
+from random import Random
+from time import perf_counter
+
+from disjoint_set_union import DSU
+from quick_find import QuickFind
+from quick_union import QuickUnion
+from union_find import UnionFind
+
+UNION = 0
+CONNECTED = 1
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+QUADRATIC_LIMIT = 10 ** 4
+# Small runs are repeated until they have taken this long, and the best time is kept
+MIN_SECONDS = 0.5
+
+
+def random_unions(number, operations, random):
+    for _ in range(operations):
+        yield UNION, random.randrange(number), random.randrange(number)
+
+
+def chain(number, operations, random):
+    unions = min(number - 1, operations // 2)
+    for index in range(unions):
+        yield UNION, index, index + 1
+    for _ in range(operations - unions):
+        yield CONNECTED, 0, random.randrange(number)
+
+
+def hot_keys(number, operations, random):
+    for _ in range(operations):
+        # Log uniform, so the small elements are the hot ones
+        hot = int(number ** random.random()) - 1
+        yield UNION if random.random() < 0.5 else CONNECTED, hot, random.randrange(number)
+
+
+def query_heavy(number, operations, random):
+    for _ in range(operations):
+        yield UNION if random.random() < 0.1 else CONNECTED, random.randrange(number), random.randrange(number)
+
+
+WORKLOADS = {
+    'random': random_unions,
+    'chain': chain,
+    'hot_keys': hot_keys,
+    'query_heavy': query_heavy,
+}
+
+
+def generate(workload, number, operations, seed):
+    """
+    The operations of a workload as compact arrays.
+    :return: (kinds, firsts, seconds)
+    """
+    kinds, firsts, seconds = bytearray(), array('q'), array('q')
+    for kind, first, second in WORKLOADS[workload](number, operations, Random(seed)):
+        kinds.append(kind)
+        firsts.append(first)
+        seconds.append(second)
+    return kinds, firsts, seconds
+
+
+# name -> (class, quadratic, function returning the (union, connected) callables of an instance)
+BACKENDS = {
+    'quick_find': (QuickFind, True, lambda uf: (uf.unite, uf.find)),
+    'quick_union': (QuickUnion, True, lambda uf: (uf.unite, uf.find)),
+    'dsu': (DSU, False, lambda uf: (uf.union, lambda p, q: uf.find(p) == uf.find(q))),
+    'union_find': (UnionFind, False, lambda uf: (uf.union, lambda p, q: uf.find(p) == uf.find(q))),
+}
+
+
+def parents_of(uf):
+    """
+    The parent array of any of the backends, QuickFind's ids are a forest of depth at most 1.
+    """
+    for name in ('union_find', 'par', 'id'):
+        if hasattr(uf, name):
+            return getattr(uf, name)
+    raise ValueError("Unknown union find %s" % type(uf).__name__)
+
+
+def tree_depths(parents):
+    """
+    :return: (maximum depth, mean depth) of the forest, a root has a depth of 0
+    """
+    depths = [-1] * len(parents)
+    for index in range(len(parents)):
+        path = []
+        vertex = index
+        while depths[vertex] < 0 and parents[vertex] != vertex:
+            path.append(vertex)
+            vertex = parents[vertex]
+        if depths[vertex] < 0:
+            depths[vertex] = 0
+        depth = depths[vertex]
+        for vertex in reversed(path):
+            depth += 1
+            depths[vertex] = depth
+    return max(depths, default=0), sum(depths) / len(depths) if depths else 0.0
+
+
+def run_operations(backend, number, kinds, firsts, seconds):
+    cls, _, callables = BACKENDS[backend]
+    uf = cls(number)
+    union, connected = callables(uf)
+    for kind, first, second in zip(kinds, firsts, seconds):
+        if kind:
+            connected(first, second)
+        else:
+            union(first, second)
+    return uf
+
+
+def measure(backend, workload, number, operations, seed, memory):
+    kinds, firsts, seconds = generate(workload, number, operations, seed)
+    elapsed = float('inf')
+    total = 0.0
+    while total < MIN_SECONDS:
+        start_time = perf_counter()
+        uf = run_operations(backend, number, kinds, firsts, seconds)
+        run_time = perf_counter() - start_time
+        elapsed = min(elapsed, run_time)
+        total += run_time
+    max_depth, mean_depth = tree_depths(parents_of(uf))
+    del uf
+
+    peak = None
+    if memory:
+        # A second run, tracemalloc slows every allocation down
+        tracemalloc.start()
+        run_operations(backend, number, kinds, firsts, seconds)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        'backend': backend,
+        'workload': workload,
+        'elements': number,
+        'operations': operations,
+        'seconds': elapsed,
+        'ops_per_sec': operations / elapsed,
+        'peak_bytes': peak,
+        'max_depth': max_depth,
+        'mean_depth': mean_depth,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    :return: list of (result, baseline ops/sec) for every run slower than the baseline by more than tolerance
+    """
+    key = lambda result: (result['backend'], result['workload'], result['elements'])
+    before = {key(result): result['ops_per_sec'] for result in baseline['results']}
+    return [(result, before[key(result)]) for result in results
+            if key(result) in before and result['ops_per_sec'] < (1 - tolerance) * before[key(result)]]
+
+
+def run(sizes, backends, workloads, seed, quadratic_limit, memory):
+    print("%-12s %-12s %10s %14s %12s %10s %10s" %
+          ('backend', 'workload', 'elements', 'ops/sec', 'peak MiB', 'max depth', 'mean depth'))
+    results = []
+    for number in sizes:
+        for workload in workloads:
+            for backend in backends:
+                if BACKENDS[backend][1] and number > quadratic_limit:
+                    continue
+                result = measure(backend, workload, number, number, seed, memory)
+                results.append(result)
+                peak = '%12.1f' % (result['peak_bytes'] / 2 ** 20) if memory else '%12s' % '-'
+                print("%-12s %-12s %10d %14.0f %s %10d %10.2f" %
+                      (backend, workload, number, result['ops_per_sec'], peak,
+                       result['max_depth'], result['mean_depth']))
+
+    print("\nFastest backend")
+    for number in sizes:
+        for workload in workloads:
+            runs = [result for result in results if result['elements'] == number and result['workload'] == workload]
+            if runs:
+                best = max(runs, key=lambda result: result['ops_per_sec'])
+                print("%-12s %10d %-12s" % (workload, number, best['backend']))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, action='append', help='number of elements, can be repeated')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), action='append', help='can be repeated')
+    parser.add_argument('--workload', choices=sorted(WORKLOADS), action='append', help='can be repeated')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--quadratic-limit', type=int, default=QUADRATIC_LIMIT,
+                        help='largest size for quick_find and quick_union')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced memory run')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='JSON results to compare the operations per second with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown allowed against the baseline')
+    args = parser.parse_args()
+
+    results = run(args.size or DEFAULT_SIZES, args.backend or list(BACKENDS), args.workload or list(WORKLOADS),
+                  args.seed, args.quadratic_limit, not args.no_memory)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'python': sys.version, 'platform': platform.platform(), 'seed': args.seed,
+                       'results': results}, output, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for result, before in regressions:
+            print("Regression: %s %s %d elements, %.0f ops/sec against %.0f" %
+                  (result['backend'], result['workload'], result['elements'], result['ops_per_sec'], before))
+        if regressions:
+            sys.exit(1)
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
-from collections import defaultdict, deque
+from collections import defaultdict
+
+from bfs_tree import BreadthFirstSearchTree
+from graphs import Graph
 
 # Pseudocode
 """
@@ -24,44 +27,16 @@ from collections import defaultdict, deque
 # Function to find the shortest path between two nodes of an undirected graph. Make sure that the
 # nodes are setup with neighbors in both directions i.e. if there is a connection from 1->2 then there
 # also needs to be a connection from 2->1.
+# The search itself is done by a BreadthFirstSearchTree, which keeps a parent pointer per node and
+# a set of discovered nodes instead of copying the path for every neighbor, see the pseudocode above
+# for the path copying version. To look up many destinations from the same start, build one
+# BreadthFirstSearchTree(bfs_graph, start) and call path_to() on it for each destination.
 def BreadthFirstSearchShortestPath(bfs_graph, start, end):
     # If the desired node is reached, i.e. start is also the end, we're done
     if start == end:
         return [start]
 
-    visited = []
-
-    # Queue for traversing the graph in the BFS. Use a deque since this is a queue and a deque popleft()
-    # has a time complexity of O(1) vs. O(n-k), where n=length of the list and k is the index being
-    # popped, for a normal list.
-    queue = deque()
-    queue.append([start])
-
-    # Loop to traverse the graph with the help of the queue which contains lists starting
-    # from the start node with all neighbors of neighbors appended to it.
-    while queue:
-        bfs_path = queue.popleft()
-        node = bfs_path[-1]
-
-        # Condition to check if the current node is not visited
-        if node not in visited:
-            neighbors = bfs_graph[node]
-
-            # Loop to iterate over the neighbours of the node. For each new neighbor
-            # add them to the current bfs_path, the path we popped from the queue,
-            # so that the nodes can be checked if they have not already been visited.
-            for neighbor in neighbors:
-                new_path = list(bfs_path)
-                new_path.append(neighbor)
-                queue.append(new_path)
-
-                # Condition to check if the neighbour node is the end
-                if neighbor == end:
-                    return new_path
-            visited.append(node)
-
-    # Condition when the nodes are not connected
-    return []
+    return BreadthFirstSearchTree(bfs_graph, start, end).path_to(end)
 
 
 # For an undirected graph we need to make sure that we show connections
@@ -121,10 +96,12 @@ if __name__ == "__main__":
     print("Shortest path for 6->9: %s" % BreadthFirstSearchShortestPath(graph2, 6, 9))
 
     print("Checking bank transfers:")
+    # Check all of the transfers in one batch, every bank is only searched from once
+    transfer_pairs = [(transfer[FROM_BANK], transfer[TO_BANK]) for transfer in BANK_TRANSFER_DATA]
+    transfer_paths = Graph(graph2).find_shortest_paths(transfer_pairs)
     transfer_succeeds = False
-    for transfer in BANK_TRANSFER_DATA:
+    for transfer, (_, _, path) in zip(BANK_TRANSFER_DATA, transfer_paths):
         # print("from=%s to=%s threshold=%s" % (transfer[FROM_BANK],transfer[TO_BANK],transfer[THRESHOLD]))
-        path = BreadthFirstSearchShortestPath(graph2, transfer[FROM_BANK], transfer[TO_BANK])
         if len(path) <= transfer[THRESHOLD]:
             transfer_succeeds = True
         else:
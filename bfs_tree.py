@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+from collections import deque
+
+
+class BreadthFirstSearchTree:
+    """
+    BreadthFirstSearchTree runs a single breadth first search from start and
+    keeps the result, so that one traversal can answer the shortest path and
+    hop distance for many destinations.
+    Rather than putting whole paths on the queue, every vertex is marked in a
+    set when it is first discovered and only a pointer to the vertex it was
+    discovered from is kept. A path is rebuilt from the parent pointers when
+    it is asked for, so the search is O(V+E) in time and O(V) in space.
+    If end is given, the search stops as soon as end is discovered and the
+    tree only covers the part of the graph that was searched.
+    """
+    def __init__(self, graph, start, end=None, stats=None):
+        """
+        :param graph: dictionary of vertex -> list of neighbors
+        :param start:
+        :param end: If not None, stop once end has been discovered
+        :param stats: optional dictionary to add the number of vertices popped to
+        """
+        self.start = start
+        self.distances = {start: 0}
+        self.parents = {start: None}
+
+        popped = 0
+        queue = deque([start])
+        distances, parents = self.distances, self.parents
+        while queue and end not in parents:
+            vertex = queue.popleft()
+            popped += 1
+            hops = distances[vertex] + 1
+            for neighbor in graph.get(vertex, ()):
+                if neighbor not in parents:
+                    parents[neighbor] = vertex
+                    distances[neighbor] = hops
+                    if neighbor == end:
+                        break
+                    queue.append(neighbor)
+
+        if stats is not None:
+            stats['popped'] = stats.get('popped', 0) + popped
+
+    def __contains__(self, vertex):
+        return vertex in self.parents
+
+    def distance(self, vertex):
+        """
+        The number of hops from start to vertex, infinite if it was not reached.
+        """
+        return self.distances.get(vertex, float('inf'))
+
+    def path_to(self, end):
+        """
+        Rebuild the shortest path from start to end from the parent pointers.
+        :param end:
+        :return: list of vertices, empty if end was not reached
+        """
+        if end not in self.parents:
+            return []
+        path = []
+        current = end
+        while current is not None:
+            path.append(current)
+            current = self.parents[current]
+        path.reverse()
+        return path
+
+    @property
+    def tree(self):
+        """
+        The BFS tree as a dictionary of vertex -> list of children, in the
+        order they were discovered.
+        """
+        children = {vertex: [] for vertex in self.parents}
+        for vertex, parent in self.parents.items():
+            if parent is not None:
+                children[parent].append(vertex)
+        return children
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+from heapq import heappush, heappop
+
+"""
+Bidirectional versions of the point to point searches in graphs.Graph. One
+search runs forward from start over the graph and one runs backward from end
+over the reverse graph, i.e. a dictionary of vertex -> list of predecessors.
+They stop when the two searches meet, so on a large sparse graph each side
+only explores a ball of about half the radius of a one sided search.
+
+Both return the path from start to end, or an empty list if there is none.
+The path always has the same length/cost as the one sided search, but when
+there is more than one shortest path they may pick different ones. If a
+stats dictionary is passed in, the number of vertices popped by both sides
+and the number of edges relaxed are added to it.
+"""
+
+
+def join_paths(forward_parents, backward_parents, meeting):
+    """
+    Build the path start -> meeting from the forward parents, then meeting -> end
+    from the backward parents, whose parent pointers lead towards end.
+    """
+    path = []
+    current = meeting
+    while current is not None:
+        path.append(current)
+        current = forward_parents[current]
+    path.reverse()
+    current = backward_parents[meeting]
+    while current is not None:
+        path.append(current)
+        current = backward_parents[current]
+    return path
+
+
+def bidirectional_bfs(graph, reverse_graph, start, end, stats=None):
+    """
+    Breadth first search from both ends, always expanding one whole level of
+    the side with the smaller frontier.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param reverse_graph: dictionary of vertex -> list of predecessors
+    :param start:
+    :param end:
+    :param stats: optional dictionary to add the counters to
+    :return: The shortest path as a list of vertices
+    """
+    if start == end:
+        return [start]
+
+    forward_parents, backward_parents = {start: None}, {end: None}
+    forward_frontier, backward_frontier = [start], [end]
+    popped = relaxed = 0
+    meeting = None
+    while forward_frontier and backward_frontier and meeting is None:
+        if len(forward_frontier) <= len(backward_frontier):
+            adjacency, parents, others, frontier = graph, forward_parents, backward_parents, forward_frontier
+        else:
+            adjacency, parents, others, frontier = reverse_graph, backward_parents, forward_parents, backward_frontier
+        next_frontier = []
+        # Finish the whole level, every meeting vertex found in it gives a path of the same length
+        for vertex in frontier:
+            popped += 1
+            for neighbor in adjacency.get(vertex, ()):
+                relaxed += 1
+                if neighbor not in parents:
+                    parents[neighbor] = vertex
+                    if meeting is None and neighbor in others:
+                        meeting = neighbor
+                    next_frontier.append(neighbor)
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    if stats is not None:
+        stats['popped'] = stats.get('popped', 0) + popped
+        stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+    if meeting is None:
+        return []
+    return join_paths(forward_parents, backward_parents, meeting)
+
+
+def bidirectional_dijkstra(graph, reverse_graph, weights, start, end, stats=None):
+    """
+    Dijkstra from both ends, popping from whichever queue has the smaller
+    minimum. The backward search reads the cost of the edge (u, v) from weights
+    when it goes from v to u. The best path seen so far, over any edge joining
+    the two searches, is final once the two queue minimums add up to at
+    least its cost.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param reverse_graph: dictionary of vertex -> list of predecessors
+    :param weights: dictionary of (src, dst) -> cost, must not be negative
+    :param start:
+    :param end:
+    :param stats: optional dictionary to add the counters to
+    :return: The shortest path as a list of vertices
+    """
+    if start == end:
+        return [start]
+
+    forward_distances, backward_distances = {start: 0}, {end: 0}
+    forward_parents, backward_parents = {start: None}, {end: None}
+    forward_settled, backward_settled = set(), set()
+    forward_heap, backward_heap = [(0, 0, start)], [(0, 0, end)]
+    counter = 0
+    popped = relaxed = 0
+    best_cost, meeting = float('inf'), None
+    while forward_heap and backward_heap:
+        if forward_heap[0][0] + backward_heap[0][0] >= best_cost:
+            break
+        forward = forward_heap[0][0] <= backward_heap[0][0]
+        if forward:
+            heap, adjacency, distances, parents, settled = \
+                forward_heap, graph, forward_distances, forward_parents, forward_settled
+            other_distances = backward_distances
+        else:
+            heap, adjacency, distances, parents, settled = \
+                backward_heap, reverse_graph, backward_distances, backward_parents, backward_settled
+            other_distances = forward_distances
+
+        distance, _, vertex = heappop(heap)
+        if vertex in settled:
+            continue
+        settled.add(vertex)
+        popped += 1
+        for neighbor in adjacency.get(vertex, ()):
+            new_distance = distance + (weights[(vertex, neighbor)] if forward else weights[(neighbor, vertex)])
+            relaxed += 1
+            if neighbor not in distances or new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                parents[neighbor] = vertex
+                counter += 1
+                heappush(heap, (new_distance, counter, neighbor))
+            if neighbor in other_distances and distances[neighbor] + other_distances[neighbor] < best_cost:
+                best_cost = distances[neighbor] + other_distances[neighbor]
+                meeting = neighbor
+
+    if stats is not None:
+        stats['popped'] = stats.get('popped', 0) + popped
+        stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+    if meeting is None:
+        return []
+    return join_paths(forward_parents, backward_parents, meeting)
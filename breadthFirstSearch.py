@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import networkx as nx
-import matplotlib.pylab as plt
+from collections import deque
+
+from graph_plotting import draw_graph
 
 graph = {'A': ['D', 'C', 'B'],
          'B': 'E',
@@ -14,9 +15,9 @@ graph = {'A': ['D', 'C', 'B'],
 # Time: O(V+E), space: O(V)
 def breadthFirstSearch(graph, source):
     array = []
-    queue = [source]
+    queue = deque([source])
     while len(queue) > 0:
-        s = queue.pop(0)
+        s = queue.popleft()
         array.append(s)
         if s not in graph:
             continue
@@ -29,9 +30,4 @@ def breadthFirstSearch(graph, source):
 if __name__ == '__main__':
     results = breadthFirstSearch(graph, "A")
     print(results)
-    G = nx.Graph(graph)
-    pos = nx.spring_layout(G)
-    nx.draw_networkx_nodes(G, pos)
-    nx.draw_networkx_edges(G, pos)
-    nx.draw_networkx_labels(G, pos)
-    plt.show()
+    draw_graph(graph)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from heapq import heapify
+
+from union_find import UnionFind
+
+"""
+A UnionFind whose parents and ranks are NumPy arrays, with bulk operations
+that take whole arrays of elements, so connectivity over a very large edge
+list costs a handful of vectorized operations per chunk instead of a Python
+call per edge.
+
+union_many works in rounds. Each round finds the roots of both ends of every
+edge that still joins two sets and links one root of each pair under the
+other, the lower (rank, -index) under the higher, the same rule the scalar
+union uses with ties broken by index. All of the links in a round go up the
+same strict order, so they cannot make a cycle even when one root is linked
+in several pairs at once; only one of those links survives and the edge
+comes back the next round. The roots that were linked are then made to point
+at their new roots by pointer jumping over just those roots, so the trees
+stay shallow. Every round links at least one pair of roots, and in practice
+a few rounds finish a chunk.
+
+The sizes, the member lists and the number of sets are updated with
+vectorized operations as well. The roots whose sets grew are only put on the
+largest heap when largest_components is next called, so the Python work for
+it is per root that is still a root then, not per edge.
+
+The sets are the same as the ones the scalar union and find would give, and
+they can be mixed freely with union_many and find_many. The element chosen
+as the root of a set can differ, because the scalar union links roots one
+edge at a time.
+
+NumPy is required for BulkUnionFind, BULK_AVAILABLE says whether it can be used.
+"""
+
+BULK_AVAILABLE = np is not None
+
+# The number of edges union_many works on at a time, which bounds its temporary memory
+CHUNK_SIZE = 1 << 20
+
+
+class BulkUnionFind(UnionFind):
+    """
+    BulkUnionFind is a UnionFind backed by NumPy arrays, with union_many and
+    find_many for arrays of elements. The scalar union and find work on the
+    same arrays.
+    """
+    def __init__(self, number):
+        if np is None:
+            raise ImportError("BulkUnionFind needs numpy")
+        self.index_type = np.int32 if number < 2 ** 31 else np.int64
+        self.union_find = np.arange(number, dtype=self.index_type)
+        # Union by rank keeps the rank below log2(number), so one byte is enough
+        self.ranks = np.zeros(number, dtype=np.int8)
+        self.sizes = np.ones(number, dtype=np.int64)
+        self.next_member = np.arange(number, dtype=self.index_type)
+        self.num_components = number
+        self.largest = []
+        # Arrays of the roots that grew in union_many since the heap was last brought up to date
+        self.grown = []
+
+    def __len__(self):
+        return len(self.union_find)
+
+    def __indexes__(self, indexes):
+        indexes = np.asarray(indexes)
+        if not len(indexes):
+            return indexes.astype(self.index_type)
+        if indexes.dtype.kind not in 'iu':
+            raise ValueError("The elements must be integers")
+        if (indexes.min() < 0 or indexes.max() >= len(self.union_find)):
+            raise ValueError("Invalid element, must be from 0 to %d" % (len(self.union_find) - 1))
+        return indexes.astype(self.index_type, copy=False)
+
+    def find(self, index):
+        return int(UnionFind.find(self, index))
+
+    def size(self, index):
+        return int(UnionFind.size(self, index))
+
+    def members(self, index):
+        for member in UnionFind.members(self, index):
+            yield int(member)
+
+    def __refresh_largest__(self):
+        if not self.grown:
+            return
+        roots = np.unique(np.concatenate(self.grown))
+        self.grown = []
+        roots = roots[self.union_find[roots] == roots]
+        self.largest.extend(zip((-self.sizes[roots]).tolist(), roots.tolist()))
+        heapify(self.largest)
+        self.__compact_largest__()
+
+    def largest_components(self, k, min_size=1):
+        return [(int(root), int(size)) for root, size in UnionFind.largest_components(self, k, min_size)]
+
+    def __roots__(self, indexes):
+        """
+        The roots of a validated array of elements, with the path of every
+        element compressed to point straight at its root.
+        """
+        parents = self.union_find
+        roots = parents[indexes]
+        while True:
+            grandparents = parents[roots]
+            if np.array_equal(grandparents, roots):
+                break
+            roots = grandparents
+        parents[indexes] = roots
+        return roots
+
+    def find_many(self, indexes):
+        """
+        Find the root of every element, compressing their paths on the way.
+        :param indexes: array of elements
+        :return: NumPy array of roots, in the same order
+        """
+        return self.__roots__(self.__indexes__(indexes))
+
+    def union_many(self, firsts, seconds):
+        """
+        Union every firsts[i] with seconds[i].
+        :param firsts: array of elements
+        :param seconds: array of elements, the same length as firsts
+        :return: None
+        """
+        firsts, seconds = self.__indexes__(firsts), self.__indexes__(seconds)
+        if len(firsts) != len(seconds):
+            raise ValueError("There must be a second element for every first element")
+        for start in range(0, len(firsts), CHUNK_SIZE):
+            self.__union_chunk__(firsts[start:start + CHUNK_SIZE], seconds[start:start + CHUNK_SIZE])
+
+    def __union_chunk__(self, firsts, seconds):
+        parents, ranks = self.union_find, self.ranks
+        while len(firsts):
+            first_roots, second_roots = self.__roots__(firsts), self.__roots__(seconds)
+            different = first_roots != second_roots
+            firsts, seconds = first_roots[different], second_roots[different]
+            if not len(firsts):
+                break
+
+            first_ranks, second_ranks = ranks[firsts], ranks[seconds]
+            first_lower = (first_ranks < second_ranks) | ((first_ranks == second_ranks) & (firsts > seconds))
+            children = np.where(first_lower, firsts, seconds)
+            new_parents = np.where(first_lower, seconds, firsts)
+            # A root in more than one pair keeps one of its new parents, the last one written
+            parents[children] = new_parents
+            linked = parents[children] == new_parents
+            ties = linked & (ranks[children] == ranks[new_parents])
+            ranks[new_parents[ties]] += 1
+
+            # Pointer jumping over the linked roots, until each one points at a root
+            linked_roots = np.unique(children)
+            while True:
+                grandparents = parents[parents[linked_roots]]
+                if np.array_equal(grandparents, parents[linked_roots]):
+                    break
+                parents[linked_roots] = grandparents
+            self.__merged__(linked_roots, parents[linked_roots])
+
+    def __merged__(self, children, roots):
+        """
+        Update the sizes, member lists and number of sets after each of the
+        old roots children was linked under the new root at the same position
+        in roots.
+        """
+        sizes, next_member = self.sizes, self.next_member
+        np.add.at(sizes, roots, sizes[children])
+        self.num_components -= len(children)
+        self.grown.append(roots)
+
+        # Splicing the member lists of c1..ck into the one of root r one at a
+        # time, as union does, ends with r -> next of ck, c1 -> next of r and
+        # every other ci -> next of c(i - 1)
+        order = np.argsort(roots, kind='stable')
+        children, roots = children[order], roots[order]
+        next_of_children, next_of_roots = next_member[children], next_member[roots]
+        first = np.r_[True, roots[1:] != roots[:-1]]
+        last = np.r_[roots[1:] != roots[:-1], True]
+        previous = np.r_[next_of_children[:1], next_of_children[:-1]]
+        next_member[children] = np.where(first, next_of_roots, previous)
+        next_member[roots[last]] = next_of_children[last]
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+# Vertex ids are stored as 32 bit ints unless the graph is too large for that
+MAX_INT32 = 2 ** 31 - 1
+MIN_INT64 = -2 ** 63
+MAX_INT64 = 2 ** 63 - 1
+
+
+def index_typecode(size):
+    """
+    Pick the smallest array typecode that can hold vertex/edge ids up to size.
+    :param size:
+    :return: array typecode
+    """
+    return 'i' if size <= MAX_INT32 else 'q'
+
+
+class CSRGraph:
+    """
+    CSRGraph is a frozen, compressed sparse row (CSR) version of a Graph.
+    Vertex labels are interned to dense ints 0..n-1, the edges of vertex i are
+    targets[offsets[i]:offsets[i + 1]] and, for a weighted graph, their costs
+    are at the same positions in weights. Everything is kept in contiguous
+    typed arrays, so there is no per edge Python object and no (src, dst)
+    tuple is built while searching.
+    The order of the edges for each vertex is the insertion order of the
+    Graph it was compiled from, so searches visit vertices in the same order.
+    """
+    def __init__(self, labels, offsets, targets, weights=None, negative_weights=False, index=None):
+        """
+        :param labels: sequence of vertex labels, labels[i] is the label of vertex i
+        :param offsets: buffer of len(labels) + 1 edge offsets
+        :param targets: buffer of target vertex ids
+        :param weights: buffer of edge costs, or None for an unweighted graph
+        :param negative_weights: True if any of the weights is negative
+        :param index: mapping of label -> vertex id, built from labels when it is first used if None
+        """
+        if len(offsets) != len(labels) + 1:
+            raise ValueError("There must be exactly one more offset than there are vertices")
+        if weights is not None and len(weights) != len(targets):
+            raise ValueError("There must be one weight for every edge")
+        self.labels = labels
+        self._index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.negative_weights = negative_weights
+
+    @classmethod
+    def from_graph(cls, graph, weights=None):
+        """
+        Build a CSRGraph from an adjacency dictionary and an optional weights
+        dictionary keyed by (src, dst), i.e. the layout used by graphs.Graph.
+        Vertices that only appear as a destination are interned after the
+        vertices that have edges.
+        :param graph: dictionary of vertex -> list of neighbors
+        :param weights: dictionary of (src, dst) -> cost, or None, the costs are
+                        kept as int64 if they are all ints, otherwise float64
+        :return: CSRGraph
+        """
+        index = {}
+        labels = []
+        for vertex in graph:
+            index[vertex] = len(labels)
+            labels.append(vertex)
+        for neighbors in graph.values():
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = len(labels)
+                    labels.append(neighbor)
+
+        offsets = array('q', [0]) * (len(labels) + 1)
+        targets = array(index_typecode(len(labels)))
+        costs = [] if weights else None
+        negative_weights = False
+        for vertex, neighbors in graph.items():
+            source = index[vertex]
+            targets.extend(index[neighbor] for neighbor in neighbors)
+            if costs is not None:
+                for neighbor in neighbors:
+                    cost = weights[(vertex, neighbor)]
+                    if cost < 0:
+                        negative_weights = True
+                    costs.append(cost)
+            offsets[source + 1] = len(neighbors)
+        for vertex in range(len(labels)):
+            offsets[vertex + 1] += offsets[vertex]
+        if costs is not None:
+            integer = all(type(cost) is int and MIN_INT64 <= cost <= MAX_INT64 for cost in costs)
+            costs = array('q' if integer else 'd', costs)
+        return cls(labels, offsets, targets, costs, negative_weights)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {label: vertex for vertex, label in enumerate(self.labels)}
+        return self._index
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, label):
+        return label in self.index
+
+    def __str__(self):
+        return "CSRGraph: %d vertices, %d edges, %d bytes" % (len(self), self.number_of_edges, self.nbytes)
+
+    @property
+    def number_of_edges(self):
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        """
+        The number of bytes used by the offsets, targets and weights buffers.
+        """
+        total = 0
+        for buffer in (self.offsets, self.targets, self.weights):
+            if buffer is not None:
+                total += memoryview(buffer).nbytes
+        return total
+
+    def neighbors(self, label):
+        """
+        Return the labels of the neighbors of a vertex, in insertion order.
+        :param label:
+        :return: list of labels
+        """
+        vertex = self.index[label]
+        labels = self.labels
+        return [labels[target] for target in self.targets[self.offsets[vertex]:self.offsets[vertex + 1]]]
+
+    def edges(self):
+        """
+        Iterate over the edges as (source id, target id, cost), the cost is 1
+        for an unweighted graph.
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        for vertex in range(len(self.labels)):
+            for position in range(offsets[vertex], offsets[vertex + 1]):
+                yield vertex, targets[position], 1 if weights is None else weights[position]
+
+    def __path__(self, parents, end):
+        """
+        Walk the parent pointers back from end and return the path as labels.
+        """
+        path = []
+        while end != -1:
+            path.append(self.labels[end])
+            end = parents[end]
+        path.reverse()
+        return path
+
+    def __tables__(self, distances, parents):
+        """
+        Convert the int indexed distance and parent arrays into the label
+        keyed dictionaries that graphs.Graph returns.
+        """
+        labels = self.labels
+        return ({labels[vertex]: distance for vertex, distance in enumerate(distances)},
+                {labels[vertex]: None if parent == -1 else labels[parent] for vertex, parent in enumerate(parents)})
+
+    def find_path(self, start, end):
+        return self.find_shortest_path(start, end)
+
+    def find_shortest_path(self, start, end=None):
+        if self.weights is not None:
+            if self.negative_weights:
+                return self.__bellman_ford__(start, end)
+            return self.__dijkstra__(start, end)
+        return self.__bfs__(start, end)
+
+    def __bfs__(self, start, end=None):
+        """
+        Breadth first search on the vertex ids. Vertices are marked when they
+        are first discovered and only a parent pointer is kept for each one,
+        the path is rebuilt once the end is found.
+        :param start:
+        :param end:
+        :return: The shortest path as a list of labels, empty if not connected,
+                 or the hop distances and parents if end is None
+        """
+        if start == end:
+            return [start]
+        if end is not None and (start not in self.index or end not in self.index):
+            return []
+        source = self.index[start]
+        target = self.index.get(end, -1)
+        offsets, targets = self.offsets, self.targets
+        distances = array('d', [float('inf')]) * len(self.labels)
+        parents = array('q', [-1]) * len(self.labels)
+        distances[source] = 0
+        queue = deque([source])
+        while queue:
+            vertex = queue.popleft()
+            hops = distances[vertex] + 1
+            for position in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[position]
+                if distances[neighbor] == float('inf'):
+                    distances[neighbor] = hops
+                    parents[neighbor] = vertex
+                    if neighbor == target:
+                        return self.__path__(parents, target)
+                    queue.append(neighbor)
+
+        if end is not None:
+            # Condition when the nodes are not connected
+            return []
+        return self.__tables__(distances, parents)
+
+    def __dijkstra__(self, start, end=None):
+        source = self.index[start]
+        target = -1
+        if end is not None:
+            if end not in self.index:
+                raise ValueError("Invalid end node: %s" % end)
+            target = self.index[end]
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        distances = array('d', [float('inf')]) * len(self.labels)
+        parents = array('q', [-1]) * len(self.labels)
+        distances[source] = 0
+        heap = [(0, source)]
+        while heap:
+            distance, vertex = heappop(heap)
+            # A vertex can be on the heap more than once, skip the stale entries
+            if distance > distances[vertex]:
+                continue
+            if vertex == target:
+                return self.__path__(parents, target)
+            for position in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[position]
+                new_distance = distance + weights[position]
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    parents[neighbor] = vertex
+                    heappush(heap, (new_distance, neighbor))
+
+        if end is not None:
+            return []
+        return self.__tables__(distances, parents)
+
+    def __bellman_ford__(self, start, end=None):
+        source = self.index[start]
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        number_of_vertices = len(self.labels)
+        distances = array('d', [float('inf')]) * number_of_vertices
+        parents = array('q', [-1]) * number_of_vertices
+        distances[source] = 0
+
+        for _ in range(number_of_vertices - 1):
+            distances_modified = False
+            for vertex in range(number_of_vertices):
+                distance = distances[vertex]
+                if distance == float('inf'):
+                    continue
+                for position in range(offsets[vertex], offsets[vertex + 1]):
+                    neighbor = targets[position]
+                    if distance + weights[position] < distances[neighbor]:
+                        distances[neighbor] = distance + weights[position]
+                        parents[neighbor] = vertex
+                        distances_modified = True
+            if not distances_modified:
+                break
+
+        for vertex in range(number_of_vertices):
+            for position in range(offsets[vertex], offsets[vertex + 1]):
+                if distances[vertex] + weights[position] < distances[targets[position]]:
+                    raise ValueError('The graph has a negative cycle')
+
+        if end is not None:
+            if end not in self.index:
+                raise ValueError("Invalid end node %s, no such node" % end)
+            target = self.index[end]
+            if parents[target] == -1:
+                raise ValueError('No path to node %s' % end)
+            return self.__path__(parents, target)
+
+        return self.__tables__(distances, parents)
+
+    def depth_first_search(self, start):
+        """
+        Iterative depth first search returning the labels in the order they
+        are visited, the same order as graphs.Graph.depth_first_search.
+        :param start:
+        :return: list of labels
+        """
+        if start not in self.index:
+            return [start]
+        offsets, targets, labels = self.offsets, self.targets, self.labels
+        visited = bytearray(len(labels))
+        stack = [self.index[start]]
+        order = []
+        while stack:
+            vertex = stack.pop()
+            if not visited[vertex]:
+                visited[vertex] = 1
+                order.append(labels[vertex])
+                stack.extend(targets[offsets[vertex]:offsets[vertex + 1]])
+        return order
@@ -1,10 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from timeit import timeit
-import networkx as nx
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use("macosx")
+from graph_plotting import draw_graph
+from traversal import depth_first_order, node_children
 
 
 class Node:
@@ -18,11 +15,7 @@ class Node:
 
     # Time: O(V+E) vertices + edges, Space: O(V)
     def depthFirstSearch(self, array):
-        array.append(self.name)
-        # print("Array is: %s" % array)
-        # print("My name is: %s and my children are: %s" % (self.name, self.children))
-        for child in self.children:
-            child.depthFirstSearch(array)
+        array.extend(node.name for node in depth_first_order(self, node_children))
         return array
 
     def __repr__(self):
@@ -57,9 +50,4 @@ if __name__ == '__main__':
 
     assert array == ["A", "B", "E", "F", "I", "J", "C", "D", "G", "K", "H"], "Returned array was incorrect"
     print(array)
-    G = nx.Graph(display_graph)
-    pos = nx.spring_layout(G)
-    nx.draw_networkx_nodes(G, pos)
-    nx.draw_networkx_edges(G, pos)
-    nx.draw_networkx_labels(G, pos)
-    plt.show()
+    draw_graph(display_graph)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+from bisect import bisect_left
+
+from rollback_dsu import RollbackDSU
+
+"""
+Offline dynamic connectivity: answer "are u and v connected?" for a batch of
+time ordered edge additions, edge removals and queries, with the edges
+treated as undirected.
+
+Every edge is alive for an interval of the batch, from when it is added to
+when it is removed, or to the end. Only the queries in that interval can see
+it, so time is counted in queries and each interval is put on the O(log Q)
+nodes of a segment tree over the queries that exactly cover it. A depth
+first walk of the tree unions the edges of a node on the way down, answers
+the query at each leaf, and rolls the RollbackDSU back on the way up, so
+every edge is unioned O(log Q) times and the whole batch costs
+O((E log Q + Q) log V).
+"""
+
+ADD = 'add'
+REMOVE = 'remove'
+QUERY = 'query'
+OPERATIONS = (ADD, REMOVE, QUERY)
+
+
+def edge_intervals(operations):
+    """
+    Pair the additions and removals of each edge.
+    :param operations: list of (operation, u, v)
+    :return: (intervals, query_times), intervals is a list of (start, end, u, v)
+             with the edge alive for the operations start..end - 1
+    """
+    added = {}
+    intervals = []
+    query_times = []
+    for time, (operation, first, second) in enumerate(operations):
+        edge = (first, second) if first <= second else (second, first)
+        if operation == ADD:
+            added.setdefault(edge, []).append(time)
+        elif operation == REMOVE:
+            if not added.get(edge):
+                raise ValueError("Invalid remove at %d, the edge %s - %s is not in the graph" % (time, first, second))
+            intervals.append((added[edge].pop(), time) + edge)
+        elif operation == QUERY:
+            query_times.append(time)
+        else:
+            raise ValueError("Invalid operation %s, must be one of: %s" % (operation, ', '.join(OPERATIONS)))
+    for edge, starts in added.items():
+        for start in starts:
+            intervals.append((start, len(operations)) + edge)
+    return intervals, query_times
+
+
+def offline_connectivity(number_of_vertices, operations):
+    """
+    Answer every query of a batch of operations.
+    :param number_of_vertices: vertices are 0..number_of_vertices - 1
+    :param operations: list of (ADD, u, v), (REMOVE, u, v) or (QUERY, u, v),
+                       in time order. An edge can be added more than once,
+                       it is then there until it is removed as many times
+    :return: list with True or False for each query, in order
+    """
+    intervals, query_times = edge_intervals(operations)
+    number_of_queries = len(query_times)
+    if not number_of_queries:
+        return []
+    size = 1
+    while size < number_of_queries:
+        size *= 2
+    # tree[node] is the list of edges alive for every query under node, the leaves are size..2 * size - 1
+    tree = [[] for _ in range(2 * size)]
+    for start, end, first, second in intervals:
+        low = bisect_left(query_times, start) + size
+        high = bisect_left(query_times, end) + size
+        while low < high:
+            if low & 1:
+                tree[low].append((first, second))
+                low += 1
+            if high & 1:
+                high -= 1
+                tree[high].append((first, second))
+            low //= 2
+            high //= 2
+
+    dsu = RollbackDSU(number_of_vertices)
+    answers = [False] * number_of_queries
+    # (node, token), the token is None until the node has been entered
+    stack = [(1, None)]
+    while stack:
+        node, token = stack.pop()
+        if token is not None:
+            dsu.rollback(token)
+            continue
+        stack.append((node, dsu.snapshot()))
+        for first, second in tree[node]:
+            dsu.union(first, second)
+        if node >= size:
+            query = node - size
+            _, first, second = operations[query_times[query]]
+            answers[query] = dsu.connected(first, second)
+            continue
+        # The right child is pushed first so the queries are answered in order
+        for child in (2 * node + 1, 2 * node):
+            # Skip the padding past the last query
+            if (child << (size.bit_length() - child.bit_length())) - size < number_of_queries:
+                stack.append((child, None))
+    return answers
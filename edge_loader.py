@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import sys
+from array import array
+from importlib.util import find_spec
+
+from csr_graph import CSRGraph, index_typecode
+
+"""
+Load large edge list files straight into a CSRGraph, without a Python object
+or a Graph.add_edge call per edge.
+
+Three formats are read, one edge per line:
+    tuple   (src,dst,cost) as in dijkstra_edges.txt
+    csv     src,dst,cost
+    tsv     src<TAB>dst<TAB>cost
+Blanks around the fields are allowed in every format. The cost column is
+optional, a file with two columns gives an unweighted graph. A header line,
+e.g. "src,dst,cost", is skipped. Vertices must be integers, they are parsed
+as int64 so every id round-trips exactly. If every cost is a whole number
+the costs are kept as integers, otherwise as floats.
+
+The file is read in chunks of chunk_size bytes. Each chunk is cut at its last
+newline and the separators of its format are turned into blanks with
+bytes.translate, anything else that is not a number is an error. NumPy's
+loadtxt then parses the whole chunk in C, the ids straight to int64 and the
+costs to float64. The parsed ids and costs go into typed arrays, and at the
+end they are sorted into the CSR layout by source with a stable argsort.
+
+Peak memory is during that sort, at about 5 times the final CSRGraph: the
+24 bytes per edge read, the 16 bytes of remapped ids and the 8 bytes of the
+sort order, plus the edge arrays being built, against 12 bytes per edge for
+the result with 32 bit targets. While reading it is the 24 bytes per edge
+plus one chunk.
+
+NumPy is required for this loader, and only imported when a file is loaded,
+so importing this module stays cheap.
+"""
+
+FORMATS = ('tuple', 'csv', 'tsv')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# The separators of each format become whitespace before parsing
+SEPARATORS = {
+    'tuple': bytes.maketrans(b'(),\r', b'    '),
+    'csv': bytes.maketrans(b',\r', b'  '),
+    'tsv': bytes.maketrans(b'\t\r', b'  '),
+}
+
+# A cost can only be kept as an integer if its float64 was exact
+EXACT_INTEGER_LIMIT = 2 ** 53
+
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+
+def guess_format(path):
+    """
+    :param path:
+    :return: 'csv' or 'tsv' from the file extension, 'tuple' otherwise
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.tsv', '.tab'):
+        return 'tsv'
+    return 'tuple'
+
+
+def parse_fields(line, file_format):
+    """
+    Split one line into its fields.
+    :return: list of floats, or None if the line is not numbers, i.e. a header
+    """
+    try:
+        return [float(field) for field in line.translate(SEPARATORS[file_format]).split()]
+    except ValueError:
+        return None
+
+
+def parse_chunk(chunk, columns, file_format):
+    """
+    Parse a chunk of whole lines.
+    :param chunk: bytes, ending at a line boundary
+    :param columns: 2 or 3
+    :param file_format: one of FORMATS
+    :return: structured array with int64 source and destination fields and a float64 cost field
+    """
+    import numpy as np
+    fields = [('source', np.int64), ('destination', np.int64), ('cost', np.float64)][:columns]
+    try:
+        return np.loadtxt(io.BytesIO(chunk.translate(SEPARATORS[file_format])), dtype=fields, ndmin=1)
+    except ValueError as error:
+        raise ValueError("Could not parse the edge list as %s, every line must have %d numbers with "
+                         "integer vertices: %s" % (file_format, columns, error))
+
+
+def raw_bytes(values):
+    """
+    The bytes of a NumPy array without a copy, unless it is not contiguous,
+    for array.frombytes.
+    """
+    import numpy as np
+    return memoryview(np.ascontiguousarray(values)).cast('B')
+
+
+def print_progress(bytes_read, total_bytes, edges):
+    """
+    A progress callback for load_edge_list that writes to stderr.
+    """
+    percent = 100.0 * bytes_read / total_bytes if total_bytes else 100.0
+    sys.stderr.write("\r%5.1f%% %d edges" % (percent, edges))
+    if bytes_read >= total_bytes:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def read_edges(path, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Read the edges of a file into typed arrays, in file order.
+    :param path:
+    :param file_format: one of FORMATS, from the extension if None
+    :param chunk_size: number of bytes to read at a time
+    :param progress: called with (bytes read, total bytes, edges read) after every chunk
+    :return: (sources, destinations, costs) as array('q'), array('q') and
+             array('q') or array('d'), see integer_costs, costs is None if
+             the file has no cost column
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("The edge list loader needs numpy")
+    import numpy as np
+    if file_format is None:
+        file_format = guess_format(path)
+    if file_format not in FORMATS:
+        raise ValueError("Invalid format %s, must be one of: %s" % (file_format, ', '.join(FORMATS)))
+
+    total_bytes = os.path.getsize(path)
+    sources, destinations, costs = array('q'), array('q'), array('d')
+    columns = None
+    bytes_read = 0
+    remainder = b''
+    with open(path, 'rb') as edge_file:
+        while True:
+            data = edge_file.read(chunk_size)
+            bytes_read += len(data)
+            chunk = remainder + data
+            if data:
+                # Keep the partial last line for the next chunk
+                end = chunk.rfind(b'\n') + 1
+                chunk, remainder = chunk[:end], chunk[end:]
+            else:
+                remainder = b''
+
+            if columns is None:
+                # The first line that is not blank decides the number of columns, or is a header
+                lines = chunk.split(b'\n')
+                for number, line in enumerate(lines):
+                    if not line.strip():
+                        continue
+                    fields = parse_fields(line, file_format)
+                    if fields is None:
+                        lines[number] = b''
+                        fields = next((parse_fields(line, file_format) for line in lines[number + 1:]
+                                       if line.strip()), None)
+                    if fields is not None:
+                        columns = len(fields)
+                        if columns not in (2, 3):
+                            raise ValueError("Each line must have 2 or 3 columns, not %d" % columns)
+                    break
+                chunk = b'\n'.join(lines)
+
+            if columns is not None and chunk.strip():
+                values = parse_chunk(chunk, columns, file_format)
+                sources.frombytes(raw_bytes(values['source']))
+                destinations.frombytes(raw_bytes(values['destination']))
+                if columns == 3:
+                    costs.frombytes(raw_bytes(values['cost']))
+                del values
+            if not data:
+                break
+            if progress is not None:
+                progress(bytes_read, total_bytes, len(sources))
+    if columns != 3:
+        return sources, destinations, None
+    return sources, destinations, integer_costs(costs)
+
+
+def integer_costs(costs):
+    """
+    :param costs: array('d')
+    :return: the costs as array('q') if they are all whole numbers, otherwise costs
+    """
+    import numpy as np
+    values = np.frombuffer(costs, dtype=np.float64)
+    if not len(values) or not (np.all(np.abs(values) < EXACT_INTEGER_LIMIT) and np.all(values == np.floor(values))):
+        return costs
+    return array('q', values.astype(np.int64).tobytes())
+
+
+def csr_from_edges(sources, destinations, costs=None):
+    """
+    Build a CSRGraph from parallel edge arrays. The vertices are numbered in
+    the order of their ids and the edges of each vertex stay in the order given.
+    :param sources: buffer of int64 source ids
+    :param destinations: buffer of int64 destination ids
+    :param costs: buffer of int64 or float64 costs, e.g. array('q') or
+                  array('d'), or None for an unweighted graph
+    :return: CSRGraph
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("The edge list loader needs numpy")
+    import numpy as np
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+    if not len(sources):
+        return CSRGraph([], array('q', [0]), array('i'), array('d') if costs is not None else None)
+
+    lowest = min(sources.min(), destinations.min())
+    highest = max(sources.max(), destinations.max())
+    if lowest >= 0 and highest <= 2 * len(sources) + 1024:
+        # Ids that are close to dense are remapped with a lookup table
+        present = np.zeros(highest + 1, dtype=bool)
+        present[sources] = True
+        present[destinations] = True
+        labels = np.flatnonzero(present)
+        remap = np.cumsum(present, dtype=np.int64) - 1
+        del present
+        source_ids, destination_ids = remap[sources], remap[destinations]
+        del remap
+    else:
+        labels = np.unique(np.concatenate((sources, destinations)))
+        source_ids, destination_ids = np.searchsorted(labels, sources), np.searchsorted(labels, destinations)
+
+    number_of_vertices = len(labels)
+    offsets = np.zeros(number_of_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(source_ids, minlength=number_of_vertices), out=offsets[1:])
+    order = np.argsort(source_ids, kind='stable')
+    del source_ids
+    typecode = index_typecode(number_of_vertices)
+    targets = array(typecode)
+    targets.frombytes(raw_bytes(destination_ids[order].astype(np.int32 if typecode == 'i' else np.int64)))
+    del destination_ids
+    weights = None
+    negative_weights = False
+    if costs is not None:
+        costs = np.asarray(costs)
+        negative_weights = bool((costs < 0).any())
+        weights = array('q' if costs.dtype.kind in 'iu' else 'd')
+        weights.frombytes(raw_bytes(costs[order].astype(np.int64 if weights.typecode == 'q' else np.float64, copy=False)))
+    return CSRGraph(labels.tolist(), array('q', offsets.tobytes()), targets, weights, negative_weights)
+
+
+def load_edge_list(path, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Load an edge list file into a CSRGraph.
+    :param path:
+    :param file_format: 'tuple', 'csv' or 'tsv', from the extension if None
+    :param chunk_size: number of bytes to read at a time
+    :param progress: called with (bytes read, total bytes, edges read) after
+                     every chunk, e.g. print_progress
+    :return: CSRGraph
+    """
+    sources, destinations, costs = read_edges(path, file_format, chunk_size, progress)
+    return csr_from_edges(sources, destinations, costs)
+
+
+if __name__ == '__main__':
+    for edge_list in sys.argv[1:] or ['dijkstra_edges.txt']:
+        print(load_edge_list(edge_list, progress=print_progress))
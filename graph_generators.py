@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+from random import Random
+
+from graphs import Graph
+
+"""
+Seeded generators for synthetic graphs used by the benchmarks. The same seed
+always gives the same graph, so runs can be compared with each other.
+
+random_graph returns a Graph. The other generators return edge lists, as
+(source, destination, weight) tuples with integer vertices 0..V-1, so every
+shortest path engine can be built from the same graph. They make no self
+loops or parallel edges, and graph_from_edges makes a Graph from any of them.
+"""
+
+
+def random_graph(number_of_vertices, number_of_edges, seed=0, max_weight=100, weighted=True):
+    """
+    A directed random graph with integer vertices. Every vertex gets an edge
+    to the next one so that the whole graph is reachable from vertex 0, the
+    remaining edges connect random pairs of vertices.
+    :param number_of_vertices:
+    :param number_of_edges: must be at least number_of_vertices - 1
+    :param seed:
+    :param max_weight: weights are uniform in 1..max_weight
+    :param weighted: If False the edges have no cost
+    :return: Graph
+    """
+    if number_of_edges < number_of_vertices - 1:
+        raise ValueError("Need at least %d edges to connect %d vertices" %
+                         (number_of_vertices - 1, number_of_vertices))
+    random = Random(seed)
+    graph = Graph()
+    for vertex in range(number_of_vertices - 1):
+        graph.add_edge(vertex, vertex + 1, random.randint(1, max_weight) if weighted else None)
+    for _ in range(number_of_edges - number_of_vertices + 1):
+        graph.add_edge(random.randrange(number_of_vertices),
+                       random.randrange(number_of_vertices),
+                       random.randint(1, max_weight) if weighted else None)
+    return graph
+
+
+def graph_from_edges(edges):
+    graph = Graph()
+    for source, destination, weight in edges:
+        graph.add_edge(source, destination, weight)
+    return graph
+
+
+def grid_edges(rows, columns, seed=0, max_weight=100):
+    """
+    A rows x columns grid, every vertex has an edge each way to the vertices
+    above, below, left and right of it, vertex r * columns + c is at (r, c).
+    :return: list of (source, destination, weight)
+    """
+    random = Random(seed)
+    edges = []
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            for neighbor, exists in ((vertex + 1, column + 1 < columns), (vertex + columns, row + 1 < rows)):
+                if exists:
+                    edges.append((vertex, neighbor, random.randint(1, max_weight)))
+                    edges.append((neighbor, vertex, random.randint(1, max_weight)))
+    return edges
+
+
+def erdos_renyi_edges(number_of_vertices, number_of_edges, seed=0, max_weight=100):
+    """
+    An Erdős–Rényi G(n, m) graph, number_of_edges directed edges between
+    distinct pairs of vertices drawn uniformly at random.
+    :return: list of (source, destination, weight)
+    """
+    if number_of_edges > number_of_vertices * (number_of_vertices - 1):
+        raise ValueError("At most %d edges fit between %d vertices" %
+                         (number_of_vertices * (number_of_vertices - 1), number_of_vertices))
+    random = Random(seed)
+    pairs = set()
+    edges = []
+    while len(edges) < number_of_edges:
+        pair = (random.randrange(number_of_vertices), random.randrange(number_of_vertices))
+        if pair[0] != pair[1] and pair not in pairs:
+            pairs.add(pair)
+            edges.append(pair + (random.randint(1, max_weight),))
+    return edges
+
+
+def power_law_edges(number_of_vertices, edges_per_vertex=2, seed=0, max_weight=100):
+    """
+    A Barabási–Albert graph, each new vertex is joined to edges_per_vertex
+    earlier vertices picked with a probability proportional to their degree,
+    which gives a power law degree distribution with a few large hubs. Every
+    edge goes both ways.
+    :return: list of (source, destination, weight)
+    """
+    random = Random(seed)
+    # Every vertex appears here once per edge it is on, so a uniform pick from it is proportional to degree
+    endpoints = []
+    edges = []
+    for vertex in range(1, number_of_vertices):
+        if vertex <= edges_per_vertex:
+            targets = set(range(vertex))
+        else:
+            targets = set()
+            while len(targets) < edges_per_vertex:
+                targets.add(random.choice(endpoints))
+        for target in targets:
+            edges.append((vertex, target, random.randint(1, max_weight)))
+            edges.append((target, vertex, random.randint(1, max_weight)))
+            endpoints.extend((vertex, target))
+    return edges
+
+
+def road_edges(rows, columns, seed=0, keep=0.9, diagonals=0.05):
+    """
+    A road like network, the vertices are jittered points on a grid joined to
+    nearby points, with weights that are the distance between them. Some grid
+    edges are dropped and a few diagonal shortcuts added, so like a real road
+    network it is nearly planar, has a low degree and a large diameter. Every
+    edge goes both ways with the same weight.
+    :param keep: the fraction of grid edges kept
+    :param diagonals: the chance of a diagonal edge from each vertex
+    :return: list of (source, destination, weight)
+    """
+    random = Random(seed)
+    points = [(row + random.uniform(-0.3, 0.3), column + random.uniform(-0.3, 0.3))
+              for row in range(rows) for column in range(columns)]
+    edges = []
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            neighbors = []
+            if column + 1 < columns and random.random() < keep:
+                neighbors.append(vertex + 1)
+            if row + 1 < rows and random.random() < keep:
+                neighbors.append(vertex + columns)
+            if row + 1 < rows and column + 1 < columns and random.random() < diagonals:
+                neighbors.append(vertex + columns + 1)
+            for neighbor in neighbors:
+                (y1, x1), (y2, x2) = points[vertex], points[neighbor]
+                weight = max(1, round(100 * ((y1 - y2) ** 2 + (x1 - x2) ** 2) ** 0.5))
+                edges.append((vertex, neighbor, weight))
+                edges.append((neighbor, vertex, weight))
+    return edges
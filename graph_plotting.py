@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""
+Drawing graphs with networkx and matplotlib, which are optional. Nothing is
+imported until draw_graph is first called, so the traversal modules can
+import this module on machines without a display or without either package
+and only pay for them when a graph is actually drawn.
+
+matplotlib picks its backend as usual, from the MPLBACKEND environment
+variable or its configuration, rather than one being forced here.
+"""
+
+# (networkx, matplotlib.pyplot) once load_plotting has imported them
+PLOTTING = None
+
+
+def load_plotting():
+    """
+    Import networkx and matplotlib.pyplot the first time they are needed.
+    :return: (networkx, matplotlib.pyplot)
+    """
+    global PLOTTING
+    if PLOTTING is None:
+        try:
+            import networkx
+            import matplotlib.pyplot
+        except ImportError as error:
+            raise ImportError("Drawing graphs needs networkx and matplotlib: %s" % error) from error
+        PLOTTING = (networkx, matplotlib.pyplot)
+    return PLOTTING
+
+
+def draw_graph(graph, show=True):
+    """
+    Draw a graph with a spring layout.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param show: If True, show the figure
+    :return: the networkx graph that was drawn
+    """
+    nx, plt = load_plotting()
+    display_graph = nx.Graph(graph)
+    pos = nx.spring_layout(display_graph)
+    nx.draw_networkx_nodes(display_graph, pos)
+    nx.draw_networkx_edges(display_graph, pos)
+    nx.draw_networkx_labels(display_graph, pos)
+    if show:
+        plt.show()
+    return display_graph
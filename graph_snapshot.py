@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+import ast
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from csr_graph import MAX_INT64, MIN_INT64, CSRGraph
+
+"""
+A versioned binary snapshot of a CSRGraph that can be memory mapped.
+
+The file is a fixed size header followed by four sections, each starting on
+a 64 byte boundary:
+    labels      int64 array if every label is an int, otherwise the UTF-8 repr
+                of the list of labels, see encode_labels
+    offsets     int64 array, len(labels) + 1 entries
+    targets     int32 array, or int64 if the graph is too large for int32
+    weights     int64 array if the weights are integers, otherwise float64,
+                empty for an unweighted graph
+All of the numbers are little endian. The header holds the number of
+vertices and edges, flags, and the (offset, size) in bytes of every section.
+
+Loading with mmap=True maps the file read only and wraps each section in a
+memoryview cast to its type, nothing is copied or parsed, so it takes the
+same time for any graph size and every process that loads the same file
+shares its pages through the page cache. When the labels are sorted ints,
+as load_edge_list makes them, the label -> vertex lookup is a binary search
+over the mapped labels instead of a dictionary, so no per vertex object is
+built either. Labels that are not ints are parsed with ast.literal_eval,
+which takes time in proportion to the number of vertices. Nothing in a
+snapshot is unpickled, so loading a file from somewhere else cannot run code.
+"""
+
+MAGIC = b'GRAPHSNP'
+FORMAT_VERSION = 3
+ALIGNMENT = 64
+
+# magic, version, flags, vertices, edges, then (offset, size) for every section
+HEADER = struct.Struct('<8sIIqq8q')
+
+INT_LABELS = 1
+SORTED_LABELS = 2
+WEIGHTED = 4
+NEGATIVE_WEIGHTS = 8
+WIDE_TARGETS = 16
+INT_WEIGHTS = 32
+
+# The buffer formats of signed integers, which fit in int64 weights
+INTEGER_FORMATS = ('b', 'h', 'i', 'l', 'q')
+
+
+class SortedIndex:
+    """
+    SortedIndex maps a label to its vertex id with a binary search over sorted
+    int labels. It supports the lookups CSRGraph makes on its index.
+    """
+    def __init__(self, labels):
+        self.labels = labels
+
+    def get(self, label, default=None):
+        if type(label) is not int:
+            return default
+        vertex = bisect_left(self.labels, label)
+        if vertex < len(self.labels) and self.labels[vertex] == label:
+            return vertex
+        return default
+
+    def __getitem__(self, label):
+        vertex = self.get(label)
+        if vertex is None:
+            raise KeyError(label)
+        return vertex
+
+    def __contains__(self, label):
+        return self.get(label) is not None
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def int_labels(labels):
+    """
+    :return: True if every label is an int that fits in an int64
+    """
+    return all(type(label) is int and MIN_INT64 <= label <= MAX_INT64 for label in labels)
+
+
+def encode_labels(labels):
+    """
+    The labels as the UTF-8 repr of a list, which decode_labels reads back
+    with ast.literal_eval. Unlike pickle, that can only build Python
+    literals, so the files they are saved in are safe to share.
+    :param labels: iterable of ints, floats, strings, bytes, tuples or other literals
+    :return: bytes
+    """
+    labels = list(labels)
+    text = repr(labels)
+    try:
+        round_trip = ast.literal_eval(text) == labels
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        round_trip = False
+    if not round_trip:
+        raise ValueError("Only labels that are Python literals, such as ints, strings or tuples, can be saved")
+    return text.encode()
+
+
+def decode_labels(data):
+    """
+    The list of labels written by encode_labels.
+    :param data: bytes or a buffer of them
+    :return: list
+    """
+    try:
+        labels = ast.literal_eval(bytes(data).decode())
+    except (ValueError, SyntaxError, UnicodeDecodeError, MemoryError, RecursionError):
+        labels = None
+    if not isinstance(labels, list):
+        raise ValueError("The labels are not a list of Python literals")
+    return labels
+
+
+def aligned(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def as_bytes(buffer, typecode):
+    """
+    The little endian bytes of a buffer of numbers.
+    """
+    values = array(typecode, buffer) if not isinstance(buffer, array) or buffer.typecode != typecode else buffer
+    if sys.byteorder != 'little':
+        values = array(typecode, values)
+        values.byteswap()
+    return memoryview(values).cast('B')
+
+
+def save_snapshot(graph, path):
+    """
+    Write a CSRGraph to path.
+    :param graph: CSRGraph
+    :param path:
+    :return: None
+    """
+    flags = 0
+    if int_labels(graph.labels):
+        flags |= INT_LABELS
+        labels = as_bytes(graph.labels, 'q')
+        if all(graph.labels[vertex] < graph.labels[vertex + 1] for vertex in range(len(graph.labels) - 1)):
+            flags |= SORTED_LABELS
+    else:
+        labels = encode_labels(graph.labels)
+    wide_targets = memoryview(graph.targets).itemsize == 8
+    if wide_targets:
+        flags |= WIDE_TARGETS
+    if graph.weights is not None:
+        flags |= WEIGHTED
+        if memoryview(graph.weights).format in INTEGER_FORMATS:
+            flags |= INT_WEIGHTS
+        if graph.negative_weights:
+            flags |= NEGATIVE_WEIGHTS
+    sections = [labels,
+                as_bytes(graph.offsets, 'q'),
+                as_bytes(graph.targets, 'q' if wide_targets else 'i'),
+                as_bytes(graph.weights, 'q' if flags & INT_WEIGHTS else 'd') if graph.weights is not None else b'']
+
+    positions = []
+    position = aligned(HEADER.size)
+    for section in sections:
+        positions.extend((position, len(section)))
+        position = aligned(position + len(section))
+    with open(path, 'wb') as output_file:
+        output_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(graph.labels), graph.number_of_edges,
+                                      *positions))
+        for number, section in enumerate(sections):
+            output_file.write(b'\0' * (positions[number * 2] - output_file.tell()))
+            output_file.write(section)
+
+
+def load_snapshot(path, mmap_file=True):
+    """
+    Load a CSRGraph written by save_snapshot.
+    :param path:
+    :param mmap_file: If True map the file read only and use it in place,
+                      otherwise read it into private arrays
+    :return: CSRGraph
+    """
+    with open(path, 'rb') as input_file:
+        header = input_file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError("%s is not a graph snapshot" % path)
+        magic, version, flags, number_of_vertices, number_of_edges, *positions = HEADER.unpack(header)
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported graph snapshot version %d, expected %d" % (version, FORMAT_VERSION))
+        if mmap_file:
+            data = memoryview(mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            input_file.seek(0)
+            data = memoryview(input_file.read())
+
+    def section(number, typecode):
+        position, size = positions[number * 2], positions[number * 2 + 1]
+        if position + size > len(data):
+            raise ValueError("%s is truncated" % path)
+        view = data[position:position + size]
+        if sys.byteorder != 'little' or not mmap_file:
+            values = array(typecode)
+            values.frombytes(view)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            return values
+        return view.cast(typecode)
+
+    if flags & INT_LABELS:
+        labels = section(0, 'q')
+    else:
+        labels = decode_labels(section(0, 'B'))
+    index = SortedIndex(labels) if flags & SORTED_LABELS else None
+    offsets = section(1, 'q')
+    targets = section(2, 'q' if flags & WIDE_TARGETS else 'i')
+    weights = section(3, 'q' if flags & INT_WEIGHTS else 'd') if flags & WEIGHTED else None
+    if len(labels) != number_of_vertices or len(targets) != number_of_edges:
+        raise ValueError("%s does not match its header" % path)
+    return CSRGraph(labels, offsets, targets, weights, bool(flags & NEGATIVE_WEIGHTS), index)
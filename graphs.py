@@ -1,6 +1,27 @@
 #!/usr/bin/env python3
 
 from collections import defaultdict, deque
+from time import perf_counter
+
+from all_pairs import floyd_warshall
+from astar import Landmarks, UnitWeights, astar, graph_fingerprint
+from batch_paths import batch_shortest_paths
+from bfs_tree import BreadthFirstSearchTree
+from bidirectional_search import bidirectional_bfs, bidirectional_dijkstra
+from csr_graph import CSRGraph
+from graph_snapshot import load_snapshot, save_snapshot
+from k_shortest_paths import yen_k_shortest_paths
+from minimum_spanning_tree import minimum_spanning_tree
+from johnson import Johnson, bellman_ford_potentials, johnson_all_pairs
+from incremental_paths import IncrementalShortestPaths
+from path_cache import MISSING, PathCache
+from search_observer import CACHED, ERROR, EXHAUSTED, PRECOMPUTED, REACHED_END, UNREACHABLE, SearchEvent
+from shortest_path import dijkstra, build_path
+from traversal import PRE_ORDER, depth_first_order, graph_children
+from vectorized_bellman_ford import VECTORIZED_AVAILABLE, BellmanFordEdges
+
+# Graphs with fewer edges than this use the edge by edge Bellman-Ford even if NumPy is available
+VECTORIZED_MIN_EDGES = 1000
 
 
 class Graph:
@@ -8,6 +29,20 @@ class Graph:
         self.graph = defaultdict(list)
         self.weights = {}
         self.negative_weights = False
+        # The reverse adjacency, i.e. vertex -> list of predecessors, is only
+        # built when a bidirectional search first needs it
+        self._reverse_graph = None
+        # Bumped by add_edge, so cached results for an older graph are never used
+        self.version = 0
+        self.cache = None
+        # Shortest path trees kept up to date by add_edge, see register_source
+        self.shortest_path_trees = {}
+        # (version, BellmanFordEdges) for the vectorized Bellman-Ford
+        self._bellman_ford_edges = None
+        # (version, Johnson) with the vertex potentials for graphs with negative weights
+        self._johnson = None
+        # Callables that get a SearchEvent for every search, see add_observer
+        self.observers = []
 
         # If the incoming graph data is a dictionary, assume that it is
         # already in an acceptable format, i.e. a dictionary where the
@@ -32,7 +67,11 @@ class Graph:
         :param cost: If None, no cost
         :return:
         """
+        previous_cost = self.weights.get((source, destination)) if self.shortest_path_trees else None
         self.graph[source].append(destination)
+        self.version += 1
+        if self._reverse_graph is not None:
+            self._reverse_graph[destination].append(source)
         # If we are using weights, then ensure that every edge has at least a cost of 1
         if cost is None:
             if self.weights:
@@ -41,6 +80,110 @@ class Graph:
             self.weights[(source, destination)] = cost
             if cost < 0:
                 self.negative_weights = True
+        for shortest_path_tree in self.shortest_path_trees.values():
+            shortest_path_tree.edge_added(source, destination, self.weights.get((source, destination)), previous_cost)
+
+    def register_source(self, source):
+        """
+        Keep the shortest path tree from source and repair it incrementally as
+        edges are added, instead of searching again after every add_edge.
+        find_shortest_path uses the tree for any query that starts at source.
+        Once the graph has a negative weight the tree goes stale and is no
+        longer used or repaired.
+        :param source:
+        :return: IncrementalShortestPaths
+        """
+        if source not in self.shortest_path_trees:
+            self.shortest_path_trees[source] = IncrementalShortestPaths(self, source)
+        return self.shortest_path_trees[source]
+
+    def unregister_source(self, source):
+        self.shortest_path_trees.pop(source, None)
+
+    def compile(self):
+        """
+        Compile the graph into a frozen, array backed CSRGraph. The CSRGraph
+        supports find_shortest_path, find_path and depth_first_search with the
+        same results as this graph, but uses a fraction of the memory. Edges
+        added after compiling are not seen by the CSRGraph.
+        :return: CSRGraph
+        """
+        return CSRGraph.from_graph(self.graph, self.weights)
+
+    def save(self, path):
+        """
+        Compile the graph and write it as a binary snapshot, see graph_snapshot.
+        :param path:
+        :return: None
+        """
+        save_snapshot(self.compile(), path)
+
+    @staticmethod
+    def load(path, mmap=True):
+        """
+        Load a snapshot written by save. Building the dictionaries of a Graph
+        would take time for every edge, so the snapshot comes back as the
+        compiled CSRGraph, which answers the same queries.
+        :param path:
+        :param mmap: If True the file is mapped read only and shared with every
+                     other process that maps it, otherwise it is read into memory
+        :return: CSRGraph
+        """
+        return load_snapshot(path, mmap)
+
+    def enable_cache(self, maxsize=1000000):
+        """
+        Cache the results of find_shortest_path, including the distance and
+        parent tables returned when there is no end, in a PathCache. Every
+        call gets its own copy of a cached result.
+        Results are cached by (start, end) only. heap and bidirectional
+        change how a search runs, not the distances it finds, so a result
+        cached by one mode is returned to the others, although with ties it
+        can be a different path of the same cost. A result served from the
+        cache adds nothing to stats but cache_hits.
+        :param maxsize: The number of vertices the cached results may hold
+        :return: The PathCache, its info property has the hit/miss counters
+        """
+        self.cache = PathCache(maxsize)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    def add_observer(self, observer):
+        """
+        Time every find_shortest_path and astar call and report it to
+        observer, see search_observer. Without observers the searches are
+        not instrumented at all.
+        :param observer: callable that takes a SearchEvent
+        :return: observer
+        """
+        self.observers.append(observer)
+        return observer
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    def __getstate__(self):
+        # Observers stay in the process that added them, a copy in a process pool worker would never be read
+        state = self.__dict__.copy()
+        state['observers'] = []
+        return state
+
+    def __search_copy__(self):
+        """
+        A Graph that shares the adjacency, weights and Johnson potentials but
+        none of the path cache, shortest path trees or other derived state,
+        so a process pool worker is only sent what its searches read.
+        """
+        search_copy = Graph()
+        search_copy.graph = self.graph
+        search_copy.weights = self.weights
+        search_copy.negative_weights = self.negative_weights
+        search_copy.version = self.version
+        if self._johnson is not None and self._johnson[0] == self.version:
+            search_copy._johnson = self._johnson
+        return search_copy
 
     def find_path(self, start, end):
         """
@@ -52,116 +195,557 @@ class Graph:
         return self.find_shortest_path(start, end)
 
     def find_all_paths(self, start, end, path=[]):
-        path = path + [start]
+        """
+        Find every path from start to end that does not visit a vertex twice.
+        :param start:
+        :param end:
+        :param path: vertices that are already on the path before start
+        :return: list of paths, in depth first order
+        """
+        return list(self.iter_all_paths(start, end, path=path))
+
+    def iter_all_paths(self, start, end, max_depth=None, max_paths=None, max_cost=None, path=()):
+        """
+        Generate the paths from start to end that do not visit a vertex twice,
+        one at a time and in the same order as find_all_paths. The search is
+        iterative, with an explicit stack of neighbor iterators and a set of
+        the vertices on the current path, so it is not limited by the
+        recursion limit and only holds the current path in memory.
+        :param start:
+        :param end:
+        :param max_depth: If not None, only paths with at most this many edges
+        :param max_paths: If not None, stop after this many paths
+        :param max_cost: If not None, only paths that cost at most this much,
+                         an edge costs 1 in an unweighted graph. Without
+                         negative weights a path is dropped as soon as it
+                         goes over the budget
+        :param path: vertices that are already on the path before start
+        :return: generator of paths, each a new list
+        """
+        if max_paths is not None and max_paths <= 0:
+            return
+        path = list(path) + [start]
         if start == end:
-            return [path]
+            yield path
+            return
         if start not in self.graph:
-            return []
-        paths = []
-        for node in self.graph[start]:
-            if node not in path:
-                new_paths = self.find_all_paths(node, end, path)
-                for new_path in new_paths:
-                    paths.append(new_path)
-        return paths
-
-    def find_shortest_path(self, start, end=None):
+            return
+        graph, weights = self.graph, self.weights
+        # With negative weights a path over the budget can still come back under it
+        prune = max_cost is not None and not self.negative_weights
+        depth_limit = float('inf') if max_depth is None else len(path) - 1 + max_depth
+        on_path = set(path)
+        costs = [0]
+        stack = [iter(graph[start])]
+        found = 0
+        while stack:
+            vertex = path[-1]
+            for node in stack[-1]:
+                if node in on_path:
+                    continue
+                cost = costs[-1] + (weights[(vertex, node)] if weights else 1)
+                if prune and cost > max_cost:
+                    continue
+                if node == end:
+                    if len(path) <= depth_limit and (max_cost is None or cost <= max_cost):
+                        yield path + [node]
+                        found += 1
+                        if found == max_paths:
+                            return
+                    continue
+                if len(path) < depth_limit and node in graph:
+                    path.append(node)
+                    on_path.add(node)
+                    costs.append(cost)
+                    stack.append(iter(graph[node]))
+                    break
+            else:
+                # Every neighbor of vertex has been tried, backtrack
+                stack.pop()
+                costs.pop()
+                on_path.discard(path.pop())
+
+    @property
+    def reverse_graph(self):
+        """
+        The reverse adjacency, a dictionary of vertex -> list of predecessors.
+        It is built on first use and then kept up to date by add_edge.
+        """
+        if self._reverse_graph is None:
+            reverse_graph = defaultdict(list)
+            for source, destinations in self.graph.items():
+                for destination in destinations:
+                    reverse_graph[destination].append(source)
+            self._reverse_graph = reverse_graph
+        return self._reverse_graph
+
+    def find_shortest_path(self, start, end=None, heap='lazy', bidirectional=False, stats=None):
+        """
+        Find the shortest path from start to end. Unweighted graphs use a
+        breadth first search, weighted graphs Dijkstra and graphs with
+        negative weights Dijkstra on their Johnson reweighting. If the graph
+        has a negative cycle, there is no reweighting and every query runs
+        Bellman-Ford from start instead, which raises ValueError only if start
+        reaches the cycle.
+        :param start:
+        :param end: If None, return the distances and parents for every vertex
+        :param heap: The Dijkstra priority queue, 'lazy' or 'indexed'
+        :param bidirectional: Search from both start and end at the same time,
+                              only used when end is given and there are no
+                              negative weights
+        :param stats: optional dictionary, the number of vertices popped and
+                      edges relaxed by the search are added to it
+        :return:
+        """
+        if self.observers:
+            return self.__observed__('find_shortest_path', self.__engine__(start, end, bidirectional), start, end,
+                                     stats, self.__find_shortest_path__, start, end, heap, bidirectional)
+        return self.__find_shortest_path__(start, end, heap, bidirectional, stats)
+
+    def __find_shortest_path__(self, start, end, heap, bidirectional, stats):
+        if self.cache is not None:
+            return self.__cached_shortest_path__(start, end, heap, bidirectional, stats)
+        return self.__shortest_path__(start, end, heap, bidirectional, stats)
+
+    def __observed__(self, query, engine, start, end, stats, search, *args):
+        """
+        Run search(*args, stats) with its own counters and report it to the observers.
+        """
+        search_stats = {}
+        cache = self.cache if query == 'find_shortest_path' else None
+        misses = cache.misses if cache is not None else None
+        start_time = perf_counter()
+        try:
+            result = search(*args, search_stats)
+        except ValueError as error:
+            if cache is not None and cache.misses == misses:
+                engine = 'cache'
+            self.__notify__(SearchEvent(query, start, end, engine, search_stats, perf_counter() - start_time,
+                                        ERROR, error=str(error)), stats)
+            raise
+        seconds = perf_counter() - start_time
+
+        path_length = len(result) if isinstance(result, list) else None
+        if cache is not None and cache.misses == misses:
+            # Served from the cache, the search never ran
+            engine, termination = 'cache', CACHED
+        elif engine == 'tree':
+            termination = PRECOMPUTED
+        elif path_length is not None:
+            termination = REACHED_END if path_length else UNREACHABLE
+        else:
+            termination = EXHAUSTED
+        self.__notify__(SearchEvent(query, start, end, engine, search_stats, seconds, termination, path_length), stats)
+        return result
+
+    def __notify__(self, event, stats):
+        if stats is not None:
+            for name, value in event.stats.items():
+                stats[name] = stats.get(name, 0) + value
+        for observer in list(self.observers):
+            observer(event)
+
+    def __cached_shortest_path__(self, start, end, heap, bidirectional, stats):
+        cache, version = self.cache, self.version
+        # A path can also come from the single source tables for start, if they are cached
+        if end is not None and not cache.contains(version, (start, end)) and cache.contains(version, (start, None)):
+            tables = cache.get(version, (start, None))
+            if tables is not MISSING:
+                self.__cache_hit__(stats)
+                if isinstance(tables, ValueError):
+                    raise ValueError(*tables.args)
+                if tables[1].get(end) is not None:
+                    return build_path(tables[1], end)
+
+        result = cache.get(version, (start, end))
+        if result is not MISSING:
+            self.__cache_hit__(stats)
+        else:
+            try:
+                result = self.__shortest_path__(start, end, heap, bidirectional, stats)
+            except ValueError as error:
+                # Errors such as a negative cycle are as expensive to find as a path, so cache them too
+                result = error
+            if isinstance(result, tuple):
+                size = len(result[0])
+            elif isinstance(result, list):
+                size = len(result)
+            else:
+                size = 1
+            cache.put(version, (start, end), result, size)
+        if isinstance(result, ValueError):
+            raise ValueError(*result.args)
+        if isinstance(result, list):
+            return list(result)
+        # The tables are kept by the cache, the caller gets copies it can change
+        return dict(result[0]), dict(result[1])
+
+    @staticmethod
+    def __cache_hit__(stats):
+        if stats is not None:
+            stats['cache_hits'] = stats.get('cache_hits', 0) + 1
+
+    def __engine__(self, start, end, bidirectional):
+        """
+        The algorithm find_shortest_path uses for a query.
+        """
+        if start in self.shortest_path_trees and not self.negative_weights:
+            return 'tree'
         if self.weights:
             if self.negative_weights:
-                return self.__bellman_ford__(start, end)
-            return self.__dijkstra__(start, end)
-        return self.__bfs__(start, end)
+                return 'johnson'
+            if bidirectional and end is not None:
+                return 'bidirectional_dijkstra'
+            return 'dijkstra'
+        if bidirectional and end is not None:
+            return 'bidirectional_bfs'
+        return 'bfs'
+
+    def __shortest_path__(self, start, end, heap, bidirectional, stats):
+        engine = self.__engine__(start, end, bidirectional)
+        if engine == 'tree':
+            return self.__from_tree__(self.shortest_path_trees[start], end)
+        if engine == 'johnson':
+            return self.__johnson_shortest_path__(start, end, heap, stats)
+        if engine == 'dijkstra':
+            return self.__dijkstra__(start, end, heap, stats)
+        if engine == 'bfs':
+            return self.__bfs__(start, end, stats)
+        return self.__bidirectional__(start, end, stats)
+
+    def astar(self, start, end, heuristic=None, landmarks=None, stats=None):
+        """
+        A* search from start to end.
+        :param start:
+        :param end:
+        :param heuristic: callable(vertex, end) that never overestimates the
+                          distance from vertex to end
+        :param landmarks: Landmarks from select_landmarks/load_landmarks, used
+                          as the heuristic if no heuristic is given
+        :param stats: optional dictionary, the number of vertices popped and
+                      edges relaxed by the search are added to it
+        :return: The shortest path as a list of vertices, empty if there is none
+        """
+        if self.observers:
+            return self.__observed__('astar', 'astar', start, end, stats, self.__astar__, start, end, heuristic, landmarks)
+        return self.__astar__(start, end, heuristic, landmarks, stats)
+
+    def __astar__(self, start, end, heuristic, landmarks, stats):
+        if self.negative_weights:
+            raise ValueError("A* does not support negative weights")
+        if heuristic is None:
+            heuristic = landmarks.heuristic if landmarks is not None else lambda vertex, goal: 0
+        return astar(self.graph, self.weights if self.weights else UnitWeights(), start, end, heuristic, stats)
 
-    def __bfs__(self, start, end=None):
+    def find_k_shortest_paths(self, start, end, k, stats=None):
+        """
+        Find the k cheapest paths from start to end that do not visit a vertex
+        twice, with Yen's algorithm, see k_shortest_paths. Graphs with negative
+        weights are searched with their Johnson reweighting, which keeps the
+        order of the paths.
+        :param start:
+        :param end:
+        :param k: the number of paths
+        :param stats: optional dictionary, the number of spur searches and the
+                      vertices popped and edges relaxed by them are added to it
+        :return: list of up to k (cost, path), cheapest first
+        """
+        if self.negative_weights:
+            johnson = self.__johnson__()
+            # Every path from start to end is shifted by the same amount
+            shift = johnson.potentials.get(end, 0) - johnson.potentials.get(start, 0)
+            return [(cost + shift, path) for cost, path in
+                    yen_k_shortest_paths(self.graph, johnson.weights, self.reverse_graph, start, end, k, stats)]
+        weights = self.weights if self.weights else UnitWeights()
+        return list(yen_k_shortest_paths(self.graph, weights, self.reverse_graph, start, end, k, stats))
+
+    def minimum_spanning_tree(self, algorithm='kruskal'):
+        """
+        The minimum spanning tree, or forest if the graph is not connected,
+        with every edge taken as undirected, see minimum_spanning_tree.
+        :param algorithm: 'kruskal' for sparse graphs, 'prim' for dense ones
+        :return: list of (source, destination, weight) edges
+        """
+        return minimum_spanning_tree(self, algorithm)
+
+    def fingerprint(self):
+        """
+        A hash of the vertices, edges and weights, used to check that saved
+        landmark tables belong to this graph.
+        """
+        return graph_fingerprint(self.graph, self.weights)
+
+    def select_landmarks(self, k, seed=0):
+        """
+        Pick k landmarks and precompute the distances to and from each of
+        them, for use with astar.
+        :return: Landmarks
+        """
+        if self.negative_weights:
+            raise ValueError("Landmarks do not support negative weights")
+        return Landmarks.select(self.graph, self.weights, self.reverse_graph, k, seed)
+
+    def load_landmarks(self, path):
+        """
+        Load landmark tables saved with Landmarks.save, raising ValueError if
+        they were computed for a different graph.
+        :return: Landmarks
+        """
+        return Landmarks.load(path, self.fingerprint())
+
+    def find_shortest_paths(self, pairs, workers=None, executor='process', ordered=True):
+        """
+        Find the shortest paths for many (source, target) pairs. Every source
+        is searched once for all of its targets and the sources are spread
+        over a pool of threads or processes, see batch_paths.
+        :param pairs: iterable of (source, target)
+        :param workers: pool size, os.cpu_count() if None, 1 for no pool
+        :param executor: 'thread' or 'process'
+        :param ordered: If True, yield results in the order of pairs, otherwise
+                        as they complete
+        :return: generator of (source, target, path), the path is empty if
+                 target cannot be reached or its source reaches a negative
+                 cycle, see find_shortest_path
+        """
+        if self.negative_weights:
+            # Compute the potentials once here, rather than once in every worker
+            try:
+                self.__johnson__()
+            except ValueError:
+                # A negative cycle, which the workers get from the search copy and fall back on
+                pass
+        return batch_shortest_paths(self, pairs, workers, executor, ordered)
+
+    def __from_tree__(self, shortest_path_tree, end):
+        """
+        Answer a query from a registered shortest path tree, in the same form
+        as __bfs__ and __dijkstra__.
+        """
+        if end is not None:
+            if end not in shortest_path_tree and end not in self.graph and self.weights:
+                raise ValueError("Invalid end node: %s" % end)
+            return shortest_path_tree.path_to(end)
+        distances, parents = dict(shortest_path_tree.distances), dict(shortest_path_tree.parents)
+        for vertex in self.graph.keys():
+            if vertex not in distances:
+                distances[vertex] = float('inf')
+                parents[vertex] = None
+        return distances, parents
+
+    def all_pairs_shortest_paths(self, sources=None, workers=None, executor='process'):
+        """
+        Single source shortest paths from many sources. Graphs with negative
+        weights use Johnson's algorithm, so Bellman-Ford only runs once and
+        every source gets a Dijkstra, spread over a thread or process pool.
+        :param sources: iterable of start vertices, every vertex with edges if None
+        :param workers: pool size, os.cpu_count() if None, 1 for no pool
+        :param executor: 'thread' or 'process'
+        :return: generator of (source, distances, parents) for the vertices
+                 reached from each source, in the order of sources
+        :raises ValueError: if the graph has a negative cycle anywhere, even
+                            one that none of the sources reach
+        """
+        if sources is None:
+            sources = list(self.graph.keys())
+        if self.negative_weights:
+            johnson = self.__johnson__()
+        else:
+            weights = self.weights if self.weights else \
+                {(vertex, neighbor): 1 for vertex, neighbors in self.graph.items() for neighbor in neighbors}
+            johnson = Johnson(self.graph, weights, {})
+        return johnson_all_pairs(johnson, sources, workers, executor)
+
+    def all_pairs_table(self, path, block_size=128):
+        """
+        Compute the distances and next hops between every pair of vertices
+        with a blocked Floyd-Warshall, written to memory mapped files in the
+        directory path. Needs NumPy and O(V^2) disk space, so it is meant for
+        graphs of up to tens of thousands of vertices. Other processes can
+        open the result with AllPairsTable.open(path).
+        :param path: directory for the table
+        :param block_size: number of pivots per block
+        :return: AllPairsTable
+        """
+        compiled = self.compile()
+        return floyd_warshall(compiled.labels, compiled.edges(), path, block_size)
+
+    def __johnson__(self, stats=None):
+        """
+        The Johnson reweighting for the current version of the graph, running
+        Bellman-Ford for the potentials only the first time it is needed.
+        :param stats: optional dictionary, the Bellman-Ford passes and edges
+                      relaxed are added to it when the potentials are computed
+        :raises ValueError: if the graph has a negative cycle anywhere, which
+                            is remembered until the next add_edge
+        """
+        if self._johnson is None or self._johnson[0] != self.version:
+            try:
+                if VECTORIZED_AVAILABLE and len(self.weights) >= VECTORIZED_MIN_EDGES:
+                    edges = self.__bellman_ford_edges__()
+                    distance_array, _ = edges.shortest_paths(None, stats)
+                    potentials = dict(zip(edges.labels, edges.distance_list(distance_array)))
+                else:
+                    potentials = bellman_ford_potentials(self.graph, self.weights, stats)
+            except ValueError:
+                self._johnson = (self.version, None)
+                raise
+            self._johnson = (self.version, Johnson(self.graph, self.weights, potentials))
+        if self._johnson[1] is None:
+            raise ValueError('The graph has a negative cycle')
+        return self._johnson[1]
+
+    def __johnson_shortest_path__(self, start, end=None, heap='lazy', stats=None):
+        """
+        Shortest paths on a graph with negative weights, with the same results
+        and errors as __bellman_ford__, but only the first query for a version
+        of the graph pays for Bellman-Ford. A graph with a negative cycle has
+        no potentials, so its queries fall back to __bellman_ford__ from
+        start, which only raises if start reaches the cycle.
+        """
+        try:
+            johnson = self.__johnson__(stats)
+        except ValueError:
+            return self.__bellman_ford__(start, end, stats=stats)
+        distances, parents = johnson.shortest_paths(start, end, heap, stats)
+        if end is not None:
+            if end in parents:
+                return build_path(parents, end)
+            if end not in johnson.potentials:
+                raise ValueError("Invalid end node %s, no such node" % end)
+            raise ValueError('No path to node %s' % end)
+
+        for vertex in johnson.potentials:
+            if vertex not in distances:
+                distances[vertex] = float('inf')
+                parents[vertex] = None
+        return distances, parents
+
+    def __bidirectional__(self, start, end, stats=None):
+        if end not in self.graph and end not in self.reverse_graph:
+            if self.weights:
+                raise ValueError("Invalid end node: %s" % end)
+            return []
+        if self.weights:
+            return bidirectional_dijkstra(self.graph, self.reverse_graph, self.weights, start, end, stats)
+        return bidirectional_bfs(self.graph, self.reverse_graph, start, end, stats)
+
+    def __bfs__(self, start, end=None, stats=None):
         """
         Use a breadth first search to determine the shortest path
         in linear time, i.e. O(n).
         :param start:
         :param end:
-        :param path:
-        :return:
+        :return: The shortest path to end, empty if the nodes are not connected,
+                 or the hop distances and parents if end is None
         """
         if start == end:
             return [start]
 
-        visited = []
-        queue = deque()
-        queue.append([start])
-        while queue:
-            current_path = queue.popleft()
-            current_node = current_path[-1]
-            if current_node not in visited:
-                neighbors = self.graph[current_node]
-
-                # Loop to iterate over the neighbours of the node. For each new neighbor
-                # add them to the current_path, the path we popped from the queue,
-                # so that the nodes can be checked if they have not already been visited.
-                for neighbor in neighbors:
-                    new_path = list(current_path)
-                    new_path.append(neighbor)
-                    # Condition to check if the neighbour node is the end
-                    if neighbor == end:
-                        return new_path
-                    queue.append(new_path)
-                visited.append(current_node)
-
-        # Condition when the nodes are not connected
-        return []
-
-    def __dijkstra__(self, start, end=None):
-        queue = deque()
-        distances = {}
-        parents = {}
+        search_tree = BreadthFirstSearchTree(self.graph, start, end, stats)
+        if end is not None:
+            return search_tree.path_to(end)
 
-        # We want the start to be at the head of the queue because it will be the vertex with the lowest
-        # distance to start.
-        queue.append(start)
+        distances, parents = search_tree.distances, search_tree.parents
         for vertex in self.graph.keys():
-            distances[vertex] = float('inf')
-            parents[vertex] = None
-            if vertex not in queue:
-                queue.append(vertex)
+            if vertex not in distances:
+                distances[vertex] = float('inf')
+                parents[vertex] = None
+        return distances, parents
 
-        distances[start] = 0
+    def bfs_tree(self, start):
+        """
+        Run one breadth first search from start over the whole graph. The
+        returned tree answers path_to(end) and distance(end) for any number
+        of destinations without searching again.
+        :param start:
+        :return: BreadthFirstSearchTree
+        """
+        return BreadthFirstSearchTree(self.graph, start)
 
-        while len(queue) > 0:
-            vertex = queue.popleft()
-            if end is not None:
-                if vertex == end:
-                    break
-            for edge in self.graph[vertex]:
-                if distances[edge] > distances[vertex] + self.weights[(vertex, edge)]:
-                    distances[edge] = distances[vertex] + self.weights[(vertex, edge)]
-                    parents[edge] = vertex
+    def __dijkstra__(self, start, end=None, heap='lazy', stats=None):
+        """
+        Dijkstra's algorithm with a real priority queue, O((V+E) log V). The
+        search stops as soon as the end vertex is settled.
+        :param start:
+        :param end:
+        :param heap: 'lazy' for heapq with lazy deletion, 'indexed' for the
+                     DijkstraMinHeap with decrease key
+        :return: The shortest path to end, or distances and parents if end is None
+        """
+        distances, parents = dijkstra(self.graph, self.weights, start, end, heap, stats)
 
         if end is not None:
             if end in parents:
-                return_deque = deque()
+                return build_path(parents, end)
+            if end in self.graph:
+                return []
+            raise ValueError("Invalid end node: %s" % end)
+
+        for vertex in self.graph.keys():
+            if vertex not in distances:
+                distances[vertex] = float('inf')
+                parents[vertex] = None
+        return distances, parents
+
+    def __bellman_ford__(self, start, end=None, vectorized=None, stats=None):
+        """
+        Bellman-Ford, for graphs with negative weights. find_shortest_path
+        answers those with Johnson's algorithm instead, see __johnson__, so
+        the vectorized engine only speeds it up through the one Bellman-Ford
+        run for the Johnson potentials.
+        :param start:
+        :param end:
+        :param vectorized: Relax the edges with NumPy, see vectorized_bellman_ford.
+                           If None, it is used when NumPy is available and
+                           the graph has at least VECTORIZED_MIN_EDGES edges.
+        :param stats: optional dictionary, the number of passes and edges
+                      relaxed are added to it
+        :return: The shortest path to end, or distances and parents if end is None
+        """
+        if vectorized is None:
+            vectorized = VECTORIZED_AVAILABLE and len(self.weights) >= VECTORIZED_MIN_EDGES
+        if vectorized:
+            distances, parents = self.__vectorized_bellman_ford__(start, stats)
+        else:
+            distances, parents = self.__python_bellman_ford__(start, stats)
+
+        if end is not None:
+            if end in parents:
+                if parents[end] is None:
+                    raise ValueError('No path to node %s' % end)
+                # print(['%s: %s' % (k,parent[k]) for k in sorted(parent.keys()) ])
+                shortest_path = [end]
                 current = end
-                while True:
-                    if current is None:
-                        return []
-                    return_deque.appendleft(current)
-                    if current == start:
-                        break
+                while current != start:
+                    shortest_path.append(parents[current])
                     current = parents[current]
-                return list(return_deque)
+                # print("The shortest path from %s to %s is: %s" % (start,
+                #                                                   end,
+                #                                                   shortest_path[::-1]))
+                return shortest_path[::-1]
             else:
-                raise ValueError("Invalid end node: %s" % end)
+                raise ValueError("Invalid end node %s, no such node" % end)
+
         return distances, parents
 
-    def __bellman_ford__(self, start, end=None):
+    def __python_bellman_ford__(self, start, stats=None):
         distances = {}
         parents = {}
 
-        for vertex in self.graph.keys():
+        # Vertices that only appear as a destination need a distance as well
+        for vertex, neighbors in self.graph.items():
             distances[vertex] = float('inf')
             parents[vertex] = None
+            for neighbor in neighbors:
+                distances[neighbor] = float('inf')
+                parents[neighbor] = None
 
         distances[start] = 0
 
-        for i in range(len(self.graph) - 1):
+        passes = 0
+        for i in range(len(distances) - 1):
             # print("Iteration %d" % i)
+            passes += 1
             distances_modified = False
             for src_dst, weight in self.weights.items():
                 if distances[src_dst[0]] + weight < distances[src_dst[1]]:
@@ -172,46 +756,47 @@ class Graph:
                 # print("Breaking out at iteration: %d" % i)
                 break
 
+        if stats is not None:
+            stats['passes'] = stats.get('passes', 0) + passes
+            stats['relaxed'] = stats.get('relaxed', 0) + passes * len(self.weights)
+
         for src_dst, weight in self.weights.items():
             if distances[src_dst[0]] + weight < distances[src_dst[1]]:
                 raise ValueError('The graph has a negative cycle')
 
-        if end is not None:
-            if end in parents:
-                if parents[end] is None:
-                    raise ValueError('No path to node %s' % end)
-                # print(['%s: %s' % (k,parent[k]) for k in sorted(parent.keys()) ])
-                shortest_path = [end]
-                current = end
-                while current != start:
-                    shortest_path.append(parents[current])
-                    current = parents[current]
-                # print("The shortest path from %s to %s is: %s" % (start,
-                #                                                   end,
-                #                                                   shortest_path[::-1]))
-                return shortest_path[::-1]
-            else:
-                raise ValueError("Invalid end node %s, no such node" % end)
+        return distances, parents
 
+    def __bellman_ford_edges__(self):
+        # The edge arrays are kept until the next add_edge
+        if self._bellman_ford_edges is None or self._bellman_ford_edges[0] != self.version:
+            self._bellman_ford_edges = (self.version, BellmanFordEdges.from_graph(self.graph, self.weights))
+        return self._bellman_ford_edges[1]
+
+    def __vectorized_bellman_ford__(self, start, stats=None):
+        edges = self.__bellman_ford_edges__()
+        if start not in edges.index:
+            # Like the edge by edge version, an unknown start only reaches itself
+            return self.__python_bellman_ford__(start, stats)
+        distance_array, parent_array = edges.shortest_paths(start, stats)
+        labels = edges.labels
+        distances = dict(zip(labels, edges.distance_list(distance_array)))
+        parents = dict(zip(labels, [None if parent < 0 else labels[parent] for parent in parent_array.tolist()]))
         return distances, parents
 
     def depth_first_search(self, start):
-        stack = [start]
-        array = []
-        while len(stack) > 0:
-            # print("Current stack: %s" % stack)
-            current = stack.pop()
-            # print("Popped: %s" % s)
-            # If current is not in the graph, i.e. not a key/parent only a child, add it to the array
-            if current not in self.graph:
-                # print("current (%s) was not in the graph %s" % (current, self.graph))
-                array.append(current)
-            if current not in array:
-                array.append(current)
-                # current is a key in the graph, and has neighbors/children
-                for node in self.graph[current]:
-                    stack.append(node)
-                    # print('Appended to stack: %s' % node)
-        # 		else:
-        # 			print("%s was in array" % current)
-        return array
+        """
+        The vertices reachable from start, in depth first order.
+        :param start:
+        :return: list of vertices
+        """
+        return list(self.iter_depth_first(start))
+
+    def iter_depth_first(self, start, order=PRE_ORDER):
+        """
+        Generate the vertices reachable from start in depth first order, see
+        traversal. The pre order is the order of depth_first_search.
+        :param start:
+        :param order: traversal.PRE_ORDER or traversal.POST_ORDER
+        :return: generator of vertices
+        """
+        return depth_first_order(start, graph_children(self.graph), order)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+from heapq import heappush, heappop
+
+from astar import UnitWeights
+from shortest_path import dijkstra, build_path
+
+
+class IncrementalShortestPaths:
+    """
+    IncrementalShortestPaths keeps the shortest path tree from one source of
+    a graphs.Graph up to date while edges are added to the graph.
+    When an edge (u, v) is inserted, or the cost of an existing edge drops,
+    only v can get closer to the source directly. If it does, v is put on a
+    priority queue and the improvement is pushed out from there the same way
+    Dijkstra relaxes edges, stopping wherever a distance does not improve.
+    The work done is proportional to the number of distances that change
+    and their edges, not the size of the graph.
+    Changes that can make distances longer, i.e. the cost of a tree edge going
+    up, fall back to recomputing the whole tree.
+    Once the graph has a negative weight the tree is marked stale and no
+    longer kept up to date: Graph.find_shortest_path answers those graphs
+    with Johnson's algorithm and never reads the tree, and a negative cycle
+    must not make add_edge fail. distance and path_to of a stale tree raise
+    a ValueError.
+    """
+    def __init__(self, graph, source):
+        """
+        :param graph: graphs.Graph
+        :param source:
+        """
+        self.graph = graph
+        self.source = source
+        self.distances = {}
+        self.parents = {}
+        self.recomputed = 0
+        self.updated = 0
+        self.stale = False
+        self.recompute()
+
+    def __contains__(self, vertex):
+        return vertex in self.distances
+
+    def __weights__(self):
+        return self.graph.weights if self.graph.weights else UnitWeights()
+
+    def recompute(self):
+        """
+        Rebuild the whole tree from scratch.
+        """
+        if self.graph.negative_weights:
+            self.__mark_stale__()
+            return
+        self.distances, self.parents = dijkstra(self.graph.graph, self.__weights__(), self.source)
+        self.recomputed += 1
+
+    def __mark_stale__(self):
+        self.stale = True
+        self.distances, self.parents = {}, {}
+
+    def __check_stale__(self):
+        if self.stale:
+            raise ValueError("The shortest path tree from %s is stale, the graph has negative weights" % self.source)
+
+    def distance(self, vertex):
+        self.__check_stale__()
+        return self.distances.get(vertex, float('inf'))
+
+    def path_to(self, end):
+        """
+        :param end:
+        :return: The shortest path from the source to end, empty if it cannot be reached
+        """
+        self.__check_stale__()
+        if end not in self.parents:
+            return []
+        return build_path(self.parents, end)
+
+    def edge_added(self, source, destination, cost, previous_cost=None):
+        """
+        Repair the tree after the edge (source, destination) was added to the
+        graph, or its cost was changed from previous_cost.
+        :param source:
+        :param destination:
+        :param cost: The cost of the edge, None for an unweighted graph
+        :param previous_cost: The cost before, if the edge was already in the graph
+        :return: The number of distances that changed
+        """
+        if cost is None:
+            cost = 1
+        if self.stale:
+            return 0
+        if self.graph.negative_weights:
+            self.__mark_stale__()
+            return 0
+        if previous_cost is not None and cost > previous_cost and self.parents.get(destination) == source:
+            self.recompute()
+            return len(self.distances)
+        if source not in self.distances:
+            return 0
+        new_distance = self.distances[source] + cost
+        if new_distance >= self.distance(destination):
+            return 0
+
+        weights = self.__weights__()
+        adjacency = self.graph.graph
+        distances, parents = self.distances, self.parents
+        distances[destination] = new_distance
+        parents[destination] = source
+        changed = 0
+        counter = 0
+        heap = [(new_distance, counter, destination)]
+        while heap:
+            distance, _, vertex = heappop(heap)
+            if distance > distances[vertex]:
+                continue
+            changed += 1
+            for neighbor in adjacency.get(vertex, ()):
+                neighbor_distance = distance + weights[(vertex, neighbor)]
+                if neighbor_distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = neighbor_distance
+                    parents[neighbor] = vertex
+                    counter += 1
+                    heappush(heap, (neighbor_distance, counter, neighbor))
+        self.updated += changed
+        return changed
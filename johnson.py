@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import os
+
+from shortest_path import dijkstra
+
+"""
+Johnson's algorithm for shortest paths on graphs with negative weights.
+
+One Bellman-Ford run, from a virtual vertex with an edge of cost 0 to every
+vertex, gives each vertex v a potential h(v). Reweighting every edge to
+    w'(u, v) = w(u, v) + h(u) - h(v)
+makes all of the weights non-negative without changing which paths are
+shortest, because every path from s to t changes by the same h(s) - h(t).
+After that, each source only needs Dijkstra on the reweighted graph, and
+    d(s, t) = d'(s, t) - h(s) + h(t)
+"""
+
+EXECUTORS = ('thread', 'process')
+
+# A reweighted cost below 0 by less than this, relative to the numbers added
+# up for it, is float rounding and taken as 0, anything lower is an error
+REWEIGHT_TOLERANCE = 1e-9
+
+# The Johnson instance each process pool worker searches, set by init_worker
+WORKER_JOHNSON = None
+
+
+def bellman_ford_potentials(graph, weights, stats=None):
+    """
+    Edge by edge Bellman-Ford from the virtual vertex.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param weights: dictionary of (src, dst) -> cost
+    :param stats: optional dictionary to add the number of passes and relaxations to
+    :return: dictionary of vertex -> potential
+    """
+    potentials = {}
+    for vertex, neighbors in graph.items():
+        potentials[vertex] = 0
+        for neighbor in neighbors:
+            potentials[neighbor] = 0
+    for src_dst in weights:
+        potentials.setdefault(src_dst[0], 0)
+        potentials.setdefault(src_dst[1], 0)
+
+    passes = 0
+    for _ in range(len(potentials)):
+        passes += 1
+        potentials_modified = False
+        for src_dst, weight in weights.items():
+            if potentials[src_dst[0]] + weight < potentials[src_dst[1]]:
+                potentials[src_dst[1]] = potentials[src_dst[0]] + weight
+                potentials_modified = True
+        if not potentials_modified:
+            break
+
+    if stats is not None:
+        stats['passes'] = stats.get('passes', 0) + passes
+        stats['relaxed'] = stats.get('relaxed', 0) + passes * len(weights)
+
+    for src_dst, weight in weights.items():
+        if potentials[src_dst[0]] + weight < potentials[src_dst[1]]:
+            raise ValueError('The graph has a negative cycle')
+    return potentials
+
+
+class Johnson:
+    """
+    Johnson holds the vertex potentials of a graph and its reweighted edges,
+    and answers single source queries with Dijkstra on them.
+    """
+    def __init__(self, graph, weights, potentials):
+        """
+        :param graph: dictionary of vertex -> list of neighbors
+        :param weights: dictionary of (src, dst) -> cost, the original weights
+        :param potentials: dictionary of vertex -> potential, see bellman_ford_potentials,
+                           a vertex that is not in it has a potential of 0
+        :raises ValueError: if a reweighted cost is negative by more than float rounding
+        """
+        self.graph = graph
+        self.potentials = potentials
+        self.weights = {}
+        for src_dst, weight in weights.items():
+            source_potential = potentials.get(src_dst[0], 0)
+            destination_potential = potentials.get(src_dst[1], 0)
+            cost = weight + source_potential - destination_potential
+            if cost < 0:
+                scale = max(1, abs(weight), abs(source_potential), abs(destination_potential))
+                if cost < -REWEIGHT_TOLERANCE * scale:
+                    raise ValueError("The potentials do not make every edge non-negative, %s -> %s costs %s" %
+                                     (src_dst[0], src_dst[1], cost))
+                cost = 0
+            self.weights[src_dst] = cost
+
+    def shortest_paths(self, start, end=None, heap='lazy', stats=None):
+        """
+        Dijkstra on the reweighted graph, with the distances mapped back to the
+        original weights.
+        :param start:
+        :param end: If not None, stop once end is settled
+        :param heap: The Dijkstra priority queue, 'lazy' or 'indexed'
+        :param stats: optional dictionary to add the counters to
+        :return: (distances, parents) for every vertex that was reached
+        """
+        distances, parents = dijkstra(self.graph, self.weights, start, end, heap, stats)
+        start_potential = self.potentials.get(start, 0)
+        potentials = self.potentials
+        return ({vertex: distance - start_potential + potentials.get(vertex, 0)
+                 for vertex, distance in distances.items()}, parents)
+
+
+def init_worker(johnson):
+    global WORKER_JOHNSON
+    WORKER_JOHNSON = johnson
+
+
+def worker_shortest_paths(start):
+    return (start,) + WORKER_JOHNSON.shortest_paths(start)
+
+
+def johnson_all_pairs(johnson, sources, workers=None, executor='process'):
+    """
+    Run the single source Dijkstra for every source, spread over a pool. The
+    arguments are checked, and sources read, straight away, the searches
+    only run as the results are iterated.
+    :param johnson: Johnson
+    :param sources: iterable of start vertices
+    :param workers: pool size, os.cpu_count() if None, 1 for no pool
+    :param executor: 'thread' or 'process'
+    :return: generator of (source, distances, parents) in the order of sources
+    """
+    if executor not in EXECUTORS:
+        raise ValueError("Invalid executor %s, must be one of: %s" % (executor, ', '.join(EXECUTORS)))
+    sources = list(sources)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(sources) <= 1:
+        return ((source,) + johnson.shortest_paths(source) for source in sources)
+    return pool_all_pairs(johnson, sources, workers, executor)
+
+
+def pool_all_pairs(johnson, sources, workers, executor):
+    # Imported here for the same reason as in batch_paths.pool_paths
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(johnson,))
+        with pool:
+            yield from pool.map(worker_shortest_paths, sources, chunksize=max(1, len(sources) // (workers * 4)))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(lambda source: (source,) + johnson.shortest_paths(source), sources)
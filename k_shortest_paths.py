@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+from heapq import heappush, heappop, nsmallest
+
+from astar import ReversedWeights
+from shortest_path import dijkstra, build_path
+
+"""
+Yen's algorithm for the k shortest loopless paths from start to end.
+
+Each new path is found by branching off the one before: for every spur
+vertex on it, the edges that the paths already found take out of the same
+root path are removed, as are the root vertices, and the shortest spur path
+to end is searched. The candidates wait on a heap and the cheapest one is
+the next path.
+
+Three things keep the spur searches cheap:
+  - The distances to end are computed once, with Dijkstra on the reverse
+    graph, and used as the A* heuristic of every spur search. Removing edges
+    can only make distances longer, so they stay a consistent lower bound,
+    and when the spur path is not blocked the search goes straight to end.
+  - A path only spurs from the vertex where it branched off its own parent
+    onwards (Lawler), the spurs before that were searched for the parent.
+  - Once the heap holds as many candidates as there are paths left to find,
+    the worst of those is an upper bound on any path that can still be
+    used. Spur vertices whose root cost plus distance to end is over it are
+    skipped, and the spur searches stop at it.
+"""
+
+
+class SpurGraph:
+    """
+    The adjacency of a graph without the root path vertices and the edges
+    that leave the spur vertex along a path already found.
+    """
+    def __init__(self, graph, spur, blocked_vertices, blocked_edges):
+        self.graph = graph
+        self.spur = spur
+        self.blocked_vertices = blocked_vertices
+        self.blocked_edges = blocked_edges
+
+    def get(self, vertex, default=()):
+        blocked_vertices = self.blocked_vertices
+        if vertex == self.spur:
+            blocked_edges = self.blocked_edges
+            return [neighbor for neighbor in self.graph.get(vertex, default)
+                    if neighbor not in blocked_vertices and neighbor not in blocked_edges]
+        return [neighbor for neighbor in self.graph.get(vertex, default) if neighbor not in blocked_vertices]
+
+
+def spur_path(graph, weights, start, end, distances_to_end, limit=float('inf'), stats=None):
+    """
+    A* from start to end with the distances to end as the heuristic, ignoring
+    any path that would cost more than limit.
+    :param graph: dictionary like adjacency with a get method
+    :param weights: dictionary of (src, dst) -> cost, must not be negative
+    :param start:
+    :param end:
+    :param distances_to_end: dictionary of vertex -> distance to end in the full graph
+    :param limit: the most the path can cost
+    :param stats: optional dictionary to add the counters to
+    :return: (cost, path), or None if there is no path within limit
+    """
+    if start not in distances_to_end or distances_to_end[start] > limit:
+        return None
+    distances = {start: 0}
+    parents = {start: None}
+    popped = relaxed = 0
+    counter = 0
+    heap = [(distances_to_end[start], counter, 0, start)]
+    result = None
+    while heap:
+        _, _, distance, vertex = heappop(heap)
+        if distance > distances[vertex]:
+            continue
+        popped += 1
+        if vertex == end:
+            result = (distance, build_path(parents, end))
+            break
+        for neighbor in graph.get(vertex, ()):
+            new_distance = distance + weights[(vertex, neighbor)]
+            relaxed += 1
+            estimate = new_distance + distances_to_end.get(neighbor, float('inf'))
+            if estimate > limit:
+                continue
+            if neighbor not in distances or new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                parents[neighbor] = vertex
+                counter += 1
+                heappush(heap, (estimate, counter, new_distance, neighbor))
+
+    if stats is not None:
+        stats['popped'] = stats.get('popped', 0) + popped
+        stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+        stats['spur_searches'] = stats.get('spur_searches', 0) + 1
+    return result
+
+
+def yen_k_shortest_paths(graph, weights, reverse_graph, start, end, k, stats=None):
+    """
+    Generate up to k loopless paths from start to end, cheapest first.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param weights: dictionary of (src, dst) -> cost, must not be negative
+    :param reverse_graph: dictionary of vertex -> list of predecessors
+    :param start:
+    :param end:
+    :param k: the number of paths
+    :param stats: optional dictionary to add the counters to
+    :return: generator of (cost, path)
+    """
+    if k <= 0:
+        return
+    distances_to_end = dijkstra(reverse_graph, ReversedWeights(weights), end)[0]
+    if start == end:
+        yield 0, [start]
+        return
+    first = spur_path(graph, weights, start, end, distances_to_end, stats=stats)
+    if first is None:
+        return
+
+    # The paths found so far, each with the index of the vertex where it branched off
+    found = [(first[0], first[1], 0)]
+    yield first
+    candidates = []
+    seen = {tuple(first[1])}
+    counter = 0
+    while len(found) < k:
+        _, path, deviation = found[-1]
+        root_costs = [0]
+        for position in range(len(path) - 1):
+            root_costs.append(root_costs[-1] + weights[(path[position], path[position + 1])])
+
+        remaining = k - len(found)
+        for position in range(deviation, len(path) - 1):
+            limit = float('inf')
+            if len(candidates) >= remaining:
+                limit = nsmallest(remaining, candidates)[-1][0]
+            spur = path[position]
+            root_cost = root_costs[position]
+            if root_cost + distances_to_end.get(spur, float('inf')) > limit:
+                if stats is not None:
+                    stats['pruned'] = stats.get('pruned', 0) + 1
+                continue
+
+            root = path[:position + 1]
+            blocked_edges = {found_path[position + 1] for _, found_path, _ in found
+                             if len(found_path) > position + 1 and found_path[:position + 1] == root}
+            spur_graph = SpurGraph(graph, spur, set(root[:-1]), blocked_edges)
+            result = spur_path(spur_graph, weights, spur, end, distances_to_end, limit - root_cost, stats)
+            if result is None:
+                continue
+            new_path = root[:-1] + result[1]
+            key = tuple(new_path)
+            if key not in seen:
+                seen.add(key)
+                counter += 1
+                heappush(candidates, (root_cost + result[0], counter, new_path, position))
+
+        if not candidates:
+            return
+        cost, _, path, deviation = heappop(candidates)
+        found.append((cost, path, deviation))
+        yield cost, path
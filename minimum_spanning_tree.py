@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+from importlib.util import find_spec
+
+from algo_expert_dijkstra import DijkstraMinHeap
+from disjoint_set_union import DSU
+
+"""
+Minimum spanning trees of weighted graphs, treating every edge as undirected.
+If the graph is not connected, the result is a minimum spanning forest, one
+tree per component.
+
+Kruskal sorts all of the edges by weight, with one NumPy argsort when NumPy
+is available, imported on the first call rather than with this module, and adds each one that DSU.union says joins two trees, until
+there are V - 1 of them. Its cost is the sort, O(E log E), and it does best
+on sparse graphs.
+
+Prim grows one tree at a time from a start vertex, keeping every vertex that
+is next to the tree in a DijkstraMinHeap keyed by its cheapest edge to the
+tree, and lowering that key with update as the tree grows. Each vertex is
+only on the heap once, so the heap stays at V entries however dense the
+graph is, which is where it beats Kruskal.
+
+Both take a graphs.Graph, where a graph without weights has a cost of 1 for
+every edge, or a weighted_graph.Graph.
+"""
+
+ALGORITHMS = ('kruskal', 'prim')
+
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+
+def graph_edges(graph):
+    """
+    The vertices and weighted edges of a graph.
+    :param graph: graphs.Graph or weighted_graph.Graph
+    :return: (labels, sources, destinations, weights), the sources and
+             destinations are indexes into labels
+    """
+    # graphs.Graph keeps the adjacency in graph, weighted_graph.Graph in edges
+    adjacency = graph.graph if hasattr(graph, 'graph') else graph.edges
+    weights = graph.weights
+    index = {}
+    labels = []
+    sources, destinations, costs = [], [], []
+    for vertex, neighbors in list(adjacency.items()):
+        for label in [vertex] + list(neighbors):
+            if label not in index:
+                index[label] = len(labels)
+                labels.append(label)
+        for neighbor in neighbors:
+            sources.append(index[vertex])
+            destinations.append(index[neighbor])
+            costs.append(weights[(vertex, neighbor)] if weights else 1)
+    return labels, sources, destinations, costs
+
+
+def kruskal(graph):
+    """
+    Kruskal's algorithm on a DSU.
+    :param graph: graphs.Graph or weighted_graph.Graph
+    :return: list of (source, destination, weight) edges of the minimum spanning forest
+    """
+    labels, sources, destinations, costs = graph_edges(graph)
+    if not labels:
+        return []
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        order = np.argsort(np.asarray(costs, dtype=np.float64), kind='stable').tolist()
+    else:
+        order = sorted(range(len(costs)), key=costs.__getitem__)
+    dsu = DSU(len(labels))
+    tree = []
+    for edge in order:
+        if dsu.union(sources[edge], destinations[edge]):
+            tree.append((labels[sources[edge]], labels[destinations[edge]], costs[edge]))
+            if len(tree) == len(labels) - 1:
+                break
+    return tree
+
+
+def prim(graph):
+    """
+    Prim's algorithm on the indexed DijkstraMinHeap.
+    :param graph: graphs.Graph or weighted_graph.Graph
+    :return: list of (source, destination, weight) edges of the minimum spanning forest
+    """
+    labels, sources, destinations, costs = graph_edges(graph)
+    neighbors = [[] for _ in labels]
+    for source, destination, cost in zip(sources, destinations, costs):
+        neighbors[source].append((destination, cost))
+        neighbors[destination].append((source, cost))
+
+    in_tree = [False] * len(labels)
+    # The cheapest known edge to the tree of every vertex on the heap, as (vertex in the tree, cost)
+    best_edges = [None] * len(labels)
+    tree = []
+    for root in range(len(labels)):
+        if in_tree[root]:
+            continue
+        heap = DijkstraMinHeap([])
+        heap.insert(root, 0)
+        while not heap.is_empty():
+            vertex, _ = heap.pop()
+            in_tree[vertex] = True
+            if best_edges[vertex] is not None:
+                parent, cost = best_edges[vertex]
+                tree.append((labels[parent], labels[vertex], cost))
+            for neighbor, cost in neighbors[vertex]:
+                if in_tree[neighbor]:
+                    continue
+                if neighbor not in heap:
+                    best_edges[neighbor] = (vertex, cost)
+                    heap.insert(neighbor, cost)
+                elif cost < best_edges[neighbor][1]:
+                    best_edges[neighbor] = (vertex, cost)
+                    heap.update(neighbor, cost)
+    return tree
+
+
+def minimum_spanning_tree(graph, algorithm='kruskal'):
+    """
+    Run the requested algorithm, see ALGORITHMS.
+    """
+    if algorithm == 'kruskal':
+        return kruskal(graph)
+    if algorithm == 'prim':
+        return prim(graph)
+    raise ValueError("Invalid algorithm %s, must be one of: %s" % (algorithm, ', '.join(ALGORITHMS)))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from bulk_union_find import BulkUnionFind
+
+"""
+Connected components of a very large edge list, built on several cores.
+
+The edges are split into shards, by default one per worker. Each shard is
+handled by a process pool worker on its own: a local BulkUnionFind joins
+the edges of the shard, and the worker returns its forest as (vertex, root)
+pairs for the vertices that are not roots. Uniting every one of those pairs
+in a global BulkUnionFind gives the components of the whole edge list,
+because both ends of every edge of a shard have the same local root. The
+global merge sees at most one pair per vertex per shard, however many edges
+the shard had, so with many more edges than vertices nearly all of the work
+is spread over the workers.
+
+The edge arrays reach the workers through the pool initializer. With the
+fork start method, the default on Linux, they are inherited rather than
+copied; elsewhere they are pickled once per worker.
+
+NumPy is required for this pipeline.
+"""
+
+# (number_of_vertices, sources, destinations) for each process pool worker to read its shards from, set by init_worker
+WORKER_EDGES = None
+
+
+def shard_forest(number_of_vertices, sources, destinations):
+    """
+    The union find forest of one shard of edges.
+    :param number_of_vertices:
+    :param sources: array of vertex ids
+    :param destinations: array of vertex ids
+    :return: (vertices, roots) arrays for every vertex of the shard that is not a root
+    """
+    forest = BulkUnionFind(number_of_vertices)
+    forest.union_many(sources, destinations)
+    vertices = np.arange(number_of_vertices)
+    roots = forest.find_many(vertices)
+    merged = roots != vertices
+    return vertices[merged], roots[merged]
+
+
+def init_worker(number_of_vertices, sources, destinations):
+    global WORKER_EDGES
+    WORKER_EDGES = (number_of_vertices, sources, destinations)
+
+
+def worker_shard_forest(bounds):
+    start, stop = bounds
+    number_of_vertices, sources, destinations = WORKER_EDGES
+    return shard_forest(number_of_vertices, sources[start:stop], destinations[start:stop])
+
+
+def component_labels(roots):
+    """
+    Number the components 0..c-1 in the order of their smallest vertex.
+    :param roots: array of the root of every vertex
+    :return: array of component labels
+    """
+    _, first_vertices, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    numbers = np.empty(len(first_vertices), dtype=np.int64)
+    numbers[np.argsort(first_vertices)] = np.arange(len(first_vertices))
+    return numbers[inverse]
+
+
+def connected_components(number_of_vertices, sources, destinations, workers=None, shards=None):
+    """
+    Label the connected components of an undirected edge list, i.e. the
+    weakly connected components if the edges are directed.
+    :param number_of_vertices: vertex ids are 0..number_of_vertices - 1
+    :param sources: array of vertex ids
+    :param destinations: array of vertex ids, the same length as sources
+    :param workers: pool size, os.cpu_count() if None, 1 for no pool
+    :param shards: number of shards, one per worker if None
+    :return: NumPy array, labels[v] is the component of v, numbered 0..c-1
+             in the order of the smallest vertex of each component
+    """
+    if np is None:
+        raise ImportError("The connected components pipeline needs numpy")
+    sources, destinations = np.asarray(sources), np.asarray(destinations)
+    if len(sources) != len(destinations):
+        raise ValueError("There must be a destination for every source")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if shards is None:
+        shards = workers
+    shard_size = max(1, -(-len(sources) // shards))
+    bounds = [(start, min(start + shard_size, len(sources))) for start in range(0, len(sources), shard_size)]
+
+    components = BulkUnionFind(number_of_vertices)
+    if len(bounds) <= 1:
+        # A single shard needs no merge
+        components.union_many(sources, destinations)
+    elif workers <= 1:
+        for start, stop in bounds:
+            components.union_many(*shard_forest(number_of_vertices, sources[start:stop], destinations[start:stop]))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=(number_of_vertices, sources, destinations))
+        with pool:
+            for vertices, roots in pool.map(worker_shard_forest, bounds):
+                components.union_many(vertices, roots)
+    return component_labels(components.find_many(np.arange(number_of_vertices)))
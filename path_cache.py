@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+from collections import OrderedDict
+from threading import RLock
+
+# Returned by PathCache.get when there is no entry for the key
+MISSING = object()
+
+
+class PathCache:
+    """
+    PathCache is a least recently used cache for shortest path results, i.e.
+    point to point paths and single source distance/parent tables.
+    The memory used is bounded by maxsize, counted in stored vertices: a path
+    costs its length and a table costs the number of vertices in it. When a
+    new entry does not fit, the least recently used entries are evicted.
+    Every entry belongs to a version of the graph. As soon as the cache is
+    used with a newer version, everything from the older one is dropped, so a
+    stale result is never returned.
+    Every method holds a lock, so one cache can be shared by the threads of
+    batch_paths' 'thread' executor. A check with contains followed by a get
+    is not atomic, the entry can be evicted in between.
+    """
+    def __init__(self, maxsize=1000000):
+        if maxsize <= 0:
+            raise ValueError("Invalid maxsize, must be greater than 0")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.size = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __check_version__(self, version):
+        if version != self.version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.size = 0
+            self.version = version
+
+    def contains(self, version, key):
+        """
+        Check for a result without counting a hit or miss or changing its place.
+        """
+        with self.lock:
+            self.__check_version__(version)
+            return key in self.entries
+
+    def get(self, version, key, default=MISSING):
+        """
+        Look up a result and mark it as the most recently used.
+        :param version: The current version of the graph
+        :param key:
+        :param default: returned, and counted as a miss, if there is no entry
+        :return: The cached value
+        """
+        with self.lock:
+            self.__check_version__(version)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, version, key, value, size=1):
+        """
+        Add a result, evicting the least recently used ones if needed. A
+        result bigger than maxsize is not cached at all.
+        :param version: The version of the graph the result was computed for
+        :param key:
+        :param value:
+        :param size: The number of vertices in value
+        :return: None
+        """
+        with self.lock:
+            self.__check_version__(version)
+            size = max(size, 1)
+            if size > self.maxsize:
+                return
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            while self.entries and self.size + size > self.maxsize:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+            self.entries[key] = (value, size)
+            self.size += size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    @property
+    def info(self):
+        """
+        The counters for the cache, as a dictionary.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'entries': len(self.entries),
+            'size': self.size,
+            'maxsize': self.maxsize,
+        }
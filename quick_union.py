@@ -22,10 +22,11 @@ class QuickUnion:
             raise ValueError("Invalid index i: %d" % i)
         while i != self.id[i]:
             i = self.id[i]
+        return i
 
     def find(self, p: int, q: int):
         self.__check_indexes__(p, q)
-        return self.id[p] == self.id[q]
+        return self.root(p) == self.root(q)
 
     def unite(self, p: int, q: int):
         self.__check_indexes__(p, q)
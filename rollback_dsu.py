@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+from disjoint_set_union import DSU
+
+
+class RollbackDSU(DSU):
+    """
+    RollbackDSU is a DSU that can undo its unions. It uses union by rank and
+    no path compression, so every union changes at most one parent and one
+    rank and a find is O(log n). Each union that merges pushes what it
+    changed onto an undo log. snapshot() returns the length of the log and
+    rollback(token) pops it back to that length, so both cost O(changes)
+    rather than the O(n) of copying the DSU for every scenario.
+    """
+    def __init__(self, size):
+        super().__init__(size)
+        self.components = size
+        # (child, root, True if the rank of root went up) for every union that merged
+        self.history = []
+
+    def find(self, x):
+        while self.par[x] != x:
+            x = self.par[x]
+        return x
+
+    def connected(self, x, y):
+        return self.find(x) == self.find(y)
+
+    def union(self, x, y):
+        xr, yr = self.find(x), self.find(y)
+        if xr == yr:
+            return False
+        if self.rnk[xr] < self.rnk[yr]:
+            xr, yr = yr, xr
+        # yr goes under xr
+        self.par[yr] = xr
+        rank_increased = self.rnk[xr] == self.rnk[yr]
+        if rank_increased:
+            self.rnk[xr] += 1
+        self.components -= 1
+        self.history.append((yr, xr, rank_increased))
+        return True
+
+    def snapshot(self):
+        """
+        :return: a token for rollback
+        """
+        return len(self.history)
+
+    def rollback(self, token):
+        """
+        Undo every union made since snapshot returned token.
+        :param token:
+        :return: None
+        """
+        if token < 0 or token > len(self.history):
+            raise ValueError("Invalid token %s, the history has %d unions" % (token, len(self.history)))
+        while len(self.history) > token:
+            child, root, rank_increased = self.history.pop()
+            self.par[child] = child
+            if rank_increased:
+                self.rnk[root] -= 1
+            self.components += 1
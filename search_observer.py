@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import logging
+from collections import defaultdict
+from threading import Lock
+
+"""
+Observers for the searches of graphs.Graph. An observer is any callable
+that takes a SearchEvent; Graph.add_observer registers it, and from then on
+every find_shortest_path and astar call on that graph is timed and reported
+to it. With no observers registered the queries run exactly as before,
+apart from one check of the observers list.
+
+LoggingObserver writes one log line per search, AggregatingObserver sums
+them up per engine and can dump the totals as Prometheus text.
+"""
+
+# Why a search stopped
+REACHED_END = 'reached_end'
+UNREACHABLE = 'unreachable'
+EXHAUSTED = 'exhausted'
+CACHED = 'cached'
+PRECOMPUTED = 'precomputed'
+ERROR = 'error'
+
+
+class SearchEvent:
+    """
+    SearchEvent describes one search.
+    query is the Graph method that was called, engine the algorithm that
+    answered it, e.g. 'bfs', 'dijkstra', 'bidirectional_dijkstra', 'johnson'
+    or 'cache', stats the counters the search added, such as popped, relaxed
+    and the Bellman-Ford passes, seconds the wall time and termination why
+    the search stopped: REACHED_END, UNREACHABLE, EXHAUSTED when there was no
+    end and every reachable vertex was searched, CACHED, PRECOMPUTED when a
+    registered shortest path tree answered it, or ERROR, with the message in
+    error.
+    """
+    def __init__(self, query, start, end, engine, stats, seconds, termination, path_length=None, error=None):
+        self.query = query
+        self.start = start
+        self.end = end
+        self.engine = engine
+        self.stats = stats
+        self.seconds = seconds
+        self.termination = termination
+        self.path_length = path_length
+        self.error = error
+
+    def __repr__(self):
+        return ('SearchEvent(%s %r -> %r, engine=%s, termination=%s, %.6fs, %s)' %
+                (self.query, self.start, self.end, self.engine, self.termination, self.seconds, self.stats))
+
+
+class LoggingObserver:
+    """
+    LoggingObserver logs every search on a logging.Logger.
+    """
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger('graphs')
+        self.level = level
+
+    def __call__(self, event):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        counters = ' '.join('%s=%s' % (name, value) for name, value in sorted(event.stats.items()))
+        self.logger.log(self.level, "%s %r -> %r engine=%s termination=%s %.3fms %s%s",
+                        event.query, event.start, event.end, event.engine, event.termination,
+                        1000 * event.seconds, counters, ' error=%s' % event.error if event.error else '')
+
+
+class AggregatingObserver:
+    """
+    AggregatingObserver keeps running totals per engine: the number of
+    searches, their total and maximum time, the sum of every counter and how
+    often each termination happened. It can be shared by several graphs and
+    used from several threads.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.searches = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.max_seconds = defaultdict(float)
+        # (engine, counter) -> total
+        self.counters = defaultdict(int)
+        # (engine, termination) -> number of searches
+        self.terminations = defaultdict(int)
+
+    def __call__(self, event):
+        engine = event.engine
+        with self.lock:
+            self.searches[engine] += 1
+            self.seconds[engine] += event.seconds
+            self.max_seconds[engine] = max(self.max_seconds[engine], event.seconds)
+            for name, value in event.stats.items():
+                self.counters[(engine, name)] += value
+            self.terminations[(engine, event.termination)] += 1
+
+    def prometheus_text(self, prefix='graph_search'):
+        """
+        The totals in the Prometheus text exposition format.
+        :param prefix: prepended to every metric name
+        :return: str
+        """
+        with self.lock:
+            lines = []
+
+            def metric(name, kind, help_text, samples):
+                lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+                lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+                for labels, value in sorted(samples):
+                    label_text = ','.join('%s="%s"' % (key, str(label).replace('"', '\\"')) for key, label in labels)
+                    lines.append('%s_%s{%s} %s' % (prefix, name, label_text, value))
+
+            metric('searches_total', 'counter', 'Searches by engine',
+                   [((('engine', engine),), count) for engine, count in self.searches.items()])
+            metric('seconds_total', 'counter', 'Wall time of the searches by engine',
+                   [((('engine', engine),), '%.9f' % seconds) for engine, seconds in self.seconds.items()])
+            metric('seconds_max', 'gauge', 'Slowest search by engine',
+                   [((('engine', engine),), '%.9f' % seconds) for engine, seconds in self.max_seconds.items()])
+            for counter in sorted({name for _, name in self.counters}):
+                metric('%s_total' % counter, 'counter', 'Sum of the %s counter by engine' % counter,
+                       [((('engine', engine),), value) for (engine, name), value in self.counters.items()
+                        if name == counter])
+            metric('terminations_total', 'counter', 'Searches by engine and why they stopped',
+                   [((('engine', engine), ('reason', termination)), count)
+                    for (engine, termination), count in self.terminations.items()])
+            return '\n'.join(lines) + '\n'
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+from heapq import heappush, heappop
+
+from algo_expert_dijkstra import DijkstraMinHeap
+
+"""
+Dijkstra's algorithm for graphs stored the way graphs.Graph stores them, i.e.
+a dictionary of vertex -> list of neighbors and a dictionary of weights keyed
+by (src, dst). Both versions are O((V+E) log V) and stop as soon as the end
+vertex has been settled, i.e. popped from the priority queue.
+
+The lazy version pushes a new entry onto a heapq every time a distance drops
+and skips the stale entries when they are popped. The indexed version keeps
+one entry per vertex in a DijkstraMinHeap and uses its update (decrease key),
+so the heap never holds more than V entries.
+
+If a stats dictionary is passed in, the number of vertices popped from the
+queue and the number of edges relaxed are added to it.
+"""
+
+HEAP_MODES = ('lazy', 'indexed')
+
+
+def lazy_dijkstra(graph, weights, start, end=None, stats=None):
+    """
+    Dijkstra using heapq with lazy deletion.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param weights: dictionary of (src, dst) -> cost
+    :param start:
+    :param end: If not None, stop once end is settled
+    :param stats: optional dictionary to add the counters to
+    :return: (distances, parents) for every vertex that was reached
+    """
+    distances = {start: 0}
+    parents = {start: None}
+    settled = set()
+    popped = relaxed = 0
+    # The insertion counter breaks ties so that the vertices themselves are never compared
+    counter = 0
+    heap = [(0, counter, start)]
+    while heap:
+        distance, _, vertex = heappop(heap)
+        if vertex in settled:
+            continue
+        settled.add(vertex)
+        popped += 1
+        if vertex == end:
+            break
+        for neighbor in graph.get(vertex, ()):
+            new_distance = distance + weights[(vertex, neighbor)]
+            relaxed += 1
+            if neighbor not in distances or new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                parents[neighbor] = vertex
+                counter += 1
+                heappush(heap, (new_distance, counter, neighbor))
+
+    if stats is not None:
+        stats['popped'] = stats.get('popped', 0) + popped
+        stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+    return distances, parents
+
+
+def indexed_dijkstra(graph, weights, start, end=None, stats=None):
+    """
+    Dijkstra using the indexed DijkstraMinHeap with decrease key. Vertices are
+    inserted into the heap when they are first reached rather than all at
+    once, so unreachable parts of the graph cost nothing.
+    :param graph: dictionary of vertex -> list of neighbors
+    :param weights: dictionary of (src, dst) -> cost
+    :param start:
+    :param end: If not None, stop once end is settled
+    :param stats: optional dictionary to add the counters to
+    :return: (distances, parents) for every vertex that was reached
+    """
+    distances = {start: 0}
+    parents = {start: None}
+    settled = set()
+    popped = relaxed = 0
+    heap = DijkstraMinHeap([])
+    heap.insert(start, 0)
+    while not heap.is_empty():
+        vertex, distance = heap.pop()
+        settled.add(vertex)
+        popped += 1
+        if vertex == end:
+            break
+        for neighbor in graph.get(vertex, ()):
+            if neighbor in settled:
+                continue
+            new_distance = distance + weights[(vertex, neighbor)]
+            relaxed += 1
+            if neighbor not in distances:
+                distances[neighbor] = new_distance
+                parents[neighbor] = vertex
+                heap.insert(neighbor, new_distance)
+            elif new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                parents[neighbor] = vertex
+                heap.update(neighbor, new_distance)
+
+    if stats is not None:
+        stats['popped'] = stats.get('popped', 0) + popped
+        stats['relaxed'] = stats.get('relaxed', 0) + relaxed
+    return distances, parents
+
+
+def dijkstra(graph, weights, start, end=None, heap='lazy', stats=None):
+    """
+    Run Dijkstra with the requested priority queue, see HEAP_MODES.
+    """
+    if heap == 'lazy':
+        return lazy_dijkstra(graph, weights, start, end, stats)
+    if heap == 'indexed':
+        return indexed_dijkstra(graph, weights, start, end, stats)
+    raise ValueError("Invalid heap mode %s, must be one of: %s" % (heap, ', '.join(HEAP_MODES)))
+
+
+def build_path(parents, end):
+    """
+    Walk the parent pointers back from end and return the path from the start.
+    :param parents: dictionary of vertex -> parent, the start has a parent of None
+    :param end:
+    :return: list of vertices
+    """
+    path = []
+    current = end
+    while current is not None:
+        path.append(current)
+        current = parents[current]
+    path.reverse()
+    return path
@@ -0,0 +1,1045 @@
+#!/usr/bin/env python3
+
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+from bellman_ford import Edge, Graph as BellmanFordGraph
+from depthFirstSearchRecursive import Node
+from graph_generators import (erdos_renyi_edges, graph_from_edges, grid_edges, power_law_edges, random_graph,
+                              road_edges)
+from all_pairs import AllPairsTable, floyd_warshall
+from edge_loader import load_edge_list
+from graph_snapshot import FORMAT_VERSION, HEADER, SortedIndex, load_snapshot, save_snapshot
+from graphs import Graph
+from johnson import Johnson
+from search_observer import AggregatingObserver, LoggingObserver
+from union_find import UnionFind
+from weighted_graph import Graph as WeightedGraph
+from traversal import POST_ORDER, PRE_ORDER, depth_first_events, depth_first_order, node_children
+from vectorized_bellman_ford import VECTORIZED_AVAILABLE
+
+UNWEIGHTED_EDGES = [
+    ('A', 'B'), ('A', 'E'), ('A', 'C'),
+    ('B', 'A'), ('B', 'D'), ('B', 'E'),
+    ('C', 'A'), ('C', 'F'), ('C', 'G'),
+    ('D', 'B'), ('D', 'E'),
+    ('E', 'A'), ('E', 'B'), ('E', 'D'),
+    ('F', 'C'),
+    ('G', 'C'),
+]
+
+WEIGHTED_EDGES = [
+    (0, 1, 4), (0, 2, 1), (2, 1, 2), (1, 3, 1), (2, 3, 5), (3, 4, 3),
+]
+
+NEGATIVE_EDGES = [
+    (0, 1, -1), (0, 5, 2), (1, 2, 2), (1, 5, -2), (2, 3, 5),
+    (2, 4, 1), (4, 3, -4), (4, 5, 3), (5, 1, 2), (5, 2, 3),
+]
+
+
+def build_graph(edges):
+    graph = Graph()
+    for edge in edges:
+        graph.add_edge(*edge)
+    return graph
+
+# The insertion order of the vertices does not match the order of their distances from 'a'
+OUT_OF_ORDER_EDGES = [
+    ('a', 'b', 10), ('a', 'c', 1), ('b', 'd', 1), ('c', 'b', 1),
+]
+
+
+class TestDijkstra(unittest.TestCase):
+    def test_heap_modes(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        for heap in ('lazy', 'indexed'):
+            self.assertEqual(graph.find_shortest_path(0, 4, heap=heap), [0, 2, 1, 3, 4])
+            distances, parents = graph.find_shortest_path(0, heap=heap)
+            self.assertEqual(distances, {0: 0, 1: 3, 2: 1, 3: 4, 4: 7})
+
+    def test_priority_order(self):
+        graph = build_graph(OUT_OF_ORDER_EDGES)
+        for heap in ('lazy', 'indexed'):
+            self.assertEqual(graph.find_shortest_path('a', heap=heap)[0]['d'], 3)
+            self.assertEqual(graph.find_shortest_path('a', 'd', heap=heap), ['a', 'c', 'b', 'd'])
+
+    def test_invalid_heap(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        with self.assertRaises(ValueError):
+            graph.find_shortest_path(0, 4, heap='fibonacci')
+
+
+class TestBreadthFirstSearch(unittest.TestCase):
+    def setUp(self):
+        self.graph = build_graph(UNWEIGHTED_EDGES)
+
+    def test_shortest_path(self):
+        self.assertEqual(self.graph.find_shortest_path('D', 'A'), ['D', 'B', 'A'])
+        self.assertEqual(self.graph.find_shortest_path('D', 'D'), ['D'])
+        self.assertEqual(self.graph.find_shortest_path('D', 'Z'), [])
+
+    def test_tree(self):
+        search_tree = self.graph.bfs_tree('A')
+        self.assertEqual(search_tree.distance('G'), 2)
+        self.assertEqual(search_tree.distance('Z'), float('inf'))
+        self.assertEqual(search_tree.path_to('D'), ['A', 'B', 'D'])
+        self.assertEqual(search_tree.tree['A'], ['B', 'E', 'C'])
+        self.assertEqual(search_tree.tree['C'], ['F', 'G'])
+
+    def test_hop_distances(self):
+        distances, parents = self.graph.find_shortest_path('A')
+        self.assertEqual(distances, {'A': 0, 'B': 1, 'E': 1, 'C': 1, 'D': 2, 'F': 2, 'G': 2})
+        self.assertEqual(parents['F'], 'C')
+        self.assertEqual(self.graph.compile().find_shortest_path('A'), (distances, parents))
+
+
+def path_cost(graph, path):
+    if not graph.weights:
+        return len(path)
+    return sum(graph.weights[(path[i], path[i + 1])] for i in range(len(path) - 1))
+
+
+def recursive_all_paths(graph, start, end, path=[]):
+    # The recursive find_all_paths that iter_all_paths replaced
+    path = path + [start]
+    if start == end:
+        return [path]
+    paths = []
+    for node in graph.graph.get(start, []):
+        if node not in path:
+            paths.extend(recursive_all_paths(graph, node, end, path))
+    return paths
+
+
+class TestAllPaths(unittest.TestCase):
+    def test_same_order_as_recursive(self):
+        for seed in range(3):
+            graph = random_graph(12, 30, seed=seed)
+            for start, end in ((0, 11), (3, 7), (5, 5), (11, 0)):
+                self.assertEqual(graph.find_all_paths(start, end), recursive_all_paths(graph, start, end))
+        graph = build_graph(UNWEIGHTED_EDGES)
+        self.assertEqual(graph.find_all_paths('A', 'G'), recursive_all_paths(graph, 'A', 'G'))
+        self.assertEqual(graph.find_all_paths('A', 'G', ['B']), recursive_all_paths(graph, 'A', 'G', ['B']))
+
+    def test_bounds(self):
+        graph = random_graph(12, 30, seed=4)
+        paths = recursive_all_paths(graph, 0, 11)
+        self.assertEqual(list(graph.iter_all_paths(0, 11, max_depth=4)), [path for path in paths if len(path) <= 5])
+        self.assertEqual(list(graph.iter_all_paths(0, 11, max_cost=150)),
+                         [path for path in paths if path_cost(graph, path) <= 150])
+        self.assertEqual(list(graph.iter_all_paths(0, 11, max_paths=3)), paths[:3])
+        self.assertEqual(list(graph.iter_all_paths(0, 11, max_paths=0)), [])
+
+    def test_negative_cost_budget(self):
+        graph = build_graph(NEGATIVE_EDGES)
+        paths = recursive_all_paths(graph, 0, 3)
+        self.assertEqual(list(graph.iter_all_paths(0, 3, max_cost=-3)),
+                         [path for path in paths if path_cost(graph, path) <= -3])
+
+    def test_lazy(self):
+        # Far too many paths to list, but the first ones come back straight away
+        graph = random_graph(3000, 12000, seed=1)
+        paths = graph.iter_all_paths(0, 2999, max_paths=100)
+        self.assertEqual(sum(1 for _ in paths), 100)
+
+
+class TestKShortestPaths(unittest.TestCase):
+    def expected_costs(self, graph, start, end, k):
+        # Parallel edges give the same vertex sequence twice in find_all_paths
+        paths = {tuple(path) for path in recursive_all_paths(graph, start, end)}
+        cost = path_cost if graph.weights else lambda graph, path: len(path) - 1
+        return sorted(cost(graph, list(path)) for path in paths)[:k]
+
+    def check(self, graph, start, end, k):
+        stats = {}
+        paths = graph.find_k_shortest_paths(start, end, k, stats)
+        self.assertEqual([round(cost, 6) for cost, _ in paths],
+                         [round(cost, 6) for cost in self.expected_costs(graph, start, end, k)])
+        self.assertEqual(len({tuple(path) for _, path in paths}), len(paths))
+        for cost, path in paths:
+            self.assertEqual((path[0], path[-1]), (start, end))
+            self.assertEqual(len(set(path)), len(path))
+        return stats
+
+    def test_matches_enumeration(self):
+        for seed in range(3):
+            for graph in (random_graph(12, 35, seed=seed), random_graph(12, 35, seed=seed, weighted=False),
+                          negative_weight_graph(10, 30, seed=seed)):
+                for k in (1, 5, 40):
+                    self.check(graph, 0, 9, k)
+                    self.check(graph, 7, 2, k)
+
+    def test_first_is_shortest(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        paths = graph.find_k_shortest_paths(0, 4, 3)
+        self.assertEqual(paths[0], (7, [0, 2, 1, 3, 4]))
+        self.assertEqual(paths[0][1], graph.find_shortest_path(0, 4))
+
+    def test_no_path(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        self.assertEqual(graph.find_k_shortest_paths(4, 0, 5), [])
+        self.assertEqual(graph.find_k_shortest_paths(0, 0, 5), [(0, [0])])
+        self.assertEqual(graph.find_k_shortest_paths(0, 4, 0), [])
+
+    def test_pruning(self):
+        graph = random_graph(2000, 8000, seed=3)
+        stats = {}
+        paths = graph.find_k_shortest_paths(0, 1500, 30, stats)
+        self.assertEqual(len(paths), 30)
+        self.assertEqual([cost for cost, _ in paths], sorted(cost for cost, _ in paths))
+        # Spurring from the branch point on skips most of the spur vertices
+        self.assertLess(stats['spur_searches'], sum(len(path) - 1 for _, path in paths))
+
+
+def list_depth_first_search(graph, start):
+    # The stack based depth_first_search that scanned the output list, with
+    # the vertices it listed more than once only kept the first time
+    stack = [start]
+    array = []
+    while stack:
+        current = stack.pop()
+        if current not in array:
+            array.append(current)
+            stack.extend(graph.get(current, []))
+    return array
+
+
+class TestTraversal(unittest.TestCase):
+    def test_same_order_as_before(self):
+        graph = build_graph(UNWEIGHTED_EDGES)
+        self.assertEqual(graph.depth_first_search('A'), list_depth_first_search(graph.graph, 'A'))
+        for seed in range(3):
+            graph = random_graph(200, 600, seed=seed)
+            for start in (0, 50, 199):
+                self.assertEqual(graph.depth_first_search(start), list_depth_first_search(graph.graph, start))
+        tree = {'A': ['D', 'C', 'B'], 'B': ['E'], 'C': ['G', 'F'], 'D': ['H'], 'E': ['I'], 'F': ['J']}
+        self.assertEqual(Graph(tree).depth_first_search('A'), ['A', 'B', 'E', 'I', 'C', 'F', 'J', 'G', 'D', 'H'])
+
+    def test_post_order(self):
+        graph = random_graph(100, 300, seed=7)
+        post_order = list(graph.iter_depth_first(0, POST_ORDER))
+        self.assertEqual(sorted(post_order), sorted(graph.depth_first_search(0)))
+        self.assertEqual(post_order[-1], 0)
+        events = list(depth_first_events(0, lambda vertex: reversed(graph.graph.get(vertex, []))))
+        # Every vertex is left after it is entered, and the events nest like brackets
+        open_vertices = []
+        for event, vertex in events:
+            if event == PRE_ORDER:
+                open_vertices.append(vertex)
+            else:
+                self.assertEqual(open_vertices.pop(), vertex)
+        self.assertEqual(open_vertices, [])
+
+    def test_node_tree(self):
+        tree = Node('A')
+        tree.addChild('B').addChild('C').addChild('D')
+        tree.children[0].addChild('E').addChild('F')
+        tree.children[2].addChild('G').addChild('H')
+        tree.children[0].children[1].addChild('I').addChild('J')
+        tree.children[2].children[0].addChild('K')
+        self.assertEqual(tree.depthFirstSearch([]), ['A', 'B', 'E', 'F', 'I', 'J', 'C', 'D', 'G', 'K', 'H'])
+        self.assertEqual([child.name for child in depth_first_order(tree, node_children, POST_ORDER)],
+                         ['E', 'I', 'J', 'F', 'B', 'C', 'K', 'G', 'H', 'D', 'A'])
+
+    def test_deep_and_lazy(self):
+        graph = Graph()
+        for vertex in range(100000):
+            graph.add_edge(vertex, vertex + 1)
+        self.assertEqual(len(graph.depth_first_search(0)), 100001)
+        self.assertEqual(next(graph.iter_depth_first(0, POST_ORDER)), 100000)
+        with self.assertRaises(ValueError):
+            next(graph.iter_depth_first(0, 'in'))
+
+
+class TestBidirectionalSearch(unittest.TestCase):
+    def check_against_one_sided(self, graph, pairs):
+        for start, end in pairs:
+            one_sided = graph.find_shortest_path(start, end)
+            both_sides = graph.find_shortest_path(start, end, bidirectional=True)
+            self.assertEqual(bool(one_sided), bool(both_sides))
+            self.assertEqual(path_cost(graph, one_sided), path_cost(graph, both_sides))
+            for i in range(len(both_sides) - 1):
+                self.assertIn(both_sides[i + 1], graph.graph[both_sides[i]])
+
+    def test_unweighted(self):
+        graph = random_graph(200, 400, seed=1, weighted=False)
+        self.check_against_one_sided(graph, [(0, end) for end in range(0, 200, 7)] + [(150, 3)])
+        self.assertEqual(build_graph(UNWEIGHTED_EDGES).find_shortest_path('D', 'Z', bidirectional=True), [])
+
+    def test_weighted(self):
+        graph = random_graph(200, 600, seed=2)
+        self.check_against_one_sided(graph, [(0, end) for end in range(0, 200, 7)] + [(150, 3)])
+
+    def test_fewer_nodes_expanded(self):
+        graph = random_graph(5000, 15000, seed=3)
+        one_sided, both_sides = {}, {}
+        graph.find_shortest_path(0, 4999, stats=one_sided)
+        graph.find_shortest_path(0, 4999, bidirectional=True, stats=both_sides)
+        self.assertLess(both_sides['popped'], one_sided['popped'])
+
+    def test_reverse_graph_follows_add_edge(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        self.assertEqual(graph.reverse_graph[1], [0, 2])
+        graph.add_edge(4, 1, 1)
+        self.assertEqual(graph.reverse_graph[1], [0, 2, 4])
+
+
+class TestAStar(unittest.TestCase):
+    def setUp(self):
+        # A 20x20 grid with edges in both directions
+        self.graph = Graph()
+        for x in range(20):
+            for y in range(20):
+                for dx, dy in ((1, 0), (0, 1)):
+                    if x + dx < 20 and y + dy < 20:
+                        cost = 1 + (x * 7 + y * 3) % 4
+                        self.graph.add_edge((x, y), (x + dx, y + dy), cost)
+                        self.graph.add_edge((x + dx, y + dy), (x, y), cost)
+
+    def test_heuristic(self):
+        def manhattan(vertex, end):
+            return abs(vertex[0] - end[0]) + abs(vertex[1] - end[1])
+        plain, guided = {}, {}
+        expected = self.graph.find_shortest_path((0, 0), (19, 12), stats=plain)
+        path = self.graph.astar((0, 0), (19, 12), manhattan, stats=guided)
+        self.assertEqual(path_cost(self.graph, path), path_cost(self.graph, expected))
+        self.assertLess(guided['popped'], plain['popped'])
+
+    def test_landmarks(self):
+        landmarks = self.graph.select_landmarks(4)
+        self.assertEqual(len(landmarks), 4)
+        for start, end in (((0, 0), (19, 19)), ((5, 17), (12, 2)), ((3, 3), (3, 3))):
+            expected = self.graph.find_shortest_path(start, end)
+            path = self.graph.astar(start, end, landmarks=landmarks)
+            self.assertEqual(path_cost(self.graph, path), path_cost(self.graph, expected))
+
+    def test_save_and_load(self):
+        landmarks = self.graph.select_landmarks(2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'landmarks.bin')
+            landmarks.save(path)
+            loaded = self.graph.load_landmarks(path)
+            self.assertEqual(loaded.landmarks, landmarks.landmarks)
+            self.assertEqual(loaded.from_landmarks, landmarks.from_landmarks)
+            self.assertEqual(loaded.to_landmarks, landmarks.to_landmarks)
+            self.graph.add_edge((0, 0), (19, 19), 1)
+            with self.assertRaises(ValueError):
+                self.graph.load_landmarks(path)
+
+            # Float distances, and a vertex that no landmark reaches
+            graph = build_graph(WEIGHTED_EDGES)
+            graph.add_edge(4, 'island', 0.5)
+            graph.add_edge('lost', 'island', 1.5)
+            landmarks = graph.select_landmarks(2)
+            landmarks.save(path)
+            loaded = graph.load_landmarks(path)
+            self.assertEqual((loaded.from_landmarks, loaded.to_landmarks),
+                             (landmarks.from_landmarks, landmarks.to_landmarks))
+
+            with open(path, 'wb') as output_file:
+                pickle.dump({'format_version': 1}, output_file)
+            with self.assertRaisesRegex(ValueError, 'not a landmarks file'):
+                graph.load_landmarks(path)
+
+
+class TestBatchShortestPaths(unittest.TestCase):
+    def setUp(self):
+        self.graph = random_graph(300, 900, seed=4)
+        self.pairs = [(source, target) for source in range(0, 300, 11) for target in range(1, 300, 37)]
+        self.pairs += [(5, 150), (5, 5), (7, 'missing')]
+
+    def expected(self, source, target):
+        try:
+            return self.graph.find_shortest_path(source, target)
+        except ValueError:
+            return []
+
+    def test_executors(self):
+        for workers, executor in ((1, 'thread'), (3, 'thread'), (2, 'process')):
+            results = list(self.graph.find_shortest_paths(self.pairs, workers=workers, executor=executor))
+            self.assertEqual([(source, target) for source, target, _ in results], self.pairs)
+            for source, target, path in results:
+                self.assertEqual(path_cost(self.graph, path), path_cost(self.graph, self.expected(source, target)))
+
+    def test_unordered(self):
+        results = list(self.graph.find_shortest_paths(self.pairs, workers=3, executor='thread', ordered=False))
+        self.assertEqual(sorted((source, str(target)) for source, target, _ in results),
+                         sorted((source, str(target)) for source, target in self.pairs))
+
+    def test_invalid_executor(self):
+        # Raised by the call, not on the first iteration
+        with self.assertRaises(ValueError):
+            self.graph.find_shortest_paths(self.pairs, executor='cluster')
+
+    def test_search_copy(self):
+        graph = negative_weight_graph(50, 150, seed=3)
+        graph.enable_cache()
+        graph.register_source(0)
+        graph.find_shortest_paths([(0, 1)], workers=1)
+        search_copy = pickle.loads(pickle.dumps(graph.__search_copy__()))
+        self.assertIsNone(search_copy.cache)
+        self.assertEqual(search_copy.shortest_path_trees, {})
+        self.assertIsNotNone(search_copy._johnson)
+        self.assertEqual(search_copy.find_shortest_path(0, 7), graph.find_shortest_path(0, 7))
+
+
+class TestPathCache(unittest.TestCase):
+    def test_hits_and_invalidation(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        cache = graph.enable_cache()
+        self.assertEqual(graph.find_shortest_path(0, 4), [0, 2, 1, 3, 4])
+        self.assertEqual(graph.find_shortest_path(0, 4), [0, 2, 1, 3, 4])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        graph.add_edge(0, 4, 2)
+        self.assertEqual(graph.find_shortest_path(0, 4), [0, 4])
+        self.assertEqual(cache.misses, 2)
+
+    def test_path_from_table(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        cache = graph.enable_cache()
+        distances, _ = graph.find_shortest_path(0)
+        self.assertEqual(graph.find_shortest_path(0, 3), [0, 2, 1, 3])
+        self.assertEqual(cache.info['hits'], 1)
+
+    def test_lru_eviction(self):
+        graph = build_graph(UNWEIGHTED_EDGES)
+        cache = graph.enable_cache(maxsize=8)
+        graph.find_shortest_path('A', 'D')
+        graph.find_shortest_path('A', 'F')
+        graph.find_shortest_path('A', 'D')
+        graph.find_shortest_path('G', 'D')
+        self.assertEqual(cache.evictions, 1)
+        self.assertTrue(cache.contains(graph.version, ('A', 'D')))
+        self.assertFalse(cache.contains(graph.version, ('A', 'F')))
+
+    def test_negative_weights(self):
+        graph = build_graph(NEGATIVE_EDGES)
+        cache = graph.enable_cache()
+        first = graph.find_shortest_path(0)
+        self.assertEqual(graph.find_shortest_path(0), first)
+        self.assertEqual(cache.hits, 1)
+        graph.add_edge(3, 0, -10)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                graph.find_shortest_path(0)
+        self.assertEqual(cache.hits, 2)
+
+    def test_tables_are_copies(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        graph.enable_cache()
+        distances, parents = graph.find_shortest_path(0)
+        distances[2] = 99
+        parents[2] = 4
+        stats = {}
+        self.assertEqual(graph.find_shortest_path(0, stats=stats), ({0: 0, 1: 3, 2: 1, 3: 4, 4: 7},
+                                                                   {0: None, 1: 2, 2: 0, 3: 1, 4: 3}))
+        self.assertEqual(stats, {'cache_hits': 1})
+
+    def test_shared_between_threads(self):
+        graph = random_graph(300, 900, seed=2)
+        graph.enable_cache(maxsize=2000)
+        pairs = [(source, (source * 7) % 300) for source in range(300)]
+        expected = [graph.find_shortest_path(source, target) for source, target in pairs]
+        graph.cache.clear()
+        self.assertEqual([path for _, _, path in graph.find_shortest_paths(pairs, workers=4, executor='thread')],
+                         expected)
+
+
+class TestIncrementalShortestPaths(unittest.TestCase):
+    def test_matches_recomputing(self):
+        graph = random_graph(300, 900, seed=5)
+        shortest_path_tree = graph.register_source(0)
+        fresh = random_graph(300, 900, seed=5)
+        for i in range(60):
+            edge = ((i * 37) % 300, (i * 91 + 7) % 300, 1 + i % 5)
+            graph.add_edge(*edge)
+            fresh.add_edge(*edge)
+            self.assertEqual(shortest_path_tree.distances,
+                             {vertex: distance for vertex, distance in fresh.find_shortest_path(0)[0].items()
+                              if distance != float('inf')})
+        self.assertEqual(shortest_path_tree.recomputed, 1)
+        self.assertEqual(path_cost(graph, graph.find_shortest_path(0, 299)), shortest_path_tree.distance(299))
+
+    def test_weight_increase_and_unweighted(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        shortest_path_tree = graph.register_source(0)
+        self.assertEqual(graph.find_shortest_path(0, 3), [0, 2, 1, 3])
+        graph.add_edge(2, 1, 10)
+        self.assertEqual(shortest_path_tree.recomputed, 2)
+        self.assertEqual(graph.find_shortest_path(0, 3), [0, 1, 3])
+
+        graph = build_graph(UNWEIGHTED_EDGES)
+        shortest_path_tree = graph.register_source('F')
+        self.assertEqual(shortest_path_tree.distance('D'), 4)
+        graph.add_edge('C', 'D')
+        self.assertEqual(shortest_path_tree.distance('D'), 2)
+        self.assertEqual(graph.find_shortest_path('F', 'D'), ['F', 'C', 'D'])
+
+    def test_negative_weight_marks_stale(self):
+        graph = Graph()
+        graph.add_edge(0, 1, 1)
+        graph.add_edge(1, 2, 1)
+        shortest_path_tree = graph.register_source(0)
+        other_tree = graph.register_source(1)
+        # Makes the negative cycle 1 -> 2 -> 1, add_edge must not raise
+        graph.add_edge(2, 1, -5)
+        self.assertEqual(graph.weights[(2, 1)], -5)
+        for tree in (shortest_path_tree, other_tree):
+            self.assertTrue(tree.stale)
+            with self.assertRaises(ValueError):
+                tree.path_to(2)
+        graph.add_edge(0, 2, 3)
+        self.assertEqual(shortest_path_tree.recomputed, 1)
+        with self.assertRaises(ValueError):
+            graph.find_shortest_path(0, 2)
+
+
+def negative_weight_graph(number_of_vertices, number_of_edges, seed):
+    # Shifting the weights by vertex potentials adds negative weights but no negative cycles
+    graph = random_graph(number_of_vertices, number_of_edges, seed=seed)
+    potentials = {vertex: (vertex * 7919) % 50 for vertex in range(number_of_vertices)}
+    shifted = Graph()
+    for (source, destination), cost in graph.weights.items():
+        shifted.add_edge(source, destination, cost + potentials[source] - potentials[destination])
+    return shifted
+
+
+@unittest.skipUnless(VECTORIZED_AVAILABLE, "numpy is not installed")
+class TestVectorizedBellmanFord(unittest.TestCase):
+    def test_matches_python(self):
+        for seed in range(3):
+            graph = negative_weight_graph(200, 800, seed)
+            try:
+                expected = graph.__bellman_ford__(0, vectorized=False)
+            except ValueError as error:
+                with self.assertRaisesRegex(ValueError, str(error)):
+                    graph.__bellman_ford__(0, vectorized=True)
+                continue
+            distances, parents = graph.__bellman_ford__(0, vectorized=True)
+            self.assertEqual(distances, expected[0])
+            for vertex, parent in parents.items():
+                if parent is not None:
+                    self.assertEqual(distances[parent] + graph.weights[(parent, vertex)], distances[vertex])
+
+    def test_distance_types(self):
+        graph = negative_weight_graph(200, 800, seed=1)
+        distances = graph.__bellman_ford__(0, vectorized=True)[0]
+        self.assertTrue(all(type(distance) is int for distance in distances.values() if distance != float('inf')))
+        self.assertTrue(all(type(potential) is int for potential in graph.__johnson__().potentials.values()))
+        graph.add_edge(0, 1, 0.5)
+        self.assertIs(type(graph.__bellman_ford__(0, vectorized=True)[0][0]), float)
+
+    def test_paths_and_errors(self):
+        graph = build_graph(NEGATIVE_EDGES)
+        self.assertEqual(graph.__bellman_ford__(0, 3, vectorized=True), [0, 1, 5, 2, 4, 3])
+        with self.assertRaises(ValueError):
+            graph.__bellman_ford__(0, 'missing', vectorized=True)
+        graph.add_edge(3, 0, -10)
+        with self.assertRaisesRegex(ValueError, 'negative cycle'):
+            graph.__bellman_ford__(0, vectorized=True)
+
+
+class TestJohnson(unittest.TestCase):
+    def setUp(self):
+        self.graph = negative_weight_graph(150, 600, seed=6)
+
+    def test_matches_bellman_ford(self):
+        for start in (0, 17, 149):
+            expected = self.graph.__bellman_ford__(start, vectorized=False)[0]
+            distances = self.graph.find_shortest_path(start)[0]
+            self.assertEqual(distances, expected)
+            path = self.graph.find_shortest_path(start, 42)
+            self.assertEqual(path_cost(self.graph, path), expected[42])
+        self.assertEqual(build_graph(NEGATIVE_EDGES).find_shortest_path(0, 3), [0, 1, 5, 2, 4, 3])
+
+    def test_potentials_are_reused(self):
+        self.graph.find_shortest_path(0)
+        johnson = self.graph.__johnson__()
+        self.graph.find_shortest_path(5, 6)
+        self.assertIs(self.graph.__johnson__(), johnson)
+        self.graph.add_edge(3, 4, -2)
+        self.assertIsNot(self.graph.__johnson__(), johnson)
+
+    def test_all_pairs(self):
+        sources = [0, 10, 20, 30]
+        for workers, executor in ((1, 'thread'), (2, 'thread'), (2, 'process')):
+            results = list(self.graph.all_pairs_shortest_paths(sources, workers, executor))
+            self.assertEqual([source for source, _, _ in results], sources)
+            for source, distances, _ in results:
+                expected = self.graph.__bellman_ford__(source, vectorized=False)[0]
+                self.assertEqual(distances, {vertex: distance for vertex, distance in expected.items()
+                                             if distance != float('inf')})
+
+    def test_invalid_executor(self):
+        # Raised by the call, not on the first iteration
+        with self.assertRaises(ValueError):
+            self.graph.all_pairs_shortest_paths([0, 1], executor='bogus')
+
+    def test_negative_cycle(self):
+        graph = build_graph(NEGATIVE_EDGES)
+        graph.add_edge(3, 0, -10)
+        with self.assertRaisesRegex(ValueError, 'negative cycle'):
+            graph.find_shortest_path(0, 3)
+        # The cycle 3 -> 0 -> ... -> 3 is not reachable from 6, so only the pairs from 0 have no path
+        graph.add_edge(6, 7, 1)
+        self.assertEqual(list(graph.find_shortest_paths([(6, 7), (0, 3)], workers=1)), [(6, 7, [6, 7]), (0, 3, [])])
+
+    def test_unreachable_negative_cycle(self):
+        graph = Graph()
+        for source, destination, cost in (('a', 'b', 1), ('b', 'c', -2), ('x', 'y', -1), ('y', 'x', -1)):
+            graph.add_edge(source, destination, cost)
+        self.assertEqual(graph.__bellman_ford__('a', 'c'), ['a', 'b', 'c'])
+        self.assertEqual(graph.find_shortest_path('a', 'c'), ['a', 'b', 'c'])
+        self.assertEqual(graph.find_shortest_path('a')[0]['c'], -1)
+        with self.assertRaisesRegex(ValueError, 'negative cycle'):
+            graph.find_shortest_path('x', 'y')
+        with self.assertRaisesRegex(ValueError, 'negative cycle'):
+            graph.__johnson__()
+
+    def test_reweighting_tolerance(self):
+        graph = {'a': ['b'], 'b': []}
+        # Potentials that really are wrong must not be clamped to 0
+        with self.assertRaisesRegex(ValueError, 'non-negative'):
+            Johnson(graph, {('a', 'b'): -1}, {})
+        # Rounding noise is
+        johnson = Johnson(graph, {('a', 'b'): 0.1 + 0.2}, {'a': 0.0, 'b': 0.30000000000000004 + 1e-16})
+        self.assertEqual(johnson.weights[('a', 'b')], 0)
+
+
+class TestCompiledGraph(unittest.TestCase):
+    def setUp(self):
+        self.unweighted = build_graph(UNWEIGHTED_EDGES)
+        self.weighted = build_graph(WEIGHTED_EDGES)
+        self.negative = build_graph(NEGATIVE_EDGES)
+
+    def test_layout(self):
+        compiled = self.weighted.compile()
+        self.assertEqual(len(compiled), 5)
+        self.assertEqual(compiled.number_of_edges, len(WEIGHTED_EDGES))
+        self.assertEqual(compiled.labels, [0, 2, 1, 3, 4])
+        self.assertEqual(compiled.neighbors(0), [1, 2])
+        self.assertEqual(list(compiled.offsets), [0, 2, 4, 5, 6, 6])
+
+    def test_bfs(self):
+        compiled = self.unweighted.compile()
+        for start in 'ABCDEFG':
+            for end in 'ABCDEFG':
+                self.assertEqual(compiled.find_shortest_path(start, end),
+                                 self.unweighted.find_shortest_path(start, end))
+
+    def test_dijkstra(self):
+        compiled = self.weighted.compile()
+        self.assertEqual(compiled.find_shortest_path(0, 4), [0, 2, 1, 3, 4])
+        distances, parents = compiled.find_shortest_path(0)
+        self.assertEqual(distances[4], 7)
+        self.assertEqual(parents[1], 2)
+
+    def test_bellman_ford(self):
+        compiled = self.negative.compile()
+        self.assertEqual(compiled.find_shortest_path(0, 3), [0, 1, 5, 2, 4, 3])
+        distances, parents = compiled.find_shortest_path(0)
+        self.assertEqual(distances, {0: 0, 1: -1, 2: 0, 3: -3, 4: 1, 5: -3})
+
+    def test_depth_first_search(self):
+        compiled = self.unweighted.compile()
+        self.assertEqual(compiled.depth_first_search('A'),
+                         self.unweighted.depth_first_search('A'))
+
+
+@unittest.skipUnless(VECTORIZED_AVAILABLE, "numpy is not installed")
+class TestAllPairsTable(unittest.TestCase):
+    def check_table(self, graph, table):
+        for start in list(graph.graph)[:10]:
+            distances = graph.find_shortest_path(start)[0]
+            for end in graph.graph:
+                expected = distances.get(end, float('inf'))
+                self.assertEqual(table.distance(start, end), expected)
+                path = table.path(start, end)
+                if expected == float('inf'):
+                    self.assertEqual(path, [])
+                else:
+                    self.assertEqual(path_cost(graph, path), path_cost(graph, graph.find_shortest_path(start, end)))
+
+    def test_matches_single_source(self):
+        # A block size that does not divide the number of vertices, so the last block is short
+        for graph in (random_graph(90, 300, seed=4), negative_weight_graph(70, 250, seed=8),
+                      random_graph(50, 120, seed=2, weighted=False)):
+            with tempfile.TemporaryDirectory() as path:
+                self.check_table(graph, graph.all_pairs_table(path, block_size=16))
+
+    def test_open(self):
+        graph = build_graph(NEGATIVE_EDGES)
+        with tempfile.TemporaryDirectory() as path:
+            graph.all_pairs_table(path, block_size=2)
+            table = AllPairsTable.open(path)
+            self.assertEqual(len(table), 6)
+            self.assertFalse(table.distances.flags.writeable)
+            self.assertEqual(table.path(0, 3), [0, 1, 5, 2, 4, 3])
+            self.assertEqual(table.distance(0, 3), -3)
+            self.assertEqual(table.path(3, 0), [])
+            self.check_table(graph, table)
+
+    def test_parallel_edges(self):
+        edges = [(0, 1, 5), (0, 1, 2), (0, 1, 9), (1, 2, 1), (2, 2, 3)]
+        for ordered_edges in (edges, edges[::-1]):
+            with tempfile.TemporaryDirectory() as path:
+                table = floyd_warshall(['a', 'b', 'c'], ordered_edges, path)
+                self.assertEqual(table.distance('a', 'b'), 2)
+                self.assertEqual(table.distance('a', 'c'), 3)
+                self.assertEqual(table.distance('c', 'c'), 0)
+                self.assertEqual(table.path('a', 'c'), ['a', 'b', 'c'])
+
+    def test_labels_are_not_pickled(self):
+        graph = build_graph(UNWEIGHTED_EDGES)
+        with tempfile.TemporaryDirectory() as path:
+            graph.all_pairs_table(path)
+            with open(os.path.join(path, 'labels.txt'), 'rb') as labels_file:
+                self.assertEqual(labels_file.read().decode()[:1], '[')
+            self.assertEqual(AllPairsTable.open(path).path('D', 'A'), ['D', 'B', 'A'])
+            with open(os.path.join(path, 'labels.txt'), 'wb') as labels_file:
+                labels_file.write(b"__import__('os').getcwd()")
+            with self.assertRaisesRegex(ValueError, 'not a list of Python literals'):
+                AllPairsTable.open(path)
+
+    def test_negative_cycle(self):
+        graph = build_graph(NEGATIVE_EDGES)
+        graph.add_edge(3, 0, -10)
+        with tempfile.TemporaryDirectory() as path:
+            with self.assertRaisesRegex(ValueError, 'negative cycle'):
+                graph.all_pairs_table(path)
+
+
+@unittest.skipUnless(VECTORIZED_AVAILABLE, "numpy is not installed")
+class TestEdgeLoader(unittest.TestCase):
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as edge_file:
+            edge_file.write(text)
+        return path
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_tuple_format(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dijkstra_edges.txt')
+        graph = Graph()
+        with open(path) as edge_file:
+            for line in edge_file:
+                source, destination, cost = line.strip().strip('()').split(',')
+                graph.add_edge(int(source), int(destination), int(cost))
+        # A chunk size smaller than a line makes every line straddle a chunk boundary
+        for chunk_size in (3, 1 << 20):
+            compiled = load_edge_list(path, chunk_size=chunk_size)
+            self.assertEqual(compiled.number_of_edges, 9)
+            for vertex in graph.graph:
+                self.assertEqual(compiled.neighbors(vertex), graph.graph[vertex])
+            for end in range(2, 11):
+                self.assertEqual(compiled.find_shortest_path(1, end), graph.find_shortest_path(1, end))
+
+    def test_csv_and_tsv(self):
+        csv_path = self.write('edges.csv', "src,dst,cost\n3,1,2.5\n1,3,-1\n\n1,7,4\n")
+        compiled = load_edge_list(csv_path)
+        self.assertEqual(compiled.labels, [1, 3, 7])
+        self.assertEqual(list(compiled.offsets), [0, 2, 3, 3])
+        self.assertEqual(compiled.neighbors(1), [3, 7])
+        self.assertEqual(list(compiled.weights), [-1, 4, 2.5])
+        self.assertTrue(compiled.negative_weights)
+
+        tsv_path = self.write('edges.tsv', "3\t1\n1\t3\n1\t7")
+        compiled = load_edge_list(tsv_path, chunk_size=4)
+        self.assertIsNone(compiled.weights)
+        self.assertEqual(compiled.find_shortest_path(3, 7), [3, 1, 7])
+
+    def test_progress(self):
+        path = self.write('edges.txt', "".join("(%d,%d,1)\n" % (vertex, vertex + 1) for vertex in range(100)))
+        reports = []
+        compiled = load_edge_list(path, chunk_size=256, progress=lambda *report: reports.append(report))
+        self.assertEqual(len(compiled), 101)
+        self.assertGreater(len(reports), 1)
+        self.assertEqual(reports[-1], (os.path.getsize(path), os.path.getsize(path), 100))
+
+    def test_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'Could not parse'):
+            load_edge_list(self.write('bad.csv', "1,2,3\n1,x,3\n"))
+        with self.assertRaisesRegex(ValueError, '2 or 3 columns'):
+            load_edge_list(self.write('wide.csv', "1,2,3,4\n"))
+        # Only the separators of the format are accepted
+        for text in ("1,2,3\n(1,3,4)\n", "1,2,3\n1;3;4\n"):
+            with self.assertRaisesRegex(ValueError, 'Could not parse'):
+                load_edge_list(self.write('mixed.csv', text))
+        with self.assertRaisesRegex(ValueError, 'integer vertices'):
+            load_edge_list(self.write('float.csv', "1.5,2,3\n"))
+
+    def test_exact_ids_and_integer_costs(self):
+        compiled = load_edge_list(self.write('big.csv', "9007199254740993,1,2\n1,9007199254740993,5\n"))
+        self.assertEqual(compiled.labels, [1, 9007199254740993])
+        self.assertEqual(compiled.weights.typecode, 'q')
+        self.assertEqual(list(compiled.weights), [5, 2])
+        self.assertEqual(compiled.neighbors(9007199254740993), [1])
+
+
+class TestGraphSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'graph.snapshot')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        for graph in (random_graph(300, 1200, seed=5), build_graph(UNWEIGHTED_EDGES), build_graph(NEGATIVE_EDGES)):
+            graph.save(self.path)
+            for mmap in (True, False):
+                loaded = Graph.load(self.path, mmap=mmap)
+                compiled = graph.compile()
+                self.assertEqual(list(loaded.labels), compiled.labels)
+                self.assertEqual(list(loaded.offsets), list(compiled.offsets))
+                self.assertEqual(loaded.negative_weights, graph.negative_weights)
+                start = compiled.labels[0]
+                self.assertEqual(loaded.depth_first_search(start), compiled.depth_first_search(start))
+                for end in compiled.labels[1:]:
+                    self.assertEqual(loaded.find_shortest_path(start, end), compiled.find_shortest_path(start, end))
+                del loaded
+
+    def test_sorted_labels(self):
+        graph = Graph()
+        for source, destination, cost in ((10, 20, 1), (20, 30, 2), (10, 30, 5), (30, 40, 1)):
+            graph.add_edge(source, destination, cost)
+        graph.save(self.path)
+        loaded = Graph.load(self.path)
+        self.assertIsInstance(loaded.index, SortedIndex)
+        self.assertIn(30, loaded)
+        self.assertNotIn(25, loaded)
+        self.assertNotIn('10', loaded)
+        self.assertEqual(loaded.find_shortest_path(10, 40), [10, 20, 30, 40])
+        self.assertEqual(loaded.neighbors(10), [20, 30])
+
+    def test_integer_weights(self):
+        # Costs above 2 ** 53 are not exact as float64
+        big = 2 ** 53 + 1
+        graph = Graph()
+        graph.add_edge(1, 2, big)
+        graph.add_edge(2, 3, -4)
+        graph.save(self.path)
+        for mmap in (True, False):
+            loaded = Graph.load(self.path, mmap=mmap)
+            self.assertEqual(list(loaded.weights), [big, -4])
+            self.assertTrue(all(type(weight) is int for weight in loaded.weights))
+            self.assertTrue(loaded.negative_weights)
+            del loaded
+        graph.add_edge(3, 4, 0.5)
+        graph.save(self.path)
+        self.assertEqual(list(Graph.load(self.path, mmap=False).weights), [float(big), -4.0, 0.5])
+
+    @unittest.skipUnless(VECTORIZED_AVAILABLE, "numpy is not installed")
+    def test_loaded_edge_list(self):
+        edges_path = os.path.join(self.directory.name, 'edges.csv')
+        with open(edges_path, 'w') as edge_file:
+            edge_file.write('1,2,%d\n2,3,7\n' % (2 ** 52 + 3))
+        compiled = load_edge_list(edges_path)
+        save_snapshot(compiled, self.path)
+        loaded = load_snapshot(self.path)
+        self.assertEqual(list(loaded.weights), list(compiled.weights))
+        self.assertEqual(memoryview(loaded.weights).format, 'q')
+        del loaded
+
+    def test_literal_labels(self):
+        graph = Graph()
+        graph.add_edge((0, 'a'), (1, b'b'), 2.5)
+        graph.add_edge((1, b'b'), (2, None), 1)
+        graph.save(self.path)
+        self.assertEqual(Graph.load(self.path).find_shortest_path((0, 'a'), (2, None)),
+                         [(0, 'a'), (1, b'b'), (2, None)])
+        graph.add_edge((2, None), object(), 1)
+        with self.assertRaisesRegex(ValueError, 'Python literals'):
+            graph.save(self.path)
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as output_file:
+            output_file.write(b'(1,2,1)\n' * 20)
+        with self.assertRaisesRegex(ValueError, 'not a graph snapshot'):
+            Graph.load(self.path)
+        build_graph(WEIGHTED_EDGES).save(self.path)
+        with open(self.path, 'r+b') as output_file:
+            output_file.seek(8)
+            output_file.write(HEADER.pack(b'', FORMAT_VERSION + 1, 0, 0, 0, *[0] * 8)[8:12])
+        with self.assertRaisesRegex(ValueError, 'Unsupported graph snapshot version'):
+            Graph.load(self.path)
+        # A labels section that would run code as a pickle is only ever parsed as a literal
+        build_graph(UNWEIGHTED_EDGES).save(self.path)
+        with open(self.path, 'r+b') as output_file:
+            position = HEADER.unpack(output_file.read(HEADER.size))[5]
+            output_file.seek(position)
+            output_file.write(b"__import__('os')")
+        with self.assertRaisesRegex(ValueError, 'not a list of Python literals'):
+            Graph.load(self.path)
+
+
+class TestMinimumSpanningTree(unittest.TestCase):
+    def check_forest(self, graph, tree, number_of_components):
+        vertices = set(graph.graph) | {neighbor for neighbors in graph.graph.values() for neighbor in neighbors}
+        index = {vertex: number for number, vertex in enumerate(vertices)}
+        forest = UnionFind(len(vertices))
+        for source, destination, _ in tree:
+            # A tree edge never closes a cycle
+            self.assertNotEqual(forest.find(index[source]), forest.find(index[destination]))
+            forest.union(index[source], index[destination])
+        self.assertEqual(forest.num_components, number_of_components)
+
+    def test_weighted_graph(self):
+        graph = WeightedGraph()
+        for edge in (('A', 'B', 4), ('A', 'H', 8), ('B', 'H', 11), ('B', 'C', 8), ('H', 'I', 7), ('H', 'G', 1),
+                     ('I', 'G', 6), ('I', 'C', 2), ('C', 'D', 7), ('C', 'F', 4), ('G', 'F', 2), ('D', 'F', 14),
+                     ('D', 'E', 9), ('F', 'E', 10)):
+            graph.add_edge(*edge)
+        for algorithm in ('kruskal', 'prim'):
+            tree = graph.minimum_spanning_tree(algorithm)
+            self.assertEqual(len(tree), 8)
+            self.assertEqual(sum(weight for _, _, weight in tree), 37)
+
+    def test_kruskal_matches_prim(self):
+        for seed in range(4):
+            graph = random_graph(200, 1500, seed=seed)
+            kruskal_tree = graph.minimum_spanning_tree('kruskal')
+            prim_tree = graph.minimum_spanning_tree('prim')
+            self.assertEqual(sum(weight for _, _, weight in kruskal_tree), sum(weight for _, _, weight in prim_tree))
+            self.check_forest(graph, kruskal_tree, 1)
+            self.check_forest(graph, prim_tree, 1)
+
+    def test_forest(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        graph.add_edge(10, 11, 3)
+        graph.add_edge(11, 12, 1)
+        graph.add_edge(12, 10, 2)
+        for algorithm in ('kruskal', 'prim'):
+            tree = graph.minimum_spanning_tree(algorithm)
+            self.check_forest(graph, tree, 2)
+            self.assertEqual(len(tree), 6)
+        unweighted = build_graph(UNWEIGHTED_EDGES)
+        self.assertEqual(len(unweighted.minimum_spanning_tree('prim')), 6)
+        self.assertEqual(Graph().minimum_spanning_tree(), [])
+        with self.assertRaises(ValueError):
+            graph.minimum_spanning_tree('boruvka')
+
+
+class TestGraphGenerators(unittest.TestCase):
+    def test_edge_lists(self):
+        for edges in (grid_edges(6, 7, seed=1), erdos_renyi_edges(40, 150, seed=1),
+                      power_law_edges(40, 2, seed=1), road_edges(6, 7, seed=1)):
+            pairs = [(source, destination) for source, destination, _ in edges]
+            self.assertEqual(len(pairs), len(set(pairs)))
+            self.assertTrue(all(source != destination for source, destination in pairs))
+            self.assertTrue(all(weight >= 1 for _, _, weight in edges))
+        self.assertEqual(len(grid_edges(6, 7)), 2 * (6 * 6 + 5 * 7))
+        self.assertEqual(len(erdos_renyi_edges(40, 150)), 150)
+        self.assertEqual(road_edges(6, 7, seed=2), road_edges(6, 7, seed=2))
+        with self.assertRaises(ValueError):
+            erdos_renyi_edges(3, 7)
+
+    def test_engines_agree(self):
+        edges = power_law_edges(60, 2, seed=3)
+        graph = graph_from_edges(edges)
+        distances, _ = graph.find_shortest_path(0)
+        bellman_ford, _ = BellmanFordGraph([Edge(*edge) for edge in edges], 60).shortest_distances(0)
+        self.assertEqual([distances[vertex] for vertex in range(60)], bellman_ford)
+
+
+class TestSearchObserver(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+
+    def test_dijkstra(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        graph.add_observer(self.events.append)
+        stats = {}
+        self.assertEqual(graph.find_shortest_path(0, 4, stats=stats), [0, 2, 1, 3, 4])
+        event, = self.events
+        self.assertEqual((event.query, event.engine, event.termination, event.path_length),
+                         ('find_shortest_path', 'dijkstra', 'reached_end', 5))
+        self.assertEqual(event.stats, stats)
+        self.assertGreater(stats['popped'], 0)
+        graph.find_shortest_path(0)
+        self.assertEqual(self.events[-1].termination, 'exhausted')
+        graph.remove_observer(self.events.append)
+        graph.find_shortest_path(0, 4)
+        self.assertEqual(len(self.events), 2)
+
+    def test_engines(self):
+        graph = build_graph(UNWEIGHTED_EDGES)
+        graph.add_edge('H', 'I')
+        graph.add_observer(self.events.append)
+        graph.find_shortest_path('A', 'H')
+        graph.find_shortest_path('A', 'D', bidirectional=True)
+        graph.astar('A', 'D')
+        self.assertEqual([(event.engine, event.termination) for event in self.events],
+                         [('bfs', 'unreachable'), ('bidirectional_bfs', 'reached_end'), ('astar', 'reached_end')])
+
+    def test_johnson_passes(self):
+        graph = build_graph(NEGATIVE_EDGES)
+        graph.add_observer(self.events.append)
+        graph.find_shortest_path(0, 3)
+        graph.find_shortest_path(0, 3)
+        self.assertEqual([event.engine for event in self.events], ['johnson', 'johnson'])
+        # Only the first query runs Bellman-Ford for the potentials
+        self.assertGreater(self.events[0].stats['passes'], 0)
+        self.assertNotIn('passes', self.events[1].stats)
+
+    def test_cache_and_errors(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        graph.enable_cache()
+        graph.add_observer(self.events.append)
+        graph.find_shortest_path(0, 4)
+        graph.find_shortest_path(0, 4)
+        with self.assertRaises(ValueError):
+            graph.find_shortest_path(0, 'missing')
+        self.assertEqual([(event.engine, event.termination) for event in self.events],
+                         [('dijkstra', 'reached_end'), ('cache', 'cached'), ('dijkstra', 'error')])
+        self.assertIn('missing', self.events[-1].error)
+
+    def test_aggregating_and_logging(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        totals = graph.add_observer(AggregatingObserver())
+        graph.add_observer(LoggingObserver())
+        with self.assertLogs('graphs', 'INFO') as logs:
+            graph.find_shortest_path(0, 4)
+            graph.find_shortest_path(0, 3)
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('engine=dijkstra', logs.output[0])
+        text = totals.prometheus_text()
+        self.assertIn('# TYPE graph_search_searches_total counter', text)
+        self.assertIn('graph_search_searches_total{engine="dijkstra"} 2', text)
+        self.assertIn('graph_search_terminations_total{engine="dijkstra",reason="reached_end"} 2', text)
+        self.assertIn('graph_search_popped_total{engine="dijkstra"}', text)
+
+    def test_pickle_drops_observers(self):
+        graph = build_graph(WEIGHTED_EDGES)
+        graph.add_observer(AggregatingObserver())
+        copy = pickle.loads(pickle.dumps(graph))
+        self.assertEqual(copy.observers, [])
+        self.assertEqual(copy.find_shortest_path(0, 4), [0, 2, 1, 3, 4])
+
+
+class TestHeadlessImports(unittest.TestCase):
+    def test_core_modules_need_only_the_standard_library(self):
+        modules = ['traversal', 'breadthFirstSearch', 'depthFirstSearch', 'depthFirstSearchRecursive', 'graph_plotting',
+                   'graphs', 'bfs_shortest_path']
+        code = ('import sys, %s; print(" ".join(sorted({name.split(".")[0] for name in sys.modules})))' %
+                ', '.join(modules))
+        process = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                 capture_output=True, text=True)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        loaded = set(process.stdout.split())
+        # NumPy is only imported by the engines that use it, and multiprocessing by the process pools
+        self.assertFalse(loaded & {'networkx', 'matplotlib', 'numpy', 'multiprocessing'})
+        self.assertTrue(set(modules) <= loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,13 @@
 #!/usr/bin/env python3
 
 import unittest
+from collections import defaultdict
+from random import Random
+from bulk_union_find import BULK_AVAILABLE, BulkUnionFind
+from dynamic_connectivity import ADD, QUERY, REMOVE, offline_connectivity
+from parallel_components import connected_components
+from quick_union import QuickUnion
+from rollback_dsu import RollbackDSU
 from union_find import UnionFind
 
 class TestUnionFind(unittest.TestCase):
@@ -35,5 +42,236 @@ class TestUnionFind(unittest.TestCase):
                          self.uf.union_find)
 
 
+class TestQuickUnion(unittest.TestCase):
+    def test_find_follows_roots(self):
+        qu = QuickUnion(5)
+        qu.unite(0, 1)
+        qu.unite(1, 2)
+        qu.unite(3, 4)
+        self.assertEqual(qu.root(0), 2)
+        self.assertTrue(qu.find(0, 2))
+        self.assertFalse(qu.find(0, 3))
+
+
+def brute_force_sets(uf):
+    sets = defaultdict(set)
+    for index in range(len(uf.union_find)):
+        sets[uf.find(index)].add(index)
+    return sets
+
+
+def check_component_index(test, uf):
+    sets = brute_force_sets(uf)
+    test.assertEqual(uf.num_components, len(sets))
+    for root, members in sets.items():
+        test.assertEqual(uf.size(root), len(members))
+        member_list = list(uf.members(min(members)))
+        test.assertEqual(member_list[0], root)
+        test.assertEqual(sorted(member_list), sorted(members))
+    expected = sorted(((root, len(members)) for root, members in sets.items()), key=lambda item: (-item[1], item[0]))
+    test.assertEqual(uf.largest_components(5), expected[:5])
+    test.assertEqual(uf.most_members, [item for item in expected if item[1] == expected[0][1]])
+
+
+class TestComponentIndex(unittest.TestCase):
+    def test_random_unions(self):
+        random = Random(1)
+        uf = UnionFind(300)
+        for step in range(250):
+            uf.union(random.randrange(300), random.randrange(300))
+            if step % 50 == 0:
+                check_component_index(self, uf)
+        check_component_index(self, uf)
+
+    def test_initial(self):
+        uf = UnionFind(4)
+        self.assertEqual(uf.num_components, 4)
+        self.assertEqual(uf.size(2), 1)
+        self.assertEqual(list(uf.members(2)), [2])
+        self.assertEqual(uf.most_members, [(0, 1), (1, 1), (2, 1), (3, 1)])
+        self.assertEqual(UnionFind(0).most_members, [])
+
+    def test_ties(self):
+        uf = UnionFind(6)
+        uf.union(0, 1)
+        uf.union(4, 5)
+        self.assertEqual(uf.most_members, [(1, 2), (5, 2)])
+        uf.union(1, 5)
+        self.assertEqual(uf.most_members, [(5, 4)])
+        self.assertEqual(uf.largest_components(3), [(5, 4), (2, 1), (3, 1)])
+
+
+def same_partition(first_roots, second_roots):
+    # Two lists of roots describe the same sets if the roots map one to one
+    pairs = set(zip(first_roots, second_roots))
+    return len(pairs) == len(set(first_roots)) == len(set(second_roots))
+
+
+@unittest.skipUnless(BULK_AVAILABLE, "numpy is not installed")
+class TestBulkUnionFind(unittest.TestCase):
+    def test_matches_scalar(self):
+        random = Random(0)
+        for number, edges in ((10, 5), (1000, 800), (2000, 6000)):
+            firsts = [random.randrange(number) for _ in range(edges)]
+            seconds = [random.randrange(number) for _ in range(edges)]
+            uf = UnionFind(number)
+            for first, second in zip(firsts, seconds):
+                uf.union(first, second)
+            bulk = BulkUnionFind(number)
+            bulk.union_many(firsts, seconds)
+            roots = bulk.find_many(list(range(number))).tolist()
+            self.assertTrue(same_partition([uf.find(index) for index in range(number)], roots))
+            self.assertEqual([bulk.find(index) for index in range(number)], roots)
+
+    def test_mixed_with_scalar(self):
+        bulk = BulkUnionFind(10)
+        bulk.union(1, 3)
+        bulk.union_many([2, 5, 8], [3, 6, 9])
+        bulk.union(6, 8)
+        self.assertEqual(bulk.find_many([1, 2, 3]).tolist(), [bulk.find(1)] * 3)
+        self.assertEqual(len(set(bulk.find_many([5, 6, 8, 9]).tolist())), 1)
+        self.assertNotEqual(bulk.find(1), bulk.find(5))
+        self.assertEqual(bulk.find(0), 0)
+
+    def test_largest_mixed_with_scalar(self):
+        # union_many and union both put the root of {0, 1, 2, 5} on the largest heap with size 4
+        bulk = BulkUnionFind(10)
+        bulk.union_many([0, 1], [1, 2])
+        bulk.union(0, 5)
+        root = bulk.find(0)
+        self.assertEqual(bulk.largest_components(3), [(root, 4), (3, 1), (4, 1)])
+        self.assertEqual(bulk.most_members, [(root, 4)])
+
+    def test_largest_heap_is_bounded(self):
+        random = Random(3)
+        for uf in (UnionFind(2000), BulkUnionFind(2000)):
+            for _ in range(20):
+                firsts = [random.randrange(2000) for _ in range(100)]
+                seconds = [random.randrange(2000) for _ in range(100)]
+                if isinstance(uf, BulkUnionFind):
+                    uf.union_many(firsts, seconds)
+                for first, second in zip(firsts, seconds):
+                    uf.union(first, second)
+                uf.largest_components(5)
+                self.assertLessEqual(len(uf.largest), 2 * uf.num_components)
+            check_component_index(self, uf)
+
+    def test_component_index(self):
+        random = Random(2)
+        bulk = BulkUnionFind(500)
+        for _ in range(3):
+            bulk.union_many([random.randrange(500) for _ in range(150)], [random.randrange(500) for _ in range(150)])
+            bulk.union(random.randrange(500), random.randrange(500))
+            check_component_index(self, bulk)
+
+    def test_long_chain(self):
+        number = 100000
+        bulk = BulkUnionFind(number)
+        bulk.union_many(range(number - 1), range(1, number))
+        self.assertEqual(len(set(bulk.find_many(range(number)).tolist())), 1)
+
+    def test_invalid(self):
+        bulk = BulkUnionFind(5)
+        with self.assertRaises(ValueError):
+            bulk.union_many([0, 1], [2])
+        with self.assertRaises(ValueError):
+            bulk.find_many([5])
+        with self.assertRaises(ValueError):
+            bulk.find_many([0.5])
+
+
+@unittest.skipUnless(BULK_AVAILABLE, "numpy is not installed")
+class TestConnectedComponents(unittest.TestCase):
+    def setUp(self):
+        random = Random(3)
+        self.number = 2000
+        self.sources = [random.randrange(self.number) for _ in range(1500)]
+        self.destinations = [random.randrange(self.number) for _ in range(1500)]
+
+    def test_matches_union_find(self):
+        uf = UnionFind(self.number)
+        for source, destination in zip(self.sources, self.destinations):
+            uf.union(source, destination)
+        roots = [uf.find(index) for index in range(self.number)]
+        for workers, shards in ((1, None), (1, 7), (2, None), (2, 5)):
+            labels = connected_components(self.number, self.sources, self.destinations, workers, shards).tolist()
+            self.assertTrue(same_partition(roots, labels))
+            # Numbered in the order of the first vertex of each component
+            first_seen = list(dict.fromkeys(labels))
+            self.assertEqual(first_seen, list(range(len(first_seen))))
+
+    def test_no_edges(self):
+        self.assertEqual(connected_components(3, [], [], workers=1).tolist(), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            connected_components(3, [0], [], workers=1)
+
+
+class TestRollbackDSU(unittest.TestCase):
+    def test_rollback(self):
+        dsu = RollbackDSU(6)
+        dsu.union(0, 1)
+        token = dsu.snapshot()
+        parents, ranks = list(dsu.par), list(dsu.rnk)
+        dsu.union(2, 3)
+        dsu.union(1, 3)
+        self.assertFalse(dsu.union(0, 2))
+        self.assertTrue(dsu.connected(0, 2))
+        self.assertEqual(dsu.components, 3)
+        dsu.rollback(token)
+        self.assertEqual((dsu.par, dsu.rnk), (parents, ranks))
+        self.assertEqual(dsu.components, 5)
+        self.assertTrue(dsu.connected(0, 1))
+        self.assertFalse(dsu.connected(0, 2))
+        with self.assertRaises(ValueError):
+            dsu.rollback(token + 1)
+
+
+def brute_force_connectivity(number, operations):
+    edges = []
+    answers = []
+    for operation, first, second in operations:
+        if operation == ADD:
+            edges.append({first, second})
+        elif operation == REMOVE:
+            edges.remove({first, second})
+        else:
+            uf = UnionFind(number)
+            for edge in edges:
+                uf.union(min(edge), max(edge))
+            answers.append(uf.find(first) == uf.find(second))
+    return answers
+
+
+class TestOfflineConnectivity(unittest.TestCase):
+    def test_matches_brute_force(self):
+        random = Random(5)
+        for _ in range(100):
+            number = random.randrange(1, 12)
+            operations = []
+            edges = []
+            for _ in range(random.randrange(60)):
+                choice = random.random()
+                if choice < 0.4:
+                    edge = (random.randrange(number), random.randrange(number))
+                    operations.append((ADD,) + edge)
+                    edges.append(edge)
+                elif choice < 0.6 and edges:
+                    second, first = edges.pop(random.randrange(len(edges)))
+                    operations.append((REMOVE, first, second))
+                else:
+                    operations.append((QUERY, random.randrange(number), random.randrange(number)))
+            self.assertEqual(offline_connectivity(number, operations), brute_force_connectivity(number, operations))
+
+    def test_multi_edges(self):
+        operations = [(ADD, 0, 1), (ADD, 1, 0), (REMOVE, 0, 1), (QUERY, 0, 1), (REMOVE, 1, 0), (QUERY, 1, 0)]
+        self.assertEqual(offline_connectivity(2, operations), [True, False])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            offline_connectivity(2, [(REMOVE, 0, 1)])
+        with self.assertRaises(ValueError):
+            offline_connectivity(2, [('delete', 0, 1)])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+One iterative depth first traversal for both the dictionary graphs, i.e.
+vertex -> list of neighbors, and trees of Node objects with a children list.
+
+The traversal keeps an explicit stack of child iterators, so deep graphs do
+not hit the recursion limit, and a visited set, so checking a vertex is O(1)
+instead of a scan of the output. It yields an event for every vertex as it
+is entered (PRE_ORDER) and as it is left, once all of its children are done
+(POST_ORDER), and nothing is computed until the caller asks for the next one.
+
+The order of the children comes from the children callable. graph_children
+walks the neighbors from last to first, which is the order the stack based
+depth_first_search functions have always visited them in, and node_children
+walks them first to last, as Node.depthFirstSearch does.
+"""
+
+PRE_ORDER = 'pre'
+POST_ORDER = 'post'
+ORDERS = (PRE_ORDER, POST_ORDER)
+
+
+def graph_children(graph):
+    """
+    :param graph: dictionary of vertex -> list of neighbors
+    :return: children callable for depth_first_events
+    """
+    def children(vertex):
+        return reversed(graph[vertex]) if vertex in graph else ()
+    return children
+
+
+def node_children(node):
+    """
+    The children callable for trees of Node objects.
+    """
+    return node.children
+
+
+def depth_first_events(start, children):
+    """
+    Depth first traversal from start.
+    :param start:
+    :param children: callable(vertex) returning its children in the order to visit them
+    :return: generator of (PRE_ORDER or POST_ORDER, vertex)
+    """
+    visited = {start}
+    stack = [(start, iter(children(start)))]
+    yield PRE_ORDER, start
+    while stack:
+        vertex, remaining = stack[-1]
+        for child in remaining:
+            if child not in visited:
+                visited.add(child)
+                yield PRE_ORDER, child
+                stack.append((child, iter(children(child))))
+                break
+        else:
+            stack.pop()
+            yield POST_ORDER, vertex
+
+
+def depth_first_order(start, children, order=PRE_ORDER):
+    """
+    The vertices of a depth first traversal in pre or post order.
+    :param start:
+    :param children: callable(vertex) returning its children in the order to visit them
+    :param order: PRE_ORDER or POST_ORDER
+    :return: generator of vertices
+    """
+    if order not in ORDERS:
+        raise ValueError("Invalid order %s, must be one of: %s" % (order, ', '.join(ORDERS)))
+    for event, vertex in depth_first_events(start, children):
+        if event == order:
+            yield vertex
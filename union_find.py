@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 from collections import defaultdict
+from heapq import heapify, heappush, heappop
 
 
 # A Union Find class, aka Disjoint Set Union
@@ -12,23 +13,97 @@ class UnionFind:
     is, according to Wikipedia, alpha(n) or "Inverse Ackermann" time. It
     also says that it may be O(log*n).
     The class is initialized with the number of expected elements.
+    The size of every set is kept at its root and the number of sets as
+    num_components, both updated by union. The members of each set are a
+    circular linked list through next_member, which union joins in O(1) by
+    swapping the next members of the two roots. The largest sets come from a
+    heap of (-size, root) that union pushes onto, entries for roots that
+    have since been merged or grown are skipped when they come to the top,
+    and the heap is rebuilt from its live entries once it holds more than
+    twice as many entries as there are sets.
     """
     def __init__(self, number):
         self.union_find = list(range(number))
         self.ranks = [0] * number
+        self.sizes = [1] * number
+        self.next_member = list(range(number))
+        self.num_components = number
+        self.largest = []
 
     @property
     def most_members(self):
         """
-        This function will return the parent with the most members.
+        The sets with the most members.
+        :return: list of (root, size) for every set of the largest size
         """
-        most_members = -1
-        for parent in set(self.union_find):
-            if most_members < 0:
-                most_members = parent
-            if self.union_find.count(parent) > self.union_find.count(most_members):
-                most_members = parent
-        return most_members
+        largest = self.largest_components(1)
+        if not largest:
+            return []
+        return self.largest_components(self.num_components, largest[0][1])
+
+    def size(self, index):
+        """
+        :return: The number of members in the set of index
+        """
+        return self.sizes[self.find(index)]
+
+    def members(self, index):
+        """
+        Generate the members of the set of index, starting with its root.
+        """
+        root = self.find(index)
+        yield root
+        member = self.next_member[root]
+        while member != root:
+            yield member
+            member = self.next_member[member]
+
+    def __refresh_largest__(self):
+        """
+        Bring the largest heap up to date before it is read, union already does.
+        """
+
+    def __compact_largest__(self):
+        """
+        Drop the stale and repeated entries from the largest heap once it holds
+        more than twice as many entries as there are sets. At least a third of
+        that many unions come between two rebuilds, so each union pays O(1) for them.
+        """
+        if len(self.largest) <= 2 * self.num_components:
+            return
+        union_find, sizes = self.union_find, self.sizes
+        self.largest = [(negative_size, root) for negative_size, root in set(self.largest)
+                        if union_find[root] == root and sizes[root] == -negative_size]
+        heapify(self.largest)
+
+    def largest_components(self, k, min_size=1):
+        """
+        The k largest sets, largest first and by root when the sizes are equal.
+        :param k:
+        :param min_size: only sets with at least this many members
+        :return: list of (root, size)
+        """
+        self.__refresh_largest__()
+        largest = self.largest
+        components = []
+        emitted = set()
+        while largest and len(components) < k and -largest[0][0] >= min_size:
+            negative_size, root = heappop(largest)
+            # Drop the entries for roots that were merged into another set or have grown since,
+            # and the second copy of an entry that both union and union_many pushed
+            if self.union_find[root] == root and self.sizes[root] == -negative_size and root not in emitted:
+                emitted.add(root)
+                components.append((root, -negative_size))
+        for root, size in components:
+            heappush(largest, (-size, root))
+        if len(components) < k and min_size <= 1:
+            # Sets of one are never pushed
+            for root in range(len(self.union_find)):
+                if len(components) == k:
+                    break
+                if self.union_find[root] == root and self.sizes[root] == 1:
+                    components.append((root, 1))
+        return components
 
     def find(self, index):
         """
@@ -60,6 +135,13 @@ class UnionFind:
             self.union_find[first] = self.union_find[second]
         elif self.ranks[first] > self.ranks[second]:
             self.union_find[second] = self.union_find[first]
+            first, second = second, first
         else:
             self.union_find[first] = self.union_find[second]
             self.ranks[second] += 1
+        # first is now under the root second
+        self.sizes[second] += self.sizes[first]
+        self.num_components -= 1
+        self.next_member[first], self.next_member[second] = self.next_member[second], self.next_member[first]
+        heappush(self.largest, (-self.sizes[second], second))
+        self.__compact_largest__()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+from importlib.util import find_spec
+
+"""
+Bellman-Ford for graphs with negative weights, with the edges kept in
+parallel NumPy src/dst/weight arrays instead of one Python object per edge.
+Every pass relaxes all of the edges at once: the candidate distances
+dist[src] + weight are gathered in one vectorized operation and the minimum
+per destination is scattered back. Because every pass only reads the
+distances from the pass before, it can take a few more passes than the edge
+by edge version, but each of them runs at C speed.
+
+NumPy is optional, VECTORIZED_AVAILABLE says whether this engine can be used.
+It is only imported once a BellmanFordEdges is built, so importing this
+module stays cheap.
+"""
+
+VECTORIZED_AVAILABLE = find_spec('numpy') is not None
+
+
+class BellmanFordEdges:
+    """
+    The edges of a graph as parallel arrays, sorted by destination so the
+    minimum candidate for every destination is a single reduceat.
+    Vertex labels are interned to dense ints, labels[i] is the label of i.
+    """
+    def __init__(self, labels, sources, destinations, weights):
+        if not VECTORIZED_AVAILABLE:
+            raise ImportError("The vectorized Bellman-Ford needs numpy")
+        import numpy as np
+        self.labels = labels
+        self.index = {label: vertex for vertex, label in enumerate(labels)}
+        order = np.argsort(destinations, kind='stable')
+        # Every distance is a sum of weights, so with integer weights the finite ones are integers too
+        self.integer_weights = np.asarray(weights).dtype.kind in 'iu'
+        self.sources = np.asarray(sources, dtype=np.int64)[order]
+        self.destinations = np.asarray(destinations, dtype=np.int64)[order]
+        self.weights = np.asarray(weights, dtype=np.float64)[order]
+        # The first edge of every run of edges with the same destination
+        if len(self.destinations):
+            self.starts = np.flatnonzero(np.r_[True, self.destinations[1:] != self.destinations[:-1]])
+        else:
+            self.starts = np.zeros(0, dtype=np.int64)
+        self.targets = self.destinations[self.starts]
+
+    @classmethod
+    def from_graph(cls, graph, weights):
+        """
+        :param graph: dictionary of vertex -> list of neighbors
+        :param weights: dictionary of (src, dst) -> cost, these are the edges that are relaxed
+        :return: BellmanFordEdges
+        """
+        index = {}
+        labels = []
+        for vertex, neighbors in graph.items():
+            for label in [vertex] + list(neighbors):
+                if label not in index:
+                    index[label] = len(labels)
+                    labels.append(label)
+        sources, destinations, costs = [], [], []
+        for (source, destination), cost in weights.items():
+            for label in (source, destination):
+                if label not in index:
+                    index[label] = len(labels)
+                    labels.append(label)
+            sources.append(index[source])
+            destinations.append(index[destination])
+            costs.append(cost)
+        return cls(labels, sources, destinations, costs)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def distance_list(self, distances):
+        """
+        The distances array from shortest_paths as a list, with the finite
+        distances converted back to int if all of the weights are ints, so
+        they have the same type as the edge by edge Bellman-Ford gives.
+        """
+        if not self.integer_weights:
+            return distances.tolist()
+        return [distance if distance == float('inf') else int(distance) for distance in distances.tolist()]
+
+    def shortest_paths(self, start, stats=None):
+        """
+        Run Bellman-Ford from start.
+        :param start: label of the start vertex, or None to start from every
+                      vertex at once, i.e. from a virtual vertex with an edge of
+                      cost 0 to all of them, as Johnson's algorithm does
+        :param stats: optional dictionary to add the number of passes and relaxations to
+        :return: (distances, parents) arrays indexed by vertex id, a parent of -1 means none
+        """
+        import numpy as np
+        number_of_vertices = len(self.labels)
+        sources, destinations, weights = self.sources, self.destinations, self.weights
+        starts, targets = self.starts, self.targets
+        parents = np.full(number_of_vertices, -1, dtype=np.int64)
+        if start is None:
+            distances = np.zeros(number_of_vertices)
+            # The virtual vertex makes the longest possible path one edge longer
+            max_passes = number_of_vertices
+        else:
+            distances = np.full(number_of_vertices, np.inf)
+            distances[self.index[start]] = 0
+            max_passes = number_of_vertices - 1
+
+        passes = 0
+        for _ in range(max_passes):
+            passes += 1
+            candidates = distances[sources] + weights
+            if not len(candidates):
+                break
+            best = np.minimum.reduceat(candidates, starts)
+            improved = best < distances[targets]
+            if not improved.any():
+                break
+            improved_targets = targets[improved]
+            distances_before = distances.copy()
+            distances[improved_targets] = best[improved]
+            # Any edge that gives the new distance of an improved vertex can be its parent
+            improved_edges = (candidates < distances_before[destinations]) & (candidates == distances[destinations])
+            parents[destinations[improved_edges]] = sources[improved_edges]
+
+        if stats is not None:
+            stats['passes'] = stats.get('passes', 0) + passes
+            stats['relaxed'] = stats.get('relaxed', 0) + passes * len(sources)
+
+        if len(sources) and (distances[sources] + weights < distances[destinations]).any():
+            raise ValueError('The graph has a negative cycle')
+        return distances, parents
@@ -2,6 +2,8 @@
 
 from collections import defaultdict
 
+from minimum_spanning_tree import minimum_spanning_tree
+
 
 class Graph():
     def __init__(self):
@@ -20,4 +22,11 @@ class Graph():
         self.edges[from_node].append(to_node)
         self.edges[to_node].append(from_node)
         self.weights[(from_node, to_node)] = weight
-        self.weights[(to_node, from_node)] = weight
\ No newline at end of file
+        self.weights[(to_node, from_node)] = weight
+
+    def minimum_spanning_tree(self, algorithm='kruskal'):
+        """
+        :param algorithm: 'kruskal' or 'prim'
+        :return: list of (from_node, to_node, weight) edges of the minimum spanning tree
+        """
+        return minimum_spanning_tree(self, algorithm)